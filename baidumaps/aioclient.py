@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from baidumaps import bulk
+from baidumaps import columns
+from baidumaps import crawl
+from baidumaps import geometry
+from baidumaps import paging
+from baidumaps.client import Client
+
+
+class AsyncIterable(object):
+    """Async iteration over "source", a blocking iterable of Client
+        requests: items are pulled "chunk" at a time on a thread, off the
+        event loop. Other attributes are those of "source", such as the
+        counters of a PlaceCrawler.
+    """
+
+    def __init__(self, source, chunk=20):
+        self.source = source
+        self.chunk = chunk
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+    async def __aiter__(self):
+        loop = asyncio.get_running_loop()
+        iterator = iter(self.source)
+
+        def take():
+            return list(islice(iterator, self.chunk))
+
+        try:
+            while True:
+                items = await loop.run_in_executor(None, take)
+                if not items:
+                    return
+                for item in items:
+                    yield item
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                await loop.run_in_executor(None, close)
+
+
+class AsyncClient(Client):
+    """Asyncio flavour of Client. Every API method (place_search, geocode,
+        direct, route_matrix, geoconv, ...) is the very same function from
+        apis.py, but returns a coroutine, since get() here is a coroutine.
+
+    Attention! At most "concurrency" requests are in flight at once; the rest
+        wait for a free slot. The blocking network part runs on a thread pool
+        of the same size, sharing one pooled transport, so many calls can be
+        awaited together on a single event loop:
+
+        >>> results = await asyncio.gather(*[client.geocode(address=a)
+        ...                                  for a in addresses])
+    """
+
+    def __init__(self, ak=None, concurrency=20, **kwargs):
+        kwargs.setdefault('pool_size', concurrency)
+        Client.__init__(self, ak=ak, **kwargs)
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # created lazily, so that it binds to the loop actually running.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def get(self, params):
+        loop = asyncio.get_running_loop()
+        async with self.semaphore:
+            response = await loop.run_in_executor(self.executor,
+                                                  self.fetch, params)
+        return self.build_result(params, response)
+
+    async def run_bulk(self, func, *args, **kwargs):
+        # bulk helpers spread their own requests over threads, calling the
+        # blocking fetch(); keep them off the event loop.
+        loop = asyncio.get_running_loop()
+        kwargs.setdefault('workers', self.concurrency)
+        return await loop.run_in_executor(
+            None, functools.partial(func, self, *args, **kwargs))
+
+    async def geoconv_bulk(self, coords, **kwargs):
+        return await self.run_bulk(bulk.geoconv_bulk, coords, **kwargs)
+
+    async def route_matrix_tiled(self, origins, destinations, **kwargs):
+        return await self.run_bulk(bulk.route_matrix_tiled, origins,
+                                   destinations, **kwargs)
+
+    async def geocode_columns(self, addresses=None, lng=None, lat=None,
+                              **kwargs):
+        return await self.run_bulk(columns.geocode_columns, addresses, lng,
+                                   lat, **kwargs)
+
+    async def geoconv_columns(self, lng, lat, **kwargs):
+        return await self.run_bulk(columns.geoconv_columns, lng, lat,
+                                   **kwargs)
+
+    async def route_matrix_columns(self, origin_lng, origin_lat,
+                                   destination_lng, destination_lat,
+                                   **kwargs):
+        return await self.run_bulk(columns.route_matrix_columns, origin_lng,
+                                   origin_lat, destination_lng,
+                                   destination_lat, **kwargs)
+
+    async def route_nearest(self, origins, destinations, **kwargs):
+        return await self.run_bulk(geometry.route_nearest, origins,
+                                   destinations, **kwargs)
+
+    # iterators return AsyncIterable, for "async for" rather than "await".
+
+    def place_search_iter(self, query, **kwargs):
+        return AsyncIterable(paging.place_search_iter(self, query, **kwargs))
+
+    def place_eventsearch_iter(self, query, event, region, **kwargs):
+        return AsyncIterable(paging.place_eventsearch_iter(
+            self, query, event, region, **kwargs))
+
+    def place_crawl(self, query, bounds, **kwargs):
+        return AsyncIterable(crawl.place_crawl(self, query, bounds, **kwargs))
+
+    async def close(self):
+        self.executor.shutdown(wait=False)
+        self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -10,6 +10,83 @@
 
 import re
 
+# compiled once and shared by every call below.
+sep_pattern = re.compile(r'[,;|]')
+CN_pattern = re.compile(u'[\u4e00-\u9fa5]+')
+IP_pattern = re.compile(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$')
+
+
+def has_chinese(text):
+    if isinstance(text, bytes):     # Python 2 str
+        text = text.decode('utf-8')
+    return CN_pattern.search(text) is not None
+
+
+def to_location(location):
+    """Turns <lng, lat> "location", a str or list, into "lat,lng"."""
+    if isinstance(location, str):
+        sep_location = sep_pattern.split(location)
+        if len(sep_location) != 2:
+            raise ValueError('"location" incorrect! It may like this: \
+                             \nlocation="116.404,39.915".')
+        return sep_location[1] + ',' + sep_location[0]
+
+    elif isinstance(location, list):
+        if len(location) != 2:
+            raise ValueError('"location" incorrect! It may like this: \
+                             \nlocation=[116.404, 39.915]')
+        return '%s,%s' % (location[1], location[0])
+
+    else:
+        raise ValueError('"location" must be a str or list instance!')
+
+
+def to_bounds(bounds):
+    """Turns <lng, lat> "bounds", a str or list, into "lat,lng,lat,lng"."""
+    if isinstance(bounds, str):
+        sep_bounds = sep_pattern.split(bounds)
+        if len(sep_bounds) != 4:
+            raise ValueError('"bounds" incorrect! It may like this: \
+                             \nbounds="116.404,39.915;116.414,39.975".')
+        return ','.join([sep_bounds[i] for i in (1, 0, 3, 2)])
+
+    elif isinstance(bounds, list):
+        if len(bounds) != 2:
+            raise ValueError('"bounds" incorrect! It may like this: \
+                             \nbounds=[[116.404, 39.915], [116.414, \
+                             39.975]].')
+        return '%s,%s,%s,%s' % (bounds[0][1], bounds[0][0],
+                                bounds[1][1], bounds[1][0])
+
+    else:
+        raise ValueError('"bounds" must be a str or list instance!')
+
+
+def to_points(points, name):
+    """Turns route_matrix() "origins"/"destinations" into "lat,lng|lat,lng"
+        or "name|name".
+    """
+    if isinstance(points, str):
+        sep_points = sep_pattern.split(points)
+        if has_chinese(points):
+            if len(sep_points) > 5:
+                raise ValueError('"%s" incorrect! upper limits is 5.' % name)
+            return '|'.join(sep_points)
+        if len(sep_points) > 10:
+            raise ValueError('"%s" incorrect! upper limits is 5.' % name)
+        return '|'.join([sep_points[i + 1] + ',' + sep_points[i]
+                         for i in range(0, len(sep_points) - 1, 2)])
+
+    elif isinstance(points, list):
+        # element in list is CN_pattern characters.
+        if not isinstance(points[0], (list, tuple)):
+            return '|'.join(points)
+        # element in list is list/tuple of lng,lat.
+        return '|'.join(['%s,%s' % (p[1], p[0]) for p in points])
+
+    else:
+        raise ValueError('"%s" must be str or list!' % name)
+
 
 def place_search(client, query, region=None, bounds=None,
                  location=None, **kwargs):
@@ -27,52 +104,13 @@ def place_search(client, query, region=None, bounds=None,
     Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/webservice-placeapi
     """
 
-    sep_pattern = re.compile(r'[,;|]')
-
     if not any([region, bounds, location]):
         raise ValueError('please assign one and only one of search types: \
                          "region", "bounds", "location".')
-
     elif bounds:
-        if isinstance(bounds, str):
-            sep_bounds = sep_pattern.split(bounds)
-            if len(sep_bounds) != 4:
-                raise ValueError('"bounds" incorrect! It may like this: \
-                                 \nbounds="116.404,39.915;116.414,39.975".')
-            else:
-                reorder_bounds = [sep_bounds[i] for i in [1, 0, 3, 2]]
-                kwargs['bounds'] = ','.join(reorder_bounds)
-
-        elif isinstance(bounds, list):
-            if len(bounds) != 2:
-                raise ValueError('"bounds" incorrect! It may like this: \
-                                 \nbounds=[[116.404, 39.915], [116.414, \
-                                 39.975]].')
-            else:
-                comb_bounds = [','.join(map(str, bo[::-1])) for bo in bounds]
-                kwargs['bounds'] = ','.join(comb_bounds)
-
-        else:
-            raise ValueError('"bounds" must be a str or list instance!')
-
+        kwargs['bounds'] = to_bounds(bounds)
     elif location:
-        if isinstance(location, str):
-            sep_location = sep_pattern.split(location)
-            if len(sep_location) != 2:
-                raise ValueError('"location" incorrect! It may like this: \
-                                 \nlocation="116.404,39.915".')
-            else:
-                kwargs['location'] = ','.join(sep_location[::-1])
-
-        elif isinstance(location, list):
-            if len(location) != 2:
-                raise ValueError('"location" incorrect! It may like this: \
-                                 \nlocation=[116.404, 39.915]')
-            else:
-                kwargs['location'] = ','.join(map(str, location[::-1]))
-
-        else:
-            raise ValueError('"location" must be a str or list instance!')
+        kwargs['location'] = to_location(location)
     else:
         kwargs['region'] = region
 
@@ -93,13 +131,10 @@ def place_detail(client, uid=None, uids=None, **kwargs):
     Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/webservice-placeapi
     """
 
-    sep_pattern = re.compile(r'[,;|]')
-
     if not any([uid, uids]):
         raise ValueError('please assign "uid" or "uids".')
     elif uids:
-        sep_uids = sep_pattern.split(kwargs['uids'])
-        kwargs['uids'] = ','.join(sep_uids)
+        kwargs['uids'] = ','.join(sep_pattern.split(uids))
     else:
         kwargs['uid'] = uid
 
@@ -126,50 +161,12 @@ def place_eventsearch(client, query, event, region, bounds=None,
     Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/webservice-placeapi
     """
 
-    sep_pattern = re.compile(r'[,;|]')
-
     if not any([bounds, location]):
         raise ValueError('please assign either "bounds" or "location".')
     elif bounds:
-        if isinstance(bounds, str):
-            sep_bounds = sep_pattern.split(bounds)
-            if len(sep_bounds) != 4:
-                raise ValueError('"bounds" incorrect! It may like this: \
-                                 \nbounds="116.404,39.915;116.414,39.975".')
-            else:
-                reorder_bounds = [sep_bounds[i] for i in [1, 0, 3, 2]]
-                kwargs['bounds'] = ','.join(reorder_bounds)
-
-        elif isinstance(bounds, list):
-            if len(bounds) != 2:
-                raise ValueError('"bounds" incorrect! It may like this: \
-                                 \nbounds=[[116.404, 39.915], [116.414, \
-                                 39.975]].')
-            else:
-                comb_bounds = [','.join(map(str, bo[::-1])) for bo in bounds]
-                kwargs['bounds'] = ','.join(comb_bounds)
-
-        else:
-            raise ValueError('"bounds" must be a str or list instance!')
-
+        kwargs['bounds'] = to_bounds(bounds)
     else:
-        if isinstance(location, str):
-            sep_location = sep_pattern.split(location)
-            if len(sep_location) != 2:
-                raise ValueError('"location" incorrect! It may like this: \
-                                 \nlocation="116.404,39.915".')
-            else:
-                kwargs['location'] = ','.join(sep_location[::-1])
-
-        elif isinstance(location, list):
-            if len(location) != 2:
-                raise ValueError('"location" incorrect! It may like this: \
-                                 \nlocation=[116.404, 39.915]')
-            else:
-                kwargs['location'] = ','.join(map(str, location[::-1]))
-
-        else:
-            raise ValueError('"location" must be a str or list instance!')
+        kwargs['location'] = to_location(location)
 
     kwargs.update({'server_name': 'place', 'version': 'v2',
                    'subserver_name': 'eventsearch', 'query': query,
@@ -208,28 +205,8 @@ def place_suggest(client, query, region, **kwargs):
     Reference: http://developer.baidu.com/map/index.php?title=webapi/place-suggestion-api
     """
 
-    check_location = 'location' in kwargs
-    sep_pattern = re.compile(r'[,;|]')
-
-    if check_location:
-        location = kwargs['location']
-        if isinstance(location, str):
-            sep_location = sep_pattern.split(location)
-            if len(sep_location) != 2:
-                raise ValueError('"location" incorrect! It may like this: \
-                                 \nlocation="116.404,39.915".')
-            else:
-                kwargs['location'] = ','.join(sep_location[::-1])
-
-        elif isinstance(location, list):
-            if len(location) != 2:
-                raise ValueError('"location" incorrect! It may like this: \
-                                 \nlocation=[116.404, 39.915]')
-            else:
-                kwargs['location'] = ','.join(map(str, location[::-1]))
-
-        else:
-            raise ValueError('"location" must be a str or list instance!')
+    if 'location' in kwargs:
+        kwargs['location'] = to_location(kwargs['location'])
 
     kwargs.update({'server_name': 'place', 'version': 'v2',
                    'subserver_name': 'suggestion', 'region': region,
@@ -251,29 +228,10 @@ def geocode(client, address=None, location=None, **kwargs):
     Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/webservice-geocoding
     """
 
-    sep_pattern = re.compile(r'[,;|]')
-
     if not any([address, location]):
         raise ValueError('please assign either "address" or "location".')
-
     elif location:
-        if isinstance(location, str):
-            sep_location = sep_pattern.split(location)
-            if len(sep_location) != 2:
-                raise ValueError('"location" incorrect! It may like this: \
-                                 \nlocation="116.404,39.915".')
-            else:
-                kwargs['location'] = ','.join(sep_location[::-1])
-
-        elif isinstance(location, list):
-            if len(location) != 2:
-                raise ValueError('"location" incorrect! It may like this: \
-                                 \nlocation=[116.404, 39.915]')
-            else:
-                kwargs['location'] = ','.join(map(str, location[::-1]))
-
-        else:
-            raise ValueError('"location" must be a str or list instance!')
+        kwargs['location'] = to_location(location)
     else:
         kwargs['address'] = address
 
@@ -300,27 +258,19 @@ def direct(client, origin, destination, mode='driving', region=None,
     Reference: http://developer.baidu.com/map/index.php?title=webapi/direction-api
     """
 
-    CN_pattern = re.compile(u'[\u4e00-\u9fa5]+')
-
     if isinstance(origin, str):
-        u_origin = origin.decode('utf-8')
-        match = CN_pattern.search(u_origin)
-        if not match:
+        if not has_chinese(origin):
             origin = ','.join(origin.split(',')[::-1])
     elif isinstance(origin, list):
-        origin = map(str, origin)
-        origin = ','.join(origin[::-1])
+        origin = ','.join([str(o) for o in origin[::-1]])
     else:
         raise ValueError('"origin"  must be a str or list instance!')
 
     if isinstance(destination, str):
-        u_destination = destination.decode('utf-8')
-        match = CN_pattern.search(u_destination)
-        if not match:
+        if not has_chinese(destination):
             destination = ','.join(destination.split(',')[::-1])
     elif isinstance(destination, list):
-        destination = map(str, destination)
-        destination = ','.join(destination[::-1])
+        destination = ','.join([str(d) for d in destination[::-1]])
     else:
         raise ValueError('"destination" must be a str or list instance!')
 
@@ -357,9 +307,7 @@ def ip_locate(client, ip=None, **kwargs):
     """
 
     if ip:
-        IPpattern = re.compile(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$')
-        match = IPpattern.match(ip)
-        if not match:
+        if not IP_pattern.match(ip):
             raise ValueError('"ip" incorrect!')
         kwargs['ip'] = ip
 
@@ -382,71 +330,8 @@ def route_matrix(client, origins, destinations, **kwargs):
     Reference: http://developer.baidu.com/map/index.php?title=webapi/route-matrix-api
     """
 
-    sep_pattern = re.compile(r'[,;|]')
-    CN_pattern = re.compile(u'[\u4e00-\u9fa5]+')
-
-    is_origins_str = isinstance(origins, str)
-    is_origins_list = isinstance(origins, list)
-    if not any([is_origins_str, is_origins_list]):
-        raise ValueError('"origins" must be str or list!')
-    elif is_origins_str:
-        sep_origins = sep_pattern.split(origins)
-        u_origins = origins.decode('utf-8')
-        CN_pattern = re.compile(u'[\u4e00-\u9fa5]+')
-        match = CN_pattern.search(u_origins)
-        if match:
-            if len(sep_origins) > 5:
-                raise ValueError('"origins" incorrect! upper limits is 5.')
-            else:
-                origins = '|'.join(sep_origins)
-        else:
-            if len(sep_origins) > 10:
-                raise ValueError('"origins"incorrect! upper limits is 5.')
-            else:
-                temp = [','.join(sep_origins[(2*x):(2*x+2)][::-1])
-                        for x in range(0, len(sep_origins)/2)]
-                origins = '|'.join(temp)
-
-    else:
-        # element in list is CN_pattern characters.
-        if len(origins[0]) == 1:
-            origins = '|'.join(origins)
-        # element in list is list/tuple of lng,lat.
-        else:
-            origins = [map(str, l) for l in origins]
-            origins = '|'.join([','.join(l[::-1]) for l in origins])
-
-    is_destinations_str = isinstance(destinations, str)
-    is_destinations_list = isinstance(destinations, list)
-
-    if not any([is_destinations_str, is_destinations_list]):
-        raise ValueError('"destinations" must be str or list!')
-    elif is_destinations_str:
-        sep_destinations = sep_pattern.split(destinations)
-        u_destinations = destinations.decode('utf-8')
-        CN_pattern = re.compile(u'[\u4e00-\u9fa5]+')
-        match = CN_pattern.search(u_destinations)
-        if match:
-            if len(sep_destinations) > 5:
-                raise ValueError('"destinations" incorrect! upper limits is \
-                                 5.')
-            else:
-                destinations = '|'.join(sep_destinations)
-        else:
-            if len(sep_destinations) > 10:
-                raise ValueError('"destinations"incorrect! upper limits is 5.')
-            else:
-                temp = [','.join(sep_destinations[(2*x):(2*x+2)][::-1])
-                        for x in range(0, len(sep_destinations)/2)]
-                destinations = '|'.join(temp)
-
-    else:
-        if len(destinations[0]) == 1:
-            destinations = '|'.join(destinations)
-        else:
-            # first, map to str.
-            destinations = [map(str, l) for l in destinations]
-            destinations = '|'.join([','.join(l[::-1]) for l in destinations])
+    origins = to_points(origins, 'origins')
+    destinations = to_points(destinations, 'destinations')
 
     kwargs.update({'server_name': 'direction', 'version': 'v1',
                    'subserver_name': 'routematrix', 'origins': origins,
@@ -467,26 +352,41 @@ def geoconv(client, coords, **kwargs):
     Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/changeposition
     """
 
-    sep_pattern = re.compile(r'[,;|]')
-    is_str = isinstance(coords, str)
-    is_list = isinstance(coords, list)
-
-    if not any([is_str, is_list]):
-        raise ValueError('"coords" must be str or list!')
-    elif is_str:
+    if isinstance(coords, str):
         flat_co = sep_pattern.split(coords)
-    elif is_list and isinstance(coords[0], list):
+    elif isinstance(coords, list) and isinstance(coords[0], list):
         flat_co = [str(c) for co in coords for c in co]
+    elif isinstance(coords, list):
+        flat_co = [str(c) for c in coords]
     else:
-        flat_co = map(str, coords)
+        raise ValueError('"coords" must be str or list!')
 
     if len(flat_co) > 200:
         raise ValueError('"coords" incorrect! upper limits is 100.')
-    else:
-        iter_co = iter(flat_co)
-        coords = ';'.join([','.join(ic) for ic in zip(iter_co, iter_co)])
+    coords = ';'.join([flat_co[i] + ',' + flat_co[i + 1]
+                       for i in range(0, len(flat_co) - 1, 2)])
 
     kwargs.update({'server_name': 'geoconv', 'version': 'v1',
                   'subserver_name': '', 'coords': coords})
 
     return client.get(kwargs)
+
+
+class ParamsOnly(object):
+    """Stand-in client whose get() hands back the normalized params instead of
+        sending them, so the functions above can be reused by bulk helpers.
+    """
+
+    def get(self, params):
+        return params
+
+
+def prepare(api, *args, **kwargs):
+    """Returns the request params that "api" (one of the functions above)
+        would send for the given arguments, without sending anything.
+
+    >>> prepare(geoconv, [[114.2, 29.5]], raw=True)['coords']
+    '114.2,29.5'
+    """
+
+    return api(ParamsOnly(), *args, **kwargs)
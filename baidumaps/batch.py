@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Streaming batch runner behind "python -m baidumaps batch".
+
+Each input row (a CSV record or a JSON object per line) holds the keyword
+arguments of one API call; each output line is a JSON object with the row
+number, its input and either "result" or "error". Rows are read, sent and
+written a window at a time, so memory stays flat whatever the input size,
+and progress is checkpointed next to the output file after every window.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import threading
+from collections import deque
+from itertools import islice
+from multiprocessing.pool import Pool, ThreadPool
+import requests
+import baidumaps
+from baidumaps import apis
+from baidumaps import exceptions
+
+api_names = ('place_search', 'place_detail', 'place_eventsearch',
+             'place_eventdetail', 'place_suggest', 'geocode', 'direct',
+             'ip_locate', 'route_matrix', 'geoconv')
+
+PY2 = sys.version_info[0] < 3
+
+# failures of a single row, written as its "error" instead of stopping the
+# job: refused calls, malformed rows (bad or missing arguments) and network
+# errors still there after retries. Anything else aborts the run.
+row_errors = (exceptions.StatusError, exceptions.CircuitOpenError,
+              ValueError, TypeError, KeyError, requests.RequestException)
+
+
+def describe(error):
+    if isinstance(error, (exceptions.StatusError,
+                          exceptions.CircuitOpenError)):
+        return str(error)
+    return '%s: %s' % (type(error).__name__, error)
+
+
+def native(value):
+    # apis.py checks isinstance(..., str); Python 2 json gives unicode.
+    if PY2 and isinstance(value, unicode):     # noqa: F821
+        return value.encode('utf-8')
+    return value
+
+
+def read_rows(path, fmt):
+    if fmt == 'csv':
+        if PY2:
+            handle = open(path, 'rb')
+        else:
+            handle = io.open(path, encoding='utf-8', newline='')
+        with handle:
+            for row in csv.DictReader(handle):
+                yield dict((k, v) for k, v in row.items() if v != '')
+    else:
+        with io.open(path, encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    row = json.loads(line)
+                    yield dict((native(k), native(v)) for k, v in row.items())
+
+
+class Checkpoint(object):
+    """Number of input rows done and the output size once they were written,
+        saved atomically as JSON.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.offset = 0
+        if os.path.exists(path):
+            with open(path) as handle:
+                state = json.load(handle)
+            self.rows, self.offset = state['rows'], state['offset']
+
+    def save(self, rows, offset):
+        self.rows, self.offset = rows, offset
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as handle:
+            json.dump({'rows': rows, 'offset': offset}, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.rename(temp, self.path)
+
+
+class Offline(object):
+    """Transport of the client parsing in worker processes, which never
+        sends anything.
+    """
+
+    def get(self, url):
+        raise RuntimeError('parsing processes do not send requests.')
+
+
+parser_client = None    # per worker process, made by start_worker()
+
+
+def start_worker(decoder=None):
+    """Pool initializer: the parsing client, with the caller's decoder."""
+    global parser_client
+    parser_client = baidumaps.Client(ak='offline', transport=Offline(),
+                                     decoder=decoder)
+
+
+def encode_line(record):
+    line = json.dumps(record, ensure_ascii=False)
+    if not isinstance(line, bytes):
+        line = line.encode('utf-8')
+    return line + b'\n'
+
+
+def finish(record, result):
+    """Output line of "record" with "result", or with the error of a result
+        which cannot be written as JSON.
+    """
+    record['result'] = result
+    try:
+        return encode_line(record)
+    except (TypeError, ValueError) as e:
+        del record['result']
+        record['error'] = describe(e)
+        return encode_line(record)
+
+
+def transform(job, postprocess=None):
+    """Turns a fetched job into its output line; runs in worker processes.
+        "payload" is the raw body, decoded there, or the response when it
+        was computed locally; "postprocess" runs there too.
+    """
+    if parser_client is None:
+        start_worker()
+    number, row, params, payload, error = job
+    record = {'row': number, 'input': row}
+    if error is not None:
+        record['error'] = error
+    else:
+        try:
+            if isinstance(payload, dict):
+                response = payload
+            else:
+                response = parser_client.decode(payload)
+            result = parser_client.build_result(params, response)
+            if postprocess is not None:
+                result = postprocess(result, row)
+            return finish(record, result)
+        except row_errors as e:
+            record['error'] = describe(e)
+    return encode_line(record)
+
+
+def run_batch(client, api, input_path, output_path, fmt=None, workers=10,
+              window=None, processes=0, queue_size=None, postprocess=None,
+              **kwargs):
+    """Runs client.<api>(**row, **kwargs) for every input row, resuming from
+        the checkpoint "<output_path>.ckpt" if a previous run died. Returns
+        the number of rows processed by this run.
+
+    Requests run on "workers" threads. With "processes" > 0, the threads only
+        fetch raw responses, and decoding, parsing and encoding output lines
+        happen in that many worker processes, for jobs where parsing keeps
+        one core busy. At most "queue_size" rows (default: 2 * window) are in
+        flight between reading and writing, so a slow stage holds back the
+        others instead of filling memory. Output keeps the input order and is
+        checkpointed every "window" rows.
+
+    "postprocess", if given, is called as postprocess(result, row) and its
+        return value is written instead of the result. With processes it
+        runs in the worker processes, so it must be picklable: a module
+        level function, not a lambda or closure.
+
+    Attention! Results are written as JSON, so "typed" and "lazy" are only
+        accepted with a "postprocess" turning them into plain values; rows
+        whose result still cannot be written get an "error" instead.
+    """
+
+    if api not in api_names:
+        raise ValueError('"api" must be one of %s.' % ', '.join(api_names))
+    if postprocess is None and (kwargs.get('typed') or kwargs.get('lazy')):
+        raise ValueError('"typed" and "lazy" results cannot be written as '
+                         'JSON; pass a "postprocess" converting them.')
+    fmt = fmt or ('csv' if input_path.endswith('.csv') else 'jsonl')
+    window = window or workers * 10
+    queue_size = queue_size or 2 * window
+    func = getattr(client, api)
+    checkpoint = Checkpoint(output_path + '.ckpt')
+
+    def call(job):
+        number, row = job
+        record = {'row': number, 'input': row}
+        args = dict(row)
+        args.update(kwargs)
+        try:
+            result = func(**args)
+            if postprocess is not None:
+                result = postprocess(result, row)
+            return finish(record, result)
+        except row_errors as e:
+            record['error'] = describe(e)
+        return encode_line(record)
+
+    def fetch(job):
+        number, row = job
+        args = dict(row)
+        args.update(kwargs)
+        params = payload = error = None
+        try:
+            params = apis.prepare(getattr(apis, api), **args)
+            # only the raw body goes to the workers, to be decoded there.
+            body, response = client.fetch_body(params)
+            payload = response if body is None else body
+        except row_errors as e:
+            error = describe(e)
+        return number, row, params, payload, error
+
+    slots = threading.Semaphore(queue_size)
+    stopped = threading.Event()
+
+    def bounded(jobs):
+        for job in jobs:
+            slots.acquire()     # released once the row is written
+            if stopped.is_set():
+                return
+            yield job
+
+    rows = enumerate(read_rows(input_path, fmt))
+    rows = islice(rows, checkpoint.rows, None)     # skip rows already done
+    done = 0
+    # processes first: forking once threads run could copy held locks.
+    pool = None
+    if processes:
+        pool = Pool(processes, start_worker, (client.decode,))
+    threads = ThreadPool(workers)
+    try:
+        with open(output_path, 'ab') as out:
+            out.truncate(checkpoint.offset)    # drop lines after checkpoint
+            out.seek(checkpoint.offset)
+            lines = []
+
+            def save():
+                # lines are written a window at a time, together with the
+                # checkpoint, so the file never holds unsaved rows.
+                out.write(b''.join(lines))
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint.save(checkpoint.rows + len(lines), out.tell())
+                del lines[:]
+
+            def write(line):
+                lines.append(line)
+                slots.release()
+                if len(lines) == window:
+                    save()
+
+            if pool is None:
+                for line in threads.imap(call, bounded(rows)):
+                    write(line)
+                    done += 1
+            else:
+                pending = deque()
+                for job in threads.imap(fetch, bounded(rows)):
+                    pending.append(pool.apply_async(transform,
+                                                    (job, postprocess)))
+                    # waiting on the oldest once half the slots are held
+                    # here leaves the others to keep fetching.
+                    while pending and (pending[0].ready() or
+                                       len(pending) >= queue_size // 2):
+                        write(pending.popleft().get())
+                        done += 1
+                while pending:
+                    write(pending.popleft().get())
+                    done += 1
+            if lines:
+                save()
+    finally:
+        stopped.set()
+        slots.release()     # wakes the reader if it waits for a slot
+        threads.terminate()
+        if pool is not None:
+            pool.terminate()
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m baidumaps')
+    commands = parser.add_subparsers(dest='command')
+    batch = commands.add_parser(
+        'batch', help='run one API over every row of a CSV/JSONL file')
+    batch.add_argument('api', choices=api_names)
+    batch.add_argument('input', help='.csv or .jsonl file, one call per row')
+    batch.add_argument('output', help='.jsonl results, appended on resume')
+    batch.add_argument('--ak', action='append', required=True,
+                       help='API key; repeat it for a pool of keys')
+    batch.add_argument('--format', choices=['csv', 'jsonl'])
+    batch.add_argument('--workers', type=int, default=10)
+    batch.add_argument('--window', type=int,
+                       help='rows per checkpoint (default: 10 * workers)')
+    batch.add_argument('--processes', type=int, default=0,
+                       help='parse responses in this many processes')
+    batch.add_argument('--raw', action='store_true')
+    batch.add_argument('--cache', help='SQLite response cache file')
+    args = parser.parse_args(argv)
+
+    if args.command != 'batch':
+        parser.print_help()
+        return 2
+
+    cache = None
+    if args.cache:
+        from baidumaps.cache import SQLiteCache
+        cache = SQLiteCache(args.cache)
+    ak = args.ak[0] if len(args.ak) == 1 else args.ak
+    client = baidumaps.Client(ak=ak, pool_size=args.workers, cache=cache)
+    extra = {'raw': True} if args.raw else {}
+    done = run_batch(client, args.api, args.input, args.output,
+                     fmt=args.format, workers=args.workers,
+                     window=args.window, processes=args.processes,
+                     **extra)
+    sys.stderr.write('%d rows done.\n' % done)
+    return 0
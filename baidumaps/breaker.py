@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Overload protection for Client requests, per service (keyed like
+exceptions.messages): a circuit breaker which stops sending to a failing
+service for a while, and an adaptive limit on the requests in flight.
+"""
+
+import threading
+import time
+from collections import deque
+from baidumaps import exceptions
+from baidumaps.retry import is_transient
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class Circuit(object):
+    """State of one service in CircuitBreaker."""
+
+    def __init__(self, window):
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=window)    # True for a failed call
+        self.opened_at = 0.0
+        self.probing = 0
+        self.probed = 0
+
+
+class CircuitBreaker(object):
+    """Opens the circuit of a service once, among its last "window" calls
+        (and at least "min_calls"), the share of failures reaches
+        "error_rate". A failure is a transient error (see retry.is_transient:
+        timeouts, connection errors, HTTP 5xx, internal error statuses) or,
+        if "latency" is set, a call slower than that many seconds.
+
+    While open, calls raise exceptions.CircuitOpenError at once. After
+        "cooldown" seconds the circuit half-opens and lets "probes" calls
+        through: if they all succeed it closes, otherwise it opens again.
+    """
+
+    def __init__(self, error_rate=0.5, latency=None, window=50, min_calls=20,
+                 cooldown=30, probes=3):
+        self.error_rate = error_rate
+        self.latency = latency
+        self.window = window
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.probes = probes
+        self.clock = time.time
+        self.circuits = {}
+        self.opened = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def circuit(self, service):
+        circuit = self.circuits.get(service)
+        if circuit is None:
+            circuit = self.circuits[service] = Circuit(self.window)
+        return circuit
+
+    def state(self, service):
+        with self.lock:
+            return self.circuit(service).state
+
+    def before(self, service):
+        """Called before sending; raises CircuitOpenError if the call may
+            not go.
+        """
+        with self.lock:
+            circuit = self.circuit(service)
+            if circuit.state == CLOSED:
+                return
+            if circuit.state == OPEN:
+                retry_in = circuit.opened_at + self.cooldown - self.clock()
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise exceptions.CircuitOpenError(service, retry_in)
+                circuit.state = HALF_OPEN
+                circuit.probing = circuit.probed = 0
+            if circuit.probing + circuit.probed >= self.probes:
+                self.rejected += 1
+                raise exceptions.CircuitOpenError(service, 0.0)
+            circuit.probing += 1
+
+    def cancel(self, service):
+        """Called instead of after() when a call let through by before() is
+            not sent after all.
+        """
+        with self.lock:
+            circuit = self.circuit(service)
+            if circuit.state == HALF_OPEN and circuit.probing > 0:
+                circuit.probing -= 1
+
+    def is_failure(self, seconds, error):
+        if error is not None and is_transient(error):
+            return True
+        return self.latency is not None and seconds > self.latency
+
+    def after(self, service, seconds, error=None):
+        """Called once a call let through by before() is over."""
+        failed = self.is_failure(seconds, error)
+        with self.lock:
+            circuit = self.circuit(service)
+            if circuit.state == HALF_OPEN:
+                circuit.probing -= 1
+                if failed:
+                    self.trip(circuit)
+                else:
+                    circuit.probed += 1
+                    if circuit.probed >= self.probes:
+                        circuit.state = CLOSED
+                        circuit.outcomes.clear()
+                return
+            if circuit.state == OPEN:   # sent before the circuit opened
+                return
+
+            circuit.outcomes.append(failed)
+            calls = len(circuit.outcomes)
+            if (calls >= self.min_calls and
+                    sum(circuit.outcomes) >= self.error_rate * calls):
+                self.trip(circuit)
+
+    def trip(self, circuit):
+        circuit.state = OPEN
+        circuit.opened_at = self.clock()
+        circuit.outcomes.clear()
+        self.opened += 1
+
+
+class AdaptiveLimit(object):
+    """Caps the requests in flight per service, finding the highest count
+        each one sustains by AIMD: the limit grows by "increase" over each
+        round of "limit" successful calls, and is multiplied by "decrease"
+        on a transient error or, if "latency" is set, a call slower than
+        that many seconds. Calls over the limit wait for a free slot.
+
+    Attention! Only one decrease happens per round trip: failures of calls
+        sent before the last decrease do not cut the limit again.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=100, increase=1.0,
+                 decrease=0.5, latency=None):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency = latency
+        self.clock = time.time
+        self.limits = {}
+        self.inflight = {}
+        self.decreased_at = {}
+        self.condition = threading.Condition()
+
+    def limit(self, service):
+        return int(self.limits.get(service, self.initial))
+
+    def acquire(self, service):
+        """Waits for a free slot; returns the time the call starts."""
+        with self.condition:
+            while self.inflight.get(service, 0) >= self.limit(service):
+                self.condition.wait()
+            self.inflight[service] = self.inflight.get(service, 0) + 1
+            return self.clock()
+
+    def cancel(self, service):
+        """Frees the slot of a call which was not sent, leaving the limit
+            as it is.
+        """
+        with self.condition:
+            self.inflight[service] -= 1
+            self.condition.notify_all()
+
+    def release(self, service, started, seconds, error=None):
+        overloaded = ((error is not None and is_transient(error)) or
+                      (self.latency is not None and seconds > self.latency))
+        with self.condition:
+            self.inflight[service] -= 1
+            limit = self.limits.get(service, float(self.initial))
+            if not overloaded:
+                limit = min(self.maximum, limit + self.increase / limit)
+            elif started >= self.decreased_at.get(service, 0.0):
+                limit = max(self.minimum, limit * self.decrease)
+                self.decreased_at[service] = self.clock()
+            self.limits[service] = limit
+            self.condition.notify_all()
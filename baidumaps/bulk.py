@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import array
+from collections import deque
+from itertools import islice
+from multiprocessing.pool import ThreadPool
+from baidumaps import apis
+from baidumaps import coordconv
+from baidumaps import exceptions
+from baidumaps import parse
+from baidumaps import records
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def iter_chunks(points, size):
+    """Yields lists of at most "size" [lng, lat] pairs from a list, a generator
+        or a NumPy array of shape (N, 2).
+    """
+
+    if np is not None and isinstance(points, np.ndarray):
+        for start in range(0, len(points), size):
+            yield points[start:start + size].tolist()
+    else:
+        iter_points = iter(points)
+        while True:
+            chunk = [list(p) for p in islice(iter_points, size)]
+            if not chunk:
+                break
+            yield chunk
+
+
+def run_ordered(func, jobs, workers, window=None):
+    """Maps "func" over "jobs" on a thread pool, yielding results in input
+        order. The first exception raised by any job is re-raised.
+
+    Only "window" (default: 2 * workers) jobs are taken from "jobs" ahead of
+        the results yielded, so a generator of millions of points is read as
+        it goes instead of being queued whole.
+    """
+
+    window = window or 2 * workers
+    pool = ThreadPool(workers)
+    try:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.apply_async(func, (job,)))
+            if len(pending) >= window:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+
+
+def new_matrix(rows, cols, typecode, fill):
+    # a NumPy array, or rows of array.array without NumPy; both take m[i][j].
+    if np is not None:
+        return np.full((rows, cols), fill, dtype=np.dtype(typecode))
+    return [array.array(typecode, [fill] * cols) for _ in range(rows)]
+
+
+def geoconv_bulk(client, coords, workers=10, chunk_size=100, typed=False,
+                 **kwargs):
+    """This module converts any number of coords, splitting them into requests
+        of at most "chunk_size"(upper limits 100) points which run
+        concurrently on "workers" threads. Other keyword arguments, such as
+        "from" and "to", are passed to every geoconv() request.
+
+    Attention! "coords" may be a list or a generator of [lng, lat] pairs, or a
+        NumPy array of shape (N, 2). Results keep the input order and always
+        come back in the same shape: a NumPy array of shape (N, 2) holding
+        <lng, lat> rows, or, without NumPy, a flat array.array('d') of
+        lng, lat, lng, lat, ... With "typed=True", it returns a
+        records.Points instead.
+
+    With a client created with "local_geoconv=True", supported "from"/"to"
+        pairs are converted offline by coordconv, without any request.
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/changeposition
+    """
+
+    if chunk_size > 100:
+        raise ValueError('"chunk_size" incorrect! upper limits is 100.')
+    from_ = kwargs.get('from', coordconv.WGS84)
+    to = kwargs.get('to', coordconv.BD09)
+    if getattr(client, 'local_geoconv', False) and \
+            coordconv.supports(from_, to):
+        if not isinstance(coords, np.ndarray):
+            coords = [list(c) for c in coords]
+        result = coordconv.convert(coords, from_, to)
+        if typed:
+            return records.Points(result[:, 0], result[:, 1])
+        return result
+    kwargs['raw'] = True
+
+    def convert(chunk):
+        params = apis.prepare(apis.geoconv, chunk, **kwargs)
+        response = client.fetch(params)
+        if len(response['result']) != len(chunk):
+            raise ValueError('geoconv returned %d points for %d coords.'
+                             % (len(response['result']), len(chunk)))
+        return [v for rr in response['result'] for v in (rr['x'], rr['y'])]
+
+    flat = array.array('d')
+    for values in run_ordered(convert, iter_chunks(coords, chunk_size),
+                              workers):
+        flat.extend(values)
+
+    if typed:
+        return records.Points(flat[0::2], flat[1::2])
+    if np is None:
+        return flat
+    return np.frombuffer(flat, dtype=np.float64).reshape(-1, 2).copy()
+
+
+def route_matrix_tiled(client, origins, destinations, workers=10, tile=5,
+                       skip_errors=False, typed=False, **kwargs):
+    """This module requests an N x M routes matrix of any size, splitting it
+        into route_matrix() requests of at most "tile"(upper limits 5) origins
+        by "tile" destinations, which run concurrently on "workers" threads.
+        Other keyword arguments, such as "mode", are passed to every request.
+
+    Attention! "origins" and "destinations" are lists of [lng, lat] pairs, or
+        lists of place names. It returns a dict of three N x M matrices
+        (NumPy arrays, or lists of array.array rows without NumPy):
+        "distance" and "duration" hold the values of parse_drx(), NaN where
+        the route failed; "status" is 0 for good cells and holds the element
+        status, or with "skip_errors=True" the StatusError status of the whole
+        sub-request, for failed ones. With "typed=True", it returns a
+        records.RouteMatrix instead.
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/route-matrix-api
+    """
+
+    if tile > 5:
+        raise ValueError('"tile" incorrect! upper limits is 5.')
+    origins = list(origins)
+    destinations = list(destinations)
+    kwargs['raw'] = True
+
+    rows, cols = len(origins), len(destinations)
+    distance = new_matrix(rows, cols, 'd', float('nan'))
+    duration = new_matrix(rows, cols, 'd', float('nan'))
+    status = new_matrix(rows, cols, 'i', 0)
+
+    def request(job):
+        i, j = job
+        sub_origins = origins[i:i + tile]
+        sub_destinations = destinations[j:j + tile]
+        params = apis.prepare(apis.route_matrix, sub_origins,
+                              sub_destinations, **kwargs)
+        try:
+            response = client.fetch(params)
+        except exceptions.StatusError as e:
+            if not skip_errors:
+                raise
+            return job, len(sub_destinations), [], int(e.status)
+
+        cells = parse.parse_drx(response)
+        if isinstance(cells, dict):
+            cells = [cells]
+        return job, len(sub_destinations), cells, 0
+
+    jobs = [(i, j) for i in range(0, rows, tile) for j in range(0, cols, tile)]
+    for (i, j), width, cells, failed in run_ordered(request, jobs, workers):
+        if failed:
+            for k in range(i, min(i + tile, rows)):
+                for l in range(j, j + width):
+                    status[k][l] = failed
+        for n, cell in enumerate(cells):
+            k, l = i + n // width, j + n % width
+            if 'distance' in cell:
+                distance[k][l] = cell['distance']
+                duration[k][l] = cell['duration']
+            else:
+                status[k][l] = int(cell['status'])
+
+    if typed:
+        matrix = records.RouteMatrix(rows, cols)
+        for i in range(rows):
+            start = i * cols
+            matrix.distance[start:start + cols] = array.array('d',
+                                                              distance[i])
+            matrix.duration[start:start + cols] = array.array('d',
+                                                              duration[i])
+            matrix.status[start:start + cols] = array.array('i', status[i])
+        return matrix
+    return {'distance': distance, 'duration': duration, 'status': status}
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# seconds a successful response stays fresh, keyed like exceptions.messages;
+# None means it never expires.
+default_ttls = {'geoconv': None,
+                'geocoder': 30 * DAY,
+                'placesearch': DAY,
+                'placedetail': DAY,
+                'placesuggestion': DAY,
+                'placeeventsearch': 10 * MINUTE,
+                'placeeventdetail': 10 * MINUTE,
+                'direction': HOUR,
+                'directionroutematrix': HOUR,
+                'locationip': DAY}
+
+
+class Cache(object):
+    """Common part of the response caches: time to live per service and
+        hit/miss counters. "ttls" updates default_ttls; services not listed
+        there live "default_ttl" seconds.
+
+    Attention! Only responses with status 0 are stored. Keys are built by
+        Client.request_key() and never contain "ak", so a cache may be shared
+        by clients with different keys.
+    """
+
+    def __init__(self, ttls=None, default_ttl=DAY):
+        self.ttls = dict(default_ttls)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.clock = time.time
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = 0
+
+    def expires_at(self, service):
+        ttl = self.ttls.get(service, self.default_ttl)
+        return None if ttl is None else self.clock() + ttl
+
+    def stats(self):
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {'size': len(self), 'hits': hits, 'misses': misses,
+                'hit_rate': float(hits) / (hits + misses) if hits else 0.0,
+                'evictions': self.evictions}
+
+
+class MemoryCache(Cache):
+    """In-process cache of raw response bodies for Client.get(), with LRU
+        eviction once "maxsize" entries are held.
+    """
+
+    def __init__(self, maxsize=10000, ttls=None, default_ttl=DAY):
+        Cache.__init__(self, ttls, default_ttl)
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, service, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                expires, body = entry[:2]
+                if expires is None or expires > self.clock():
+                    self.entries[key] = entry     # most recently used again
+                    self.hits[service] += 1
+                    return body
+            self.misses[service] += 1
+            return None
+
+    def set(self, service, key, body):
+        expires = self.expires_at(service)
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (expires, body, service)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def items(self, service=None):
+        """Fresh (key, body) pairs, of "service" only if given."""
+        now = self.clock()
+        with self.lock:
+            entries = list(self.entries.items())
+        for key, (expires, body, name) in entries:
+            if (expires is None or expires > now) and \
+                    (service is None or service == name):
+                yield key, body
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class SQLiteCache(Cache):
+    """On-disk cache of raw response bodies for Client.get(), kept in the
+        SQLite database at "path", so it survives restarts and is shared by
+        every process pointing at the same file.
+
+    Attention! The database runs in WAL mode: readers never block, and
+        concurrent writers from other threads or processes wait up to
+        "timeout" seconds for the lock. Expired entries are only skipped on
+        lookup; run compact() now and then, or
+        "python -m baidumaps.cache compact <path>", to delete them.
+    """
+
+    def __init__(self, path, ttls=None, default_ttl=DAY, timeout=30):
+        Cache.__init__(self, ttls, default_ttl)
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()     # one connection per thread
+        conn = self.connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS responses '
+                     '(key TEXT PRIMARY KEY, service TEXT NOT NULL, '
+                     'expires REAL, body BLOB NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS responses_expires '
+                     'ON responses (expires)')
+        conn.commit()
+
+    def connect(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self.connect().execute(
+            'SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def get(self, service, key):
+        row = self.connect().execute(
+            'SELECT body FROM responses WHERE key = ? AND '
+            '(expires IS NULL OR expires > ?)',
+            (key, self.clock())).fetchone()
+        if row is None:
+            self.misses[service] += 1
+            return None
+        self.hits[service] += 1
+        return bytes(row[0])
+
+    def items(self, service=None):
+        """Fresh (key, body) pairs, of "service" only if given."""
+        query = ('SELECT key, body FROM responses WHERE '
+                 '(expires IS NULL OR expires > ?)')
+        args = (self.clock(),)
+        if service is not None:
+            query += ' AND service = ?'
+            args += (service,)
+        for key, body in self.connect().execute(query, args):
+            yield key, bytes(body)
+
+    def set(self, service, key, body):
+        conn = self.connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO responses '
+                         '(key, service, expires, body) VALUES (?, ?, ?, ?)',
+                         (key, service, self.expires_at(service),
+                          sqlite3.Binary(body)))
+
+    def clear(self):
+        conn = self.connect()
+        with conn:
+            conn.execute('DELETE FROM responses')
+
+    def compact(self):
+        """Deletes expired entries and gives their space back to the disk.
+            Returns the number of deleted entries.
+        """
+        conn = self.connect()
+        with conn:
+            deleted = conn.execute(
+                'DELETE FROM responses WHERE expires <= ?',
+                (self.clock(),)).rowcount
+        self.evictions += deleted
+        conn.execute('VACUUM')
+        return deleted
+
+    def close(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+
+def main(argv):
+    if len(argv) != 2 or argv[0] != 'compact' or not os.path.exists(argv[1]):
+        sys.stderr.write('usage: python -m baidumaps.cache compact <path>\n')
+        return 2
+    cache = SQLiteCache(argv[1])
+    deleted = cache.compact()
+    sys.stdout.write('deleted %d expired entries, %d left.\n'
+                     % (deleted, len(cache)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Record and replay of raw responses, to rerun a pipeline offline without
+spending quota, e.g. for profiling or regression tests.
+
+Both are transports wrapped around the requests of Client, which records
+with "record=<path>" and replays with "replay=<path>". Recordings are keyed
+by the request url without its host and "ak", with a sorted query, so they
+replay under any domain or key.
+
+A recording is two files: "<path>", append-only records of
+    key length, body length (two little-endian uint32), key, body
+and "<path>.idx", written on close, the records' (key hash, offset) pairs
+sorted by hash behind a header. Replay memory-maps both and binary searches
+the index, so millions of entries are served without loading the file.
+Indexing keeps the pairs as packed uint64s, sorted with NumPy when it is
+installed, rather than as Python tuples.
+"""
+
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from urlparse import urlparse, parse_qsl
+    from urllib import urlencode
+except ImportError:     # Python 3
+    from urllib.parse import urlparse, parse_qsl, urlencode
+
+RECORD = struct.Struct('<II')
+ENTRY = struct.Struct('<QQ')
+HEADER = struct.Struct('<8sQQ')     # magic, data bytes indexed, entries
+MAGIC = b'BDMCAS01'
+
+
+class MissingRecording(LookupError):
+    """The replayed recording holds no response for this request."""
+
+
+def recording_key(url):
+    """Path and sorted query of "url", without "ak", as bytes."""
+    parts = urlparse(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, True)
+                   if k != 'ak')
+    key = parts.path + '?' + urlencode(query)
+    return key.encode('utf-8')
+
+
+def key_hash(key):
+    return struct.unpack('<Q', hashlib.sha1(key).digest()[:8])[0]
+
+
+def scan(data, start):
+    """Yields (key, offset, end) of the complete records of "data" from "start"
+        on; a truncated last record, left by a crash, is ignored.
+    """
+    offset = start
+    size = len(data)
+    while offset + RECORD.size <= size:
+        key_size, body_size = RECORD.unpack_from(data, offset)
+        end = offset + RECORD.size + key_size + body_size
+        if end > size:
+            break
+        start = offset + RECORD.size
+        yield data[start:start + key_size], offset, end
+        offset = end
+
+
+def read_index(path):
+    """(data bytes indexed, array('Q') of hash, offset, hash, offset, ...)
+        of an index file, or (0, empty array) if it is missing or unreadable.
+    """
+    entries = array('Q')
+    try:
+        with open(path + '.idx', 'rb') as f:
+            raw = f.read()
+        magic, indexed, count = HEADER.unpack_from(raw, 0)
+    except (IOError, OSError, struct.error):
+        return 0, entries
+    if magic != MAGIC or len(raw) != HEADER.size + count * ENTRY.size:
+        return 0, entries
+    entries.frombytes(raw[HEADER.size:])
+    if sys.byteorder == 'big':
+        entries.byteswap()
+    return indexed, entries
+
+
+def merge(entries, hashes, offsets):
+    """Packed entries of "entries", already sorted, and of the new
+        "hashes" and "offsets", sorted by hash then offset, so that the
+        records of a same hash stay in file order.
+    """
+    if np is not None:
+        pairs = np.empty((len(entries) // 2 + len(hashes), 2), '<u8')
+        pairs[:len(entries) // 2] = np.frombuffer(
+            entries, np.uint64).reshape(-1, 2)
+        pairs[len(entries) // 2:, 0] = np.frombuffer(hashes, np.uint64)
+        pairs[len(entries) // 2:, 1] = np.frombuffer(offsets, np.uint64)
+        # stable, and new offsets come after the indexed ones.
+        return pairs[np.argsort(pairs[:, 0], kind='stable')].tobytes()
+
+    new = sorted(h << 64 | o for h, o in zip(hashes, offsets))
+    old = (entries[i] << 64 | entries[i + 1]
+           for i in range(0, len(entries), 2))
+    merged = array('Q')
+    for key in heapq.merge(old, new):
+        merged.append(key >> 64)
+        merged.append(key & 0xffffffffffffffff)
+    if sys.byteorder == 'big':
+        merged.byteswap()
+    return merged.tobytes()
+
+
+def build_index(path):
+    """Brings "<path>.idx" up to date with "<path>", scanning only the
+        records appended since it was written. Returns the number of entries.
+    """
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    indexed, entries = read_index(path)
+    if indexed > size:      # data file replaced: start over
+        indexed, entries = 0, array('Q')
+    hashes, offsets = array('Q'), array('Q')
+    if indexed < size:
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                for key, offset, end in scan(data, indexed):
+                    hashes.append(key_hash(key))
+                    offsets.append(offset)
+                    indexed = end
+            finally:
+                data.close()
+    count = len(entries) // 2 + len(hashes)
+
+    temp = path + '.idx.tmp'
+    with open(temp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, indexed, count))
+        f.write(merge(entries, hashes, offsets))
+    if os.path.exists(path + '.idx'):
+        os.remove(path + '.idx')
+    os.rename(temp, path + '.idx')
+    return count
+
+
+class Recorder(object):
+    """Transport appending every response body fetched by "transport" to the
+        recording at "path", errors included, so they replay too. close()
+        writes the index; a recording left without one, e.g. after a crash,
+        is indexed when replayed.
+    """
+
+    def __init__(self, path, transport):
+        self.path = path
+        self.transport = transport
+        self.file = open(path, 'ab')
+        self.lock = threading.Lock()
+        self.recorded = 0
+
+    def get(self, url):
+        body = self.transport.get(url)
+        key = recording_key(url)
+        with self.lock:
+            self.file.write(RECORD.pack(len(key), len(body)) + key + body)
+            self.recorded += 1
+        return body
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+                build_index(self.path)
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+
+class Player(object):
+    """Transport answering from the recording at "path" instead of the
+        network, after sleeping "latency" seconds (a number, or a function
+        returning one, e.g. lambda: random.uniform(0.02, 0.2)). Requests
+        which were never recorded raise MissingRecording.
+    """
+
+    def __init__(self, path, latency=0.0):
+        self.path = path
+        self.latency = latency
+        self.sleep = time.sleep
+        if read_index(path)[0] != os.path.getsize(path):
+            build_index(path)
+        self.files = [open(path, 'rb'), open(path + '.idx', 'rb')]
+        self.data, self.index = [
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.fstat(f.fileno()).st_size else b'' for f in self.files]
+        self.count = HEADER.unpack_from(self.index, 0)[2]
+
+    def __len__(self):
+        return self.count
+
+    def find(self, key):
+        """Body recorded under "key", or None. The last one wins when a key
+            was recorded several times.
+        """
+        target = key_hash(key)
+        lo, hi = 0, self.count
+        while lo < hi:      # first entry with hash >= target
+            mid = (lo + hi) // 2
+            if ENTRY.unpack_from(self.index,
+                                 HEADER.size + mid * ENTRY.size)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        body = None
+        while lo < self.count:
+            hash_, offset = ENTRY.unpack_from(self.index,
+                                              HEADER.size + lo * ENTRY.size)
+            if hash_ != target:
+                break
+            key_size, body_size = RECORD.unpack_from(self.data, offset)
+            start = offset + RECORD.size
+            if self.data[start:start + key_size] == key:
+                start += key_size
+                body = self.data[start:start + body_size]
+            lo += 1
+        return body
+
+    def get(self, url):
+        body = self.find(recording_key(url))
+        if body is None:
+            raise MissingRecording(url)
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            self.sleep(latency)
+        return body
+
+    def close(self):
+        for view in (self.data, self.index):
+            if isinstance(view, mmap.mmap):
+                view.close()
+        for f in self.files:
+            f.close()
@@ -8,70 +8,394 @@
 
 # THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-import urllib
-import requests
+import json
 import re
+import time
 import baidumaps
 from baidumaps import apis
+from baidumaps import bulk
+from baidumaps import cassette
+from baidumaps import columns
+from baidumaps import coordconv
+from baidumaps import crawl
 from baidumaps import exceptions
+from baidumaps import geometry
+from baidumaps import paging
 from baidumaps import parse
+from baidumaps import records
+from baidumaps.keypool import KeyPool
+from baidumaps.singleflight import SingleFlight
+from baidumaps.transport import Transport
+
+try:
+    from urllib import urlencode
+except ImportError:     # Python 3
+    from urllib.parse import urlencode
+
+# arguments handled by the client itself, never sent to Baidu.
+local_options = ('raw', 'typed', 'lazy')
+# arguments making up the base url rather than the query.
+url_parts = ('server_name', 'version', 'subserver_name')
+not_query = frozenset(url_parts + local_options)
+# Baidu puts "status" first: reading it there spares decoding the body to
+# know whether the call failed.
+status_head = re.compile(br'\s*\{\s*"status"\s*:\s*(\d+)\s*[,}]')
+
+
+def peek_status(body):
+    """Status of raw "body" read from its head, or None if it is not there.
+    """
+    match = status_head.match(body[:64])
+    return int(match.group(1)) if match else None
+
+
+def make_decoder(decoder):
+    if decoder is None:
+        return json.loads
+    if decoder == 'orjson':
+        from orjson import loads
+        return loads
+    if not callable(decoder):
+        raise ValueError('"decoder" must be None, \'orjson\' or a function.')
+    return decoder
 
 
 class Client(object):
     def __init__(self, ak=None, domain='http://api.map.baidu.com',
-                 output='json'):
+                 output='json', transport=None, pool_size=10, timeout=10,
+                 cache=None, coalesce=False, rate_limiter=None, retry=None,
+                 local_geoconv=False, reverse_index=None,
+                 decoder=None, metrics=None, record=None, replay=None,
+                 breaker=None, adaptive_limit=None):
         if not ak:
             raise ValueError("Must provide API when creating client. Refer to\
                              the link: http://lbsyun.baidu.com/apiconsole/key")
 
-        if ak and not re.search(r'^[a-zA-Z0-9]+$', ak):
-            raise ValueError('Invalid ak(API key)!')
+        # several keys, as a list or a KeyPool, are spread over requests.
+        self.key_pool = None
+        if isinstance(ak, (list, tuple)):
+            ak = KeyPool(ak)
+        if isinstance(ak, KeyPool):
+            self.key_pool = ak
+            aks = ak.aks
+        else:
+            aks = [ak]
+
+        for key in aks:
+            if not re.search(r'^[a-zA-Z0-9]+$', key):
+                raise ValueError('Invalid ak(API key)!')
 
-        self.ak = ak
+        self.ak = aks[0]
         self.domain = domain
         self.output = output
+        # "replay" answers from a recording instead of the network (a path,
+        # or a cassette.Player for simulated latency); "record" appends every
+        # response to a recording at that path.
+        if replay is not None and not isinstance(replay, cassette.Player):
+            replay = cassette.Player(replay)
+        # any object with a get(url) method returning raw body will do.
+        if replay is not None:
+            transport = replay
+        elif transport is None:
+            transport = Transport(pool_size=pool_size, timeout=timeout)
+        self.transport = transport
+        if record is not None:
+            self.transport = cassette.Recorder(record, self.transport)
+        # e.g. cache.MemoryCache(); any object with get(service, key) and
+        # set(service, key, body) methods will do.
+        self.cache = cache
+        # share one request among concurrent identical calls.
+        self.single_flight = SingleFlight() if coalesce else None
+        # e.g. ratelimit.RateLimiter(qps={'geocoder': 30}).
+        self.rate_limiter = rate_limiter
+        # e.g. retry.RetryPolicy(max_attempts=3, hedge_percentile=0.95).
+        self.retry = retry
+        # answer geoconv() locally when "from"/"to" allow it.
+        if local_geoconv and coordconv.np is None:
+            raise ImportError('"local_geoconv" needs NumPy.')
+        self.local_geoconv = local_geoconv
+        # e.g. spatial.ReverseGeocodeIndex(radius=50): answers reverse
+        # geocoding near points already resolved.
+        self.reverse_index = reverse_index
+        # turns a raw body into Python objects: json.loads, unless "decoder"
+        # is 'orjson' (needs the orjson package) or another loads function.
+        self.decode = make_decoder(decoder)
+        # e.g. breaker.CircuitBreaker(error_rate=0.5, latency=2): stops
+        # sending to a failing service for a while.
+        self.breaker = breaker
+        # e.g. breaker.AdaptiveLimit(): caps requests in flight per service.
+        self.adaptive_limit = adaptive_limit
+        # e.g. metrics.Metrics(): hooks timing each phase of a request.
+        self.metrics = metrics
+        # base url per (server_name, version, subserver_name).
+        self.base_urls = {}
+
+    def close(self):
+        """Closes the transport, which writes the index of a recording."""
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
 
     def get(self, params):
-        request_url = self.generate_url(params)
-        response = requests.get(request_url).json()
+        if self.metrics is None:
+            return self.build_result(params, self.fetch(params))
+
+        start = time.time()
+        result = self.build_result(params, self.fetch(params))
+        self.metrics.phase(params['server_name'] + params['subserver_name'],
+                           'total', time.time() - start)
+        return result
+
+    def fetch(self, params):
+        """Blocking network part of get(): sends the request and returns the
+            decoded response, raising StatusError if status is not 0.
+        """
+        body, response = self.fetch_body(params)
+        if response is not None:
+            return response
+        if self.metrics is None:
+            return self.decode(body)
+        start = time.time()
+        response = self.decode(body)
+        self.metrics.phase(params['server_name'] + params['subserver_name'],
+                           'decode', time.time() - start)
+        return response
+
+    def fetch_body(self, params):
+        """Same as fetch(), but returns (body, response), leaving "response"
+            None when the raw body was not decoded (its status could be read
+            without it, or it came from cache, reverse_index or another
+            coalesced call), and "body" None when the response was computed
+            locally.
+        """
+        service = params['server_name'] + params['subserver_name']
+        if self.local_geoconv and service == 'geoconv':
+            response = coordconv.geoconv_response(params)
+            if response is not None:
+                return None, response
+
+        if self.reverse_index is not None:
+            point = self.reverse_point(params)
+            if point is not None:
+                body = self.reverse_index.lookup(*point)
+                if body is not None:
+                    return body, None
 
-        status = response['status']
+        key = None
+        if self.cache is not None or self.single_flight is not None:
+            key = self.request_key(params)
+
+        if self.cache is not None:
+            body = self.cache.get(service, key)
+            if self.metrics is not None:
+                self.metrics.cache(service, body is not None)
+            if body is not None:
+                return body, None
+
+        if self.single_flight is None:
+            return self.send(params, service, key)
+        (body, response), leader = self.single_flight.do(
+            key, lambda: self.send(params, service, key))
+        # followers decode their own copy, as parse() alters the response.
+        return (body, response) if leader else (body, None)
+
+    def send(self, params, service, key):
+        if self.retry is None:
+            return self.try_send(params, service, key)
+        return self.retry.call(lambda: self.try_send(params, service, key),
+                               service)
+
+    def try_send(self, params, service, key):
+        if self.key_pool is None:
+            return self.send_with(self.ak, params, service, key)
+
+        # fail over to the other keys when one is refused.
+        tried = set()
+        error = None
+        while True:
+            ak = self.key_pool.choose(params['server_name'],
+                                      self.rate_limiter, tried)
+            if ak is None:
+                raise error
+            try:
+                return self.send_with(ak, params, service, key)
+            except exceptions.StatusError as e:
+                if not exceptions.is_key_status(e.status):
+                    raise
+                self.key_pool.cool_down(ak, params['server_name'])
+                tried.add(ak)
+                error = e
+
+    def send_with(self, ak, params, service, key):
+        admit = None
+        if self.rate_limiter is not None:
+            def admit():
+                self.rate_limiter.acquire(ak, params['server_name'],
+                                          params['subserver_name'])
+        if self.breaker is None and self.adaptive_limit is None:
+            if admit is not None:
+                admit()
+            return self.exchange(ak, params, service, key)
+        return self.guarded(service,
+                            lambda: self.exchange(ak, params, service, key),
+                            admit)
+
+    def guarded(self, service, func, admit=None):
+        """Runs func() under the circuit breaker and the adaptive
+            concurrency limit, feeding them its latency and outcome.
+
+        "admit" (the rate limiter) only runs once both let the call go, so
+            rejected calls use no token and no quota; if it raises, the call
+            is not sent and counts for neither.
+        """
+        if self.breaker is not None:
+            self.breaker.before(service)
+        if self.adaptive_limit is not None:
+            started = self.adaptive_limit.acquire(service)
+        if admit is not None:
+            try:
+                admit()
+            except Exception:
+                if self.adaptive_limit is not None:
+                    self.adaptive_limit.cancel(service)
+                if self.breaker is not None:
+                    self.breaker.cancel(service)
+                raise
+        start = time.time()
+        error = None
+        try:
+            return func()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            seconds = time.time() - start
+            if self.adaptive_limit is not None:
+                self.adaptive_limit.release(service, started, seconds, error)
+            if self.breaker is not None:
+                self.breaker.after(service, seconds, error)
+
+    def exchange(self, ak, params, service, key):
         server_name = params['server_name']
-        subserver_name = params['subserver_name']
+        metrics = self.metrics
+        if metrics is not None:
+            began = time.time()
+        request_url = self.generate_url(params, ak)
+        start = time.time()
+        body = self.transport.get(request_url)
+        done = time.time()
+        if self.key_pool is not None:
+            self.key_pool.report(ak, done - start)
+        response = None
+        status = peek_status(body)
+        if status is None:
+            response = self.decode(body)
+            status = response['status']
+
+        if metrics is not None:
+            metrics.phase(service, 'url', start - began)
+            metrics.phase(service, 'network', done - start)
+            if response is not None:
+                metrics.phase(service, 'decode', time.time() - done)
+            metrics.response(service, len(body))
+            metrics.status(service, status)
         if status != 0:
-            raise exceptions.StatusError(server_name, subserver_name, status)
-        elif 'raw' in params and params['raw']:
+            if (self.rate_limiter is not None and
+                    exceptions.is_quota_status(status)):
+                self.rate_limiter.exhaust(ak, server_name)
+            raise exceptions.StatusError(server_name,
+                                         params['subserver_name'], status)
+        if self.cache is not None:
+            self.cache.set(service, key, body)
+        if self.reverse_index is not None:
+            point = self.reverse_point(params)
+            if point is not None:
+                self.reverse_index.add(*(point + (body,)))
+        return body, response
+
+    def reverse_point(self, params):
+        """(namespace, lng, lat) of a reverse geocoding request for the
+            reverse_index, None for any other request.
+        """
+        if params['server_name'] != 'geocoder' or 'location' not in params:
+            return None
+        try:
+            lat, lng = map(float, params['location'].split(','))
+        except ValueError:
+            return None
+        temp = params.copy()
+        temp.pop('location')
+        return self.request_key(temp), lng, lat
+
+    def build_result(self, params, response):
+        if self.metrics is not None:
+            start = time.time()
+        if 'raw' in params and params['raw']:
             result = response
+        elif 'typed' in params and params['typed']:
+            result = records.parse_typed(self, params['server_name'],
+                                         params['subserver_name'], response,
+                                         params)
+        elif 'lazy' in params and params['lazy']:
+            result = parse.parse_lazy(self, params['server_name'],
+                                      params['subserver_name'], response)
         else:
-            result = self.parse(server_name, subserver_name, response)
+            result = self.parse(params['server_name'],
+                                params['subserver_name'], response)
+        if self.metrics is not None:
+            self.metrics.phase(params['server_name'] +
+                               params['subserver_name'], 'parse',
+                               time.time() - start)
         return result
 
-    def generate_url(self, params):
-        base_url = '/'.join([self.domain,
-                            params['server_name'],
-                            params['version'],
-                            params['subserver_name']]
-                            ) + '?'
-        base_url = re.sub(r'//ip', '/ip', base_url)   # for ip_locate()
+    def split_params(self, params):
+        service = (params['server_name'], params['version'],
+                   params['subserver_name'])
+        base_url = self.base_urls.get(service)
+        if base_url is None:
+            base_url = '/'.join((self.domain,) + service) + '?'
+            base_url = re.sub(r'//ip', '/ip', base_url)   # for ip_locate()
+            self.base_urls[service] = base_url
+
+        # a new dict, to avoid altering argument 'params'
+        temp = dict((key, value) for key, value in params.items()
+                    if key not in not_query)
+        return base_url, temp
 
-        temp = params.copy()    # avoid altering argument 'params'
-        {temp.pop(key) for key in ['server_name', 'version', 'subserver_name']}
-        temp.update({'ak': self.ak, 'output': self.output})
-        addi_url = urllib.urlencode(temp)
+    def generate_url(self, params, ak=None):
+        base_url, temp = self.split_params(params)
+        temp['ak'] = ak or self.ak
+        temp['output'] = self.output
+        return base_url + urlencode(temp)
 
-        return base_url + addi_url
+    def request_key(self, params):
+        """Same as generate_url(), but without "ak" and with sorted query, so
+            that equal requests get equal keys whatever the key or arguments
+            order.
+        """
+        base_url, temp = self.split_params(params)
+        temp['output'] = self.output
+        return base_url + urlencode(sorted(temp.items()))
 
 
 Client.place_search = apis.place_search
+Client.place_search_iter = paging.place_search_iter
+Client.place_crawl = crawl.place_crawl
 Client.place_detail = apis.place_detail
 Client.place_eventsearch = apis.place_eventsearch
+Client.place_eventsearch_iter = paging.place_eventsearch_iter
 Client.place_eventdetail = apis.place_eventdetail
 Client.place_suggest = apis.place_suggest
 Client.geocode = apis.geocode
+Client.geocode_columns = columns.geocode_columns
 Client.direct = apis.direct
 Client.ip_locate = apis.ip_locate
 Client.route_matrix = apis.route_matrix
+Client.route_matrix_tiled = bulk.route_matrix_tiled
+Client.route_matrix_columns = columns.route_matrix_columns
+Client.route_nearest = geometry.route_nearest
 Client.geoconv = apis.geoconv
+Client.geoconv_bulk = bulk.geoconv_bulk
+Client.geoconv_columns = columns.geoconv_columns
 Client.parse = parse.parse
 
 
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Array-native entry points: coordinates as lng/lat columns (NumPy arrays,
+pandas Series or any sequence) and addresses as a column of str, validated
+and formatted in bulk instead of one element at a time by apis.py.
+
+Results are columnar: a dict of NumPy arrays, or, when an input is a pandas
+Series, a DataFrame on the index of that input. Rows Baidu refuses hold
+their status and NaN/None values instead of raising, and rows with a missing
+address hold status -1 and are not sent.
+"""
+
+from baidumaps import apis
+from baidumaps import bulk
+from baidumaps import coordconv
+from baidumaps import exceptions
+from baidumaps import records
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+MISSING = -1    # status of rows not sent for lack of input
+text_types = (str, type(u''))
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError('array entry points need NumPy.')
+
+
+def index_of(*columns):
+    """Index of the first pandas Series among "columns", or None."""
+    if pd is not None:
+        for column in columns:
+            if isinstance(column, pd.Series):
+                return column.index
+    return None
+
+
+def as_table(data, index):
+    if index is None:
+        return data
+    return pd.DataFrame(data, index=index)
+
+
+def check_points(lng, lat, name='points'):
+    """Float64 arrays of "lng" and "lat", checked all at once."""
+    require_numpy()
+    lng = np.asarray(lng, dtype=np.float64).ravel()
+    lat = np.asarray(lat, dtype=np.float64).ravel()
+    if lng.shape != lat.shape:
+        raise ValueError('"%s" incorrect! %d lng for %d lat.'
+                         % (name, len(lng), len(lat)))
+    bad = ~(np.isfinite(lng) & np.isfinite(lat) & (np.abs(lng) <= 180) &
+            (np.abs(lat) <= 90))
+    if bad.any():
+        row = int(np.argmax(bad))
+        raise ValueError('"%s" incorrect! row %d is <%r, %r>.'
+                         % (name, row, lng[row], lat[row]))
+    return lng, lat
+
+
+def format_pairs(first, second):
+    """["first,second", ...] in one pass, with 8 decimals (about 1 mm)."""
+    return ['%.8f,%.8f' % pair for pair in zip(first.tolist(),
+                                               second.tolist())]
+
+
+def geocode_columns(client, addresses=None, lng=None, lat=None, workers=10,
+                    **kwargs):
+    """This module geocodes a column of "addresses", or reverse geocodes
+        columns "lng" and "lat", running the requests on "workers" threads.
+        Other keyword arguments are passed to every request.
+
+    Attention! It returns columns "lng", "lat", "precise", "confidence",
+        "level" and "status" for addresses, and "formatted_address",
+        "business", "province", "city", "district", "city_code" and "status"
+        for locations.
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/webservice-geocoding
+    """
+
+    require_numpy()
+    kwargs['raw'] = True
+    if addresses is not None:
+        index = index_of(addresses)
+        if hasattr(addresses, 'tolist'):
+            addresses = addresses.tolist()
+        template = apis.prepare(apis.geocode, address='-', **kwargs)
+        jobs = [dict(template, address=a)
+                if isinstance(a, text_types) and a else None
+                for a in addresses]
+    elif lng is not None and lat is not None:
+        index = index_of(lng, lat)
+        lng, lat = check_points(lng, lat, 'location')
+        template = apis.prepare(apis.geocode, location=[0, 0], **kwargs)
+        jobs = [dict(template, location=l) for l in format_pairs(lat, lng)]
+    else:
+        raise ValueError('please assign either "addresses" or "lng" and '
+                         '"lat".')
+
+    def request(params):
+        if params is None:
+            return None, MISSING
+        try:
+            return client.fetch(params)['result'], 0
+        except exceptions.StatusError as e:
+            return None, int(e.status)
+
+    rows = len(jobs)
+    status = np.zeros(rows, dtype=np.int32)
+    data = {}
+    if addresses is not None:
+        for name in ('lng', 'lat'):
+            data[name] = np.full(rows, np.nan)
+        for name in ('precise', 'confidence'):
+            data[name] = np.full(rows, -1, dtype=np.int32)
+        data['level'] = [None] * rows
+    else:
+        for name in ('formatted_address', 'business', 'province', 'city',
+                     'district'):
+            data[name] = [None] * rows
+        data['city_code'] = np.full(rows, -1, dtype=np.int32)
+
+    for k, (result, code) in enumerate(bulk.run_ordered(request, jobs,
+                                                        workers)):
+        status[k] = code
+        if result is None:
+            continue
+        if addresses is not None:
+            location = result.get('location') or {}
+            data['lng'][k] = location.get('lng', np.nan)
+            data['lat'][k] = location.get('lat', np.nan)
+            data['precise'][k] = result.get('precise', -1)
+            data['confidence'][k] = result.get('confidence', -1)
+            data['level'][k] = result.get('level')
+        else:
+            component = result.get('addressComponent') or {}
+            data['formatted_address'][k] = result.get('formatted_address')
+            data['business'][k] = result.get('business')
+            for name in ('province', 'city', 'district'):
+                data[name][k] = component.get(name)
+            data['city_code'][k] = result.get('cityCode', -1)
+
+    data['status'] = status
+    return as_table(data, index)
+
+
+def geoconv_columns(client, lng, lat, workers=10, chunk_size=100, **kwargs):
+    """This module converts columns "lng" and "lat" like geoconv_bulk(),
+        returning columns "lng" and "lat". Other keyword arguments, such as
+        "from" and "to", are passed to every geoconv() request.
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/changeposition
+    """
+
+    if chunk_size > 100:
+        raise ValueError('"chunk_size" incorrect! upper limits is 100.')
+    index = index_of(lng, lat)
+    lng, lat = check_points(lng, lat, 'coords')
+    from_ = kwargs.get('from', coordconv.WGS84)
+    to = kwargs.get('to', coordconv.BD09)
+    if getattr(client, 'local_geoconv', False) and \
+            coordconv.supports(from_, to):
+        out = coordconv.convert(np.column_stack([lng, lat]), from_, to)
+        return as_table({'lng': out[:, 0], 'lat': out[:, 1]}, index)
+
+    kwargs['raw'] = True
+    template = apis.prepare(apis.geoconv, '0,0', **kwargs)
+    coords = format_pairs(lng, lat)
+    jobs = [(start, ';'.join(coords[start:start + chunk_size]))
+            for start in range(0, len(coords), chunk_size)]
+
+    def convert(job):
+        start, text = job
+        result = client.fetch(dict(template, coords=text))['result']
+        expected = min(chunk_size, len(coords) - start)
+        if len(result) != expected:
+            raise ValueError('geoconv returned %d points for %d coords.'
+                             % (len(result), expected))
+        return start, [rr['x'] for rr in result], [rr['y'] for rr in result]
+
+    out_lng = np.empty(len(coords))
+    out_lat = np.empty(len(coords))
+    for start, xs, ys in bulk.run_ordered(convert, jobs, workers):
+        out_lng[start:start + len(xs)] = xs
+        out_lat[start:start + len(ys)] = ys
+    return as_table({'lng': out_lng, 'lat': out_lat}, index)
+
+
+def route_matrix_columns(client, origin_lng, origin_lat, destination_lng,
+                         destination_lat, **kwargs):
+    """This module requests the routes matrix from columns of origins to
+        columns of destinations, through route_matrix_tiled(), to which other
+        keyword arguments are passed.
+
+    Attention! It returns the N x M "distance", "duration" and "status"
+        arrays of route_matrix_tiled() (a records.RouteMatrix with
+        "typed=True"), or, for pandas inputs, a DataFrame of those three
+        columns on the (origin, destination) product of their indexes.
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/route-matrix-api
+    """
+
+    origin_index = index_of(origin_lng, origin_lat)
+    destination_index = index_of(destination_lng, destination_lat)
+    origin_lng, origin_lat = check_points(origin_lng, origin_lat, 'origins')
+    destination_lng, destination_lat = check_points(
+        destination_lng, destination_lat, 'destinations')
+
+    # formatted "lat,lng" strings go through route_matrix() as they are.
+    matrix = bulk.route_matrix_tiled(
+        client, format_pairs(origin_lat, origin_lng),
+        format_pairs(destination_lat, destination_lng), **kwargs)
+    if origin_index is None and destination_index is None:
+        return matrix
+    if isinstance(matrix, records.RouteMatrix):
+        matrix = matrix.to_numpy()
+
+    if origin_index is None:
+        origin_index = pd.RangeIndex(len(origin_lng))
+    if destination_index is None:
+        destination_index = pd.RangeIndex(len(destination_lng))
+    index = pd.MultiIndex.from_product([origin_index, destination_index],
+                                       names=['origin', 'destination'])
+    return pd.DataFrame(dict((name, np.asarray(values).ravel())
+                             for name, values in matrix.items()),
+                        index=index)
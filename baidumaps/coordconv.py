@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Offline, vectorized conversion between WGS84, GCJ-02 and BD-09 coords.
+
+Codes follow the "from"/"to" arguments of the Geoconv API: 1 for WGS84
+(GPS), 3 for GCJ-02 (google, soso, amap...) and 5 for BD-09 (Baidu). The
+formulas are the usual public approximations of the official offsets,
+accurate to a couple of meters inside China; WGS84 points outside China are
+not shifted, as GCJ-02 leaves them alone.
+
+Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/changeposition
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WGS84 = 1
+GCJ02 = 3
+BD09 = 5
+
+# Krasovsky 1940 ellipsoid, used by GCJ-02.
+A = 6378245.0
+EE = 0.00669342162296594323
+X_PI = 3.14159265358979324 * 3000.0 / 180.0
+BLOCK = 8192
+
+
+def supports(from_, to):
+    return int(from_) in (WGS84, GCJ02, BD09) and \
+        int(to) in (WGS84, GCJ02, BD09)
+
+
+def in_china(lng, lat):
+    return (lng > 72.004) & (lng < 137.8347) & (lat > 0.8293) & \
+        (lat < 55.8271)
+
+
+def triple(sin_a):
+    """sin(3a) from sin(a), cheaper than another sine."""
+    return sin_a * (3.0 - 4.0 * sin_a * sin_a)
+
+
+def gcj_offset(lng, lat):
+    """GCJ-02 minus WGS84, in degrees, for WGS84 arrays "lng" and "lat".
+
+    Sines being the costly part, the triple angle formula derives sin(x * pi)
+        from sin(x * pi / 3) and sin(6 * x * pi) from sin(2 * x * pi), likewise
+        for y, and cos(lat) comes from sin(lat) since lat lies in (0, 90).
+    """
+    x = lng - 105.0
+    y = lat - 35.0
+    xpi = x * np.pi
+    ypi = y * np.pi
+
+    sin_x3 = np.sin(xpi / 3.0)
+    sin_2x = np.sin(2.0 * xpi)
+    sin_y3 = np.sin(ypi / 3.0)
+
+    sqrt_x = 0.1 * np.sqrt(np.abs(x))
+    common = (20.0 * triple(sin_2x) + 20.0 * sin_2x) * (2.0 / 3.0) + sqrt_x
+    xy = 0.1 * x * y
+
+    dlat = 3.0 * y
+    dlat += 2.0 * x - 100.0
+    dlat += 0.2 * y * y
+    dlat += xy
+    dlat += common
+    dlat += sqrt_x
+    dlat += (20.0 * triple(sin_y3) + 40.0 * sin_y3 +
+             160.0 * np.sin(ypi / 12.0) + 320.0 * np.sin(ypi / 30.0)) * \
+        (2.0 / 3.0)
+    dlng = 2.0 * y
+    dlng += x + 300.0
+    dlng += 0.1 * x * x
+    dlng += xy
+    dlng += common
+    dlng += (20.0 * triple(sin_x3) + 40.0 * sin_x3 +
+             150.0 * np.sin(xpi / 12.0) + 300.0 * np.sin(xpi / 30.0)) * \
+        (2.0 / 3.0)
+
+    sin_lat = np.sin(lat * (np.pi / 180.0))
+    sin2_lat = sin_lat * sin_lat
+    magic = 1.0 - EE * sin2_lat
+    sqrt_magic = np.sqrt(magic)
+    dlat *= (180.0 / (A * (1.0 - EE) * np.pi)) * magic * sqrt_magic
+    dlng *= (180.0 / (A * np.pi)) * sqrt_magic / np.sqrt(1.0 - sin2_lat)
+
+    outside = ~in_china(lng, lat)
+    if outside.any():
+        dlat[outside] = 0.0
+        dlng[outside] = 0.0
+    return dlng, dlat
+
+
+def wgs_to_gcj(lng, lat):
+    dlng, dlat = gcj_offset(lng, lat)
+    return lng + dlng, lat + dlat
+
+
+def gcj_to_wgs(lng, lat, iterations=2):
+    # no closed form: refine wgs until wgs_to_gcj(wgs) lands on the input;
+    # two rounds land within 5 cm. The offsets are the costly part (eight
+    # sines a point), so this runs at about half the speed of wgs_to_gcj.
+    dlng, dlat = gcj_offset(lng, lat)
+    wgs_lng = lng - dlng
+    wgs_lat = lat - dlat
+    for _ in range(iterations - 1):
+        dlng, dlat = gcj_offset(wgs_lng, wgs_lat)
+        np.subtract(lng, dlng, out=wgs_lng)
+        np.subtract(lat, dlat, out=wgs_lat)
+    return wgs_lng, wgs_lat
+
+
+def ratio(a, r):
+    """a / r, and 0 where r is 0 (the origin) instead of NaN."""
+    return np.divide(a, r, out=np.zeros(np.shape(r)), where=r > 0)
+
+
+def gcj_to_bd(lng, lat):
+    # z * cos(atan2(lat, lng) + d) with cos(atan2) = lng / r, sin = lat / r;
+    # d is below 3e-6, so cos(d) = 1 - d * d / 2 and sin(d) = d exactly
+    # enough in double precision. At r = 0, z only multiplies zeros.
+    r = np.sqrt(lng * lng + lat * lat)
+    z = 1.0 + ratio(0.00002 * np.sin(lat * X_PI), r)
+    d = 0.000003 * np.cos(lng * X_PI)
+    cos_d = 1.0 - 0.5 * d * d
+    return z * (lng * cos_d - lat * d) + 0.0065, \
+        z * (lat * cos_d + lng * d) + 0.006
+
+
+def bd_to_gcj(lng, lat):
+    x = lng - 0.0065
+    y = lat - 0.006
+    r = np.sqrt(x * x + y * y)
+    z = 1.0 - ratio(0.00002 * np.sin(y * X_PI), r)
+    d = -0.000003 * np.cos(x * X_PI)
+    cos_d = 1.0 - 0.5 * d * d
+    return z * (x * cos_d - y * d), z * (y * cos_d + x * d)
+
+
+def convert(coords, from_=WGS84, to=BD09):
+    """Converts "coords", an array-like of shape (N, 2) holding <lng, lat>
+        rows, from coord type "from_" to "to" (1, 3 or 5, as in geoconv()),
+        returning a new float64 array of the same shape.
+    """
+
+    if np is None:
+        raise ImportError('coordconv needs NumPy.')
+    from_, to = int(from_), int(to)
+    if not supports(from_, to):
+        raise ValueError('"from"/"to" incorrect! Local conversion supports 1 \
+                         (WGS84), 3 (GCJ-02) and 5 (BD-09).')
+
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if from_ == to:
+        return coords.copy()
+
+    result = np.empty(coords.shape)
+    # blocks small enough for the temporaries to stay in cache.
+    for start in range(0, len(coords), BLOCK):
+        block = coords[start:start + BLOCK]
+        lng, lat = block[:, 0], block[:, 1]
+        if from_ == WGS84:
+            lng, lat = wgs_to_gcj(lng, lat)
+        elif from_ == BD09:
+            lng, lat = bd_to_gcj(lng, lat)
+        # now in GCJ-02.
+        if to == BD09:
+            lng, lat = gcj_to_bd(lng, lat)
+        elif to == WGS84:
+            lng, lat = gcj_to_wgs(lng, lat)
+        result[start:start + BLOCK, 0] = lng
+        result[start:start + BLOCK, 1] = lat
+    return result
+
+
+def geoconv_response(params):
+    """Answers prepared geoconv() params locally, in the shape of a raw
+        Geoconv API response; None if "from"/"to" are not supported here.
+    """
+
+    from_, to = params.get('from', WGS84), params.get('to', BD09)
+    if not supports(from_, to):
+        return None
+    pairs = [pair.split(',') for pair in params['coords'].split(';')]
+    result = convert([[float(x), float(y)] for x, y in pairs], from_, to)
+    return {'status': 0,
+            'result': [{'x': x, 'y': y} for x, y in result.tolist()]}
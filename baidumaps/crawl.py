@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import threading
+import warnings
+from multiprocessing.pool import ThreadPool
+try:
+    from collections.abc import Mapping
+except ImportError:     # Python 2
+    from collections import Mapping
+from baidumaps import apis
+
+
+class PlaceCrawler(object):
+    """Iterates over every POI matching "query" inside "bounds", however
+        dense. A tile whose search reports "cap" results or more is
+        truncated by the Place API, so it is split into four quadrants which
+        are searched in turn; other tiles are paged through. Tiles of a same
+        level run concurrently on "workers" threads, and POIs are yielded
+        once each, by uid, as tiles complete.
+
+    Attention! Counters "requests", "tiles" and "splits" tell what the crawl
+        cost; "truncated" counts tiles still over the cap once smaller than
+        "min_size" degrees, "max_depth" splits deep or once "max_requests"
+        requests are spent, whose extra POIs could not be reached. Such
+        tiles are paged up to the cap instead of split, and a warning is
+        issued; once the budget is spent, tiles not yet searched are
+        skipped and also counted as truncated.
+    """
+
+    def __init__(self, client, query, bounds, cap=400, page_size=20,
+                 workers=10, min_size=0.0005, max_depth=None,
+                 max_requests=10000, **kwargs):
+        # reuse the validation and <lat, lng> ordering of place_search().
+        params = apis.prepare(apis.place_search, query, bounds=bounds)
+        lat1, lng1, lat2, lng2 = map(float, params['bounds'].split(','))
+        self.root = (min(lng1, lng2), min(lat1, lat2),
+                     max(lng1, lng2), max(lat1, lat2))
+        self.client = client
+        self.query = query
+        self.cap = cap
+        self.page_size = page_size
+        self.workers = workers
+        self.min_size = min_size
+        self.max_depth = max_depth
+        self.max_requests = max_requests
+        self.kwargs = kwargs
+        self.requests = 0
+        self.tiles = 0
+        self.splits = 0
+        self.truncated = 0
+        self.lock = threading.Lock()
+
+    def search(self, tile, page_num):
+        bounds = [[tile[0], tile[1]], [tile[2], tile[3]]]
+        params = apis.prepare(apis.place_search, self.query, bounds=bounds,
+                              page_size=self.page_size, page_num=page_num,
+                              **self.kwargs)
+        response = self.client.fetch(params)
+        with self.lock:
+            self.requests += 1
+        return int(response.get('total', 0)), \
+            self.client.build_result(params, response)
+
+    def spent(self):
+        return self.max_requests is not None and \
+            self.requests >= self.max_requests
+
+    def truncate(self, tile, reason):
+        with self.lock:
+            self.truncated += 1
+        warnings.warn('place_crawl() tile %s truncated: %s'
+                      % (','.join('%.6f' % x for x in tile), reason),
+                      RuntimeWarning)
+
+    def crawl_tile(self, task):
+        """Returns (quadrants, []) for a tile to split, ([], pois) else."""
+        tile, depth = task
+        if self.spent():
+            self.truncate(tile, 'request budget of %d spent, not searched'
+                          % self.max_requests)
+            return [], []
+
+        total, pois = self.search(tile, 0)
+        if total >= self.cap:
+            if min(tile[2] - tile[0], tile[3] - tile[1]) <= self.min_size:
+                self.truncate(tile, 'smaller than min_size')
+            elif self.max_depth is not None and depth >= self.max_depth:
+                self.truncate(tile, 'max_depth of %d reached'
+                              % self.max_depth)
+            elif self.spent():
+                self.truncate(tile, 'request budget of %d spent'
+                              % self.max_requests)
+            else:
+                return [(q, depth + 1) for q in split(tile)], []
+
+        page_num = 1
+        while pois and page_num * self.page_size < min(total, self.cap):
+            page = self.search(tile, page_num)[1]
+            if not page:
+                break
+            pois.extend(page)
+            page_num += 1
+        return [], pois
+
+    def __iter__(self):
+        seen = set()
+        level = [(self.root, 0)]
+        pool = ThreadPool(self.workers)
+        try:
+            while level:
+                self.tiles += len(level)
+                next_level = []
+                for quadrants, pois in pool.imap_unordered(self.crawl_tile,
+                                                           level):
+                    if quadrants:
+                        self.splits += 1
+                        next_level.extend(quadrants)
+                    for poi in pois:
+                        # dicts, or records.POI with "typed=True".
+                        uid = poi.get('uid') if isinstance(poi, Mapping) \
+                            else poi.uid
+                        if uid is not None:
+                            if uid in seen:
+                                continue
+                            seen.add(uid)
+                        yield poi
+                level = next_level
+        finally:
+            pool.terminate()
+
+
+def split(tile):
+    lng1, lat1, lng2, lat2 = tile
+    lng, lat = (lng1 + lng2) / 2, (lat1 + lat2) / 2
+    return [(lng1, lat1, lng, lat), (lng, lat1, lng2, lat),
+            (lng1, lat, lng, lat2), (lng, lat, lng2, lat2)]
+
+
+def place_crawl(client, query, bounds, **kwargs):
+    """This module extracts every POI for "query" inside "bounds", splitting
+        it adaptively wherever place_search() would truncate results. See
+        PlaceCrawler for the arguments; "bounds" takes the forms
+        place_search() accepts.
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/webservice-placeapi
+    """
+
+    return PlaceCrawler(client, query, bounds, **kwargs)
@@ -55,3 +55,60 @@ class StatusError(Exception):
                                          messages[self.name][self.status])
         else:
             return "[status %s]: %s." % (self.status, '非官方文档所列的未知错误！')
+
+
+def is_quota_status(status):
+    """True if "status" says the quota of the ak is used up: '4' or '3xx' in
+        messages above.
+    """
+    status = int(status)
+    return status == 4 or 300 <= status < 400
+
+
+def is_retryable_status(name, status):
+    """True if "status" of service "name" is catalogued above as an internal
+        server error, which may well succeed on a second try.
+    """
+    return messages.get(name, {}).get(str(status), '').endswith('内部错误')
+
+
+def is_key_status(status):
+    """True if "status" blames the ak itself rather than the request:
+        permission ('3', '2xx'), quota ('4', '3xx') or invalid ak ('5').
+    """
+    status = int(status)
+    return status in (3, 4, 5) or 200 <= status < 400
+
+
+class QuotaError(StatusError):
+    """Raised by the client itself, before sending anything, once the daily
+        quota configured for an ak and service has been used up, or once
+        Baidu reported it exhausted ("reported"). "quota" is the configured
+        quota, None if there is none.
+    """
+
+    def __init__(self, server_name, subserver_name, quota, reported=False):
+        StatusError.__init__(self, server_name, subserver_name, 4)
+        self.quota = quota
+        self.reported = reported
+
+    def __str__(self):
+        if self.reported:
+            message = '服务端返回今日配额已用完'
+        else:
+            message = '今日配额(%d次)已用完' % self.quota
+        return "[status %s]: %s." % (self.status, message)
+
+
+class CircuitOpenError(Exception):
+    """Raised by the client itself, without sending anything, while the
+        circuit breaker of a service is open.
+    """
+
+    def __init__(self, service, retry_in):
+        self.name = service
+        self.retry_in = retry_in
+
+    def __str__(self):
+        return "[%s]: %s." % (self.name,
+                              '服务异常熔断中，%.1f秒后重试' % self.retry_in)
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Straight-line geometry to spare route_matrix() requests: vectorized
+haversine distances, an EtaModel turning them into road distance and
+duration estimates, and route_nearest(), which only asks Baidu about the
+"k" nearest destinations of each origin.
+
+Everything here needs NumPy. Points are N x 2 sequences or arrays of
+<lng, lat>.
+"""
+
+import json
+
+from baidumaps import apis
+from baidumaps import bulk
+from baidumaps import columns
+from baidumaps import exceptions
+from baidumaps import parse
+from baidumaps.spatial import EARTH_RADIUS
+
+try:
+    from urllib.parse import urlsplit, parse_qsl
+except ImportError:     # Python 2
+    from urlparse import urlsplit, parse_qsl
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BLOCK = 1024    # origins per block of nearest(), bounding its memory
+
+
+def as_points(points, name='points'):
+    """Float64 "lng" and "lat" arrays of N x 2 "points"."""
+    columns.require_numpy()
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError('"%s" incorrect! expects N x 2 <lng, lat>.' % name)
+    return columns.check_points(points[:, 0], points[:, 1], name)
+
+
+def haversine_array(lng1, lat1, lng2, lat2):
+    """Great circle distances in meters, broadcast like NumPy operators:
+        pass lng1[:, None] and lat1[:, None] for a whole matrix.
+    """
+    lng1, lat1, lng2, lat2 = (np.radians(a) for a in (lng1, lat1, lng2,
+                                                      lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + \
+        np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def distance_matrix(origins, destinations):
+    """N x M straight-line distances in meters."""
+    origin_lng, origin_lat = as_points(origins, 'origins')
+    destination_lng, destination_lat = as_points(destinations,
+                                                 'destinations')
+    return haversine_array(origin_lng[:, None], origin_lat[:, None],
+                           destination_lng, destination_lat)
+
+
+def nearest(origins, destinations, k):
+    """Indexes (N x k) of the "k" nearest destinations of every origin,
+        nearest first, and their straight-line distances (N x k). Origins go
+        BLOCK at a time, so only BLOCK x M distances are held at once.
+    """
+    origin_lng, origin_lat = as_points(origins, 'origins')
+    destination_lng, destination_lat = as_points(destinations,
+                                                 'destinations')
+    k = min(k, len(destination_lng))
+    if k < 1:
+        raise ValueError('"k" incorrect! expects at least 1 destination.')
+    rows = len(origin_lng)
+    index = np.empty((rows, k), dtype=np.intp)
+    straight = np.empty((rows, k))
+    for start in range(0, rows, BLOCK):
+        stop = min(start + BLOCK, rows)
+        block = haversine_array(origin_lng[start:stop, None],
+                                origin_lat[start:stop, None],
+                                destination_lng, destination_lat)
+        if k < block.shape[1]:
+            part = np.argpartition(block, k - 1, axis=1)[:, :k]
+        else:
+            part = np.tile(np.arange(k), (stop - start, 1))
+        values = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(values, axis=1, kind='stable')
+        index[start:stop] = np.take_along_axis(part, order, axis=1)
+        straight[start:stop] = np.take_along_axis(values, order, axis=1)
+    return index, straight
+
+
+def route_samples(cache):
+    """(straight, distance, duration) arrays of every route found in the
+        route_matrix() responses held by "cache" (a MemoryCache or
+        SQLiteCache). Requests by place name are skipped.
+    """
+    columns.require_numpy()
+    straight, distance, duration = [], [], []
+    for key, body in cache.items('directionroutematrix'):
+        query = dict(parse_qsl(urlsplit(key).query))
+        try:
+            origins = [[float(v) for v in p.split(',')][::-1]
+                       for p in query['origins'].split('|')]
+            destinations = [[float(v) for v in p.split(',')][::-1]
+                            for p in query['destinations'].split('|')]
+        except (KeyError, ValueError):
+            continue
+        cells = parse.parse_drx(json.loads(body.decode('utf-8')))
+        if isinstance(cells, dict):
+            cells = [cells]
+        lines = distance_matrix(origins, destinations).ravel()
+        for line, cell in zip(lines, cells):
+            if 'distance' in cell:
+                straight.append(line)
+                distance.append(cell['distance'])
+                duration.append(cell['duration'])
+    return (np.asarray(straight, dtype=np.float64),
+            np.asarray(distance, dtype=np.float64),
+            np.asarray(duration, dtype=np.float64))
+
+
+class EtaModel(object):
+    """Linear estimate of routes from straight-line distance:
+        distance = detour * straight + detour_offset (meters) and
+        duration = pace * distance + pace_offset (seconds).
+
+    The defaults (40% detour, 30 km/h) are rough city driving guesses; fit()
+        or calibrate() them on real routes of the area and "mode" before
+        trusting estimates. "samples" and "error" (median relative error of
+        the fitted durations) tell how well it went.
+    """
+
+    def __init__(self, detour=1.4, detour_offset=0.0, pace=0.12,
+                 pace_offset=0.0):
+        self.detour = detour
+        self.detour_offset = detour_offset
+        self.pace = pace
+        self.pace_offset = pace_offset
+        self.samples = 0
+        self.error = None
+
+    def __repr__(self):
+        return ('EtaModel(detour=%.3f, detour_offset=%.1f, pace=%.4f, '
+                'pace_offset=%.1f)' % (self.detour, self.detour_offset,
+                                       self.pace, self.pace_offset))
+
+    def fit(self, straight, distance, duration):
+        """Least squares fit on routes, given as arrays of straight-line
+            distance, road distance (meters) and duration (seconds).
+        """
+        columns.require_numpy()
+        straight, distance, duration = (
+            np.asarray(a, dtype=np.float64).ravel()
+            for a in (straight, distance, duration))
+        good = np.isfinite(straight) & np.isfinite(distance) & \
+            np.isfinite(duration)
+        straight, distance, duration = (straight[good], distance[good],
+                                        duration[good])
+        if len(straight) < 2 or np.ptp(straight) == 0 or \
+                np.ptp(distance) == 0:
+            raise ValueError('"samples" incorrect! fit needs at least two '
+                             'routes of different lengths.')
+        self.detour, self.detour_offset = np.polyfit(straight, distance, 1)
+        self.pace, self.pace_offset = np.polyfit(distance, duration, 1)
+        self.samples = len(straight)
+        predicted = self.predict(straight)[1]
+        self.error = float(np.median(np.abs(predicted - duration) /
+                                     np.maximum(duration, 1.0)))
+        return self
+
+    def fit_matrix(self, origins, destinations, matrix):
+        """fit() on the measured cells of a route_matrix_tiled() or
+            route_nearest() result: status 0 and not "estimated", so the
+            model never learns from its own guesses.
+        """
+        measured = np.asarray(matrix['status']) == 0
+        if 'estimated' in matrix:
+            measured &= ~np.asarray(matrix['estimated'], dtype=bool)
+        straight = distance_matrix(origins, destinations)
+        return self.fit(straight[measured],
+                        np.asarray(matrix['distance'])[measured],
+                        np.asarray(matrix['duration'])[measured])
+
+    def calibrate(self, cache):
+        """fit() on the route_matrix() responses held by "cache"."""
+        return self.fit(*route_samples(cache))
+
+    def predict(self, straight):
+        """Estimated (distance, duration) for straight-line distances."""
+        straight = np.asarray(straight, dtype=np.float64)
+        distance = np.maximum(self.detour * straight + self.detour_offset,
+                              straight)
+        duration = np.maximum(self.pace * distance + self.pace_offset, 0.0)
+        return distance, duration
+
+
+def pack(candidates, tile):
+    """Groups the (origin, destinations) pairs of "candidates" into
+        requests of at most "tile" origins by "tile" destinations. Origins
+        with the same candidates are sorted next to each other so they share
+        requests.
+    """
+    units = []
+    for i, row in enumerate(candidates):
+        row = sorted(row)
+        for start in range(0, len(row), tile):
+            units.append((tuple(row[start:start + tile]), i))
+    units.sort()
+
+    groups = []
+    rows, cols = [], set()
+    for destinations, i in units:
+        merged = cols.union(destinations)
+        if rows and (len(rows) == tile or len(merged) > tile or i in rows):
+            groups.append((rows, sorted(cols)))
+            rows, merged = [], set(destinations)
+        rows.append(i)
+        cols = merged
+    if rows:
+        groups.append((rows, sorted(cols)))
+    return groups
+
+
+def route_nearest(client, origins, destinations, k=3, model=None,
+                  workers=10, tile=5, by='duration', skip_errors=False,
+                  **kwargs):
+    """This module finds the nearest destination by road of every origin,
+        requesting routes only to its "k" nearest destinations in straight
+        line, packed into route_matrix() requests of "tile"(upper limits 5)
+        origins by "tile" destinations on "workers" threads. Other keyword
+        arguments, such as "mode", are passed to every request.
+
+    Attention! It returns a dict of the N x M "distance", "duration" and
+        "status" arrays of route_matrix_tiled(), where pairs not requested
+        hold NaN and status -1, or, with an EtaModel as "model", its
+        estimates, flagged by the N x M boolean "estimated". "nearest" holds
+        for every origin the destination index with the smallest "by"
+        (-1 if none was found), and "report" counts the requests and pairs
+        spared compared to the whole matrix.
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/route-matrix-api
+    """
+
+    if tile > 5:
+        raise ValueError('"tile" incorrect! upper limits is 5.')
+    if by not in ('distance', 'duration'):
+        raise ValueError('"by" incorrect! expects "distance" or "duration".')
+    origin_lng, origin_lat = as_points(origins, 'origins')
+    destination_lng, destination_lat = as_points(destinations,
+                                                 'destinations')
+    rows, cols = len(origin_lng), len(destination_lng)
+    candidates = nearest(np.column_stack([origin_lng, origin_lat]),
+                         np.column_stack([destination_lng, destination_lat]),
+                         k)[0]
+    groups = pack(candidates.tolist(), tile)
+
+    # formatted "lat,lng" strings go through route_matrix() as they are.
+    origin_text = columns.format_pairs(origin_lat, origin_lng)
+    destination_text = columns.format_pairs(destination_lat, destination_lng)
+    kwargs['raw'] = True
+    template = apis.prepare(apis.route_matrix, [[0, 0]], [[0, 0]], **kwargs)
+
+    def request(group):
+        sub_origins, sub_destinations = group
+        params = dict(template,
+                      origins='|'.join(origin_text[i] for i in sub_origins),
+                      destinations='|'.join(destination_text[j]
+                                            for j in sub_destinations))
+        try:
+            response = client.fetch(params)
+        except exceptions.StatusError as e:
+            if not skip_errors:
+                raise
+            return group, [], int(e.status)
+        cells = parse.parse_drx(response)
+        if isinstance(cells, dict):
+            cells = [cells]
+        return group, cells, 0
+
+    distance = np.full((rows, cols), np.nan)
+    duration = np.full((rows, cols), np.nan)
+    status = np.full((rows, cols), columns.MISSING, dtype=np.int32)
+    for (sub_origins, sub_destinations), cells, failed in bulk.run_ordered(
+            request, groups, workers):
+        block = np.ix_(sub_origins, sub_destinations)
+        if failed:
+            status[block] = failed
+            continue
+        width = len(sub_destinations)
+        for n, cell in enumerate(cells):
+            i, j = sub_origins[n // width], sub_destinations[n % width]
+            if 'distance' in cell:
+                distance[i, j] = cell['distance']
+                duration[i, j] = cell['duration']
+                status[i, j] = 0
+            else:
+                status[i, j] = int(cell['status'])
+
+    found = status == 0
+    values = np.where(found, distance if by == 'distance' else duration,
+                      np.inf)
+    best = np.argmin(values, axis=1) if cols else np.zeros(rows, np.intp)
+    best[~found.any(axis=1)] = -1
+
+    estimated = np.zeros((rows, cols), dtype=bool)
+    if model is not None:
+        estimated = status == columns.MISSING
+        straight = haversine_array(origin_lng[:, None], origin_lat[:, None],
+                                   destination_lng, destination_lat)
+        guess_distance, guess_duration = model.predict(straight[estimated])
+        distance[estimated] = guess_distance
+        duration[estimated] = guess_duration
+
+    full_requests = (-(-rows // tile)) * (-(-cols // tile))
+    pairs = sum(len(o) * len(d) for o, d in groups)
+    report = {'requests': len(groups), 'full_requests': full_requests,
+              'saved_requests': full_requests - len(groups),
+              'pairs': pairs, 'full_pairs': rows * cols,
+              'saved_pairs': rows * cols - pairs,
+              'saved_share': (1.0 - float(len(groups)) / full_requests
+                              if full_requests else 0.0)}
+    return {'distance': distance, 'duration': duration, 'status': status,
+            'estimated': estimated, 'nearest': best, 'report': report}
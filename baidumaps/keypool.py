@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import random
+import threading
+import time
+
+
+class KeyPool(object):
+    """Spreads requests over several ak. Each request picks a key at random,
+        weighted by the share of its daily quota left (when a RateLimiter
+        tracks one) and by its recent latency. A key answered with a
+        permission or quota status is cooled down for "cooldown" seconds for
+        that service (server_name, as in RateLimiter), during which it is only
+        used for it if every key is cooling down.
+
+    Attention! Latency only tilts the odds: a key is never weighted below
+        1/"max_ratio" of the fastest one, and a key without a report for
+        "stale" seconds (or never used) counts as fast as the fastest, so it
+        gets tried again instead of starving behind the first quick key.
+    """
+
+    def __init__(self, aks, cooldown=600, smoothing=0.2, max_ratio=4.0,
+                 stale=60):
+        if not aks:
+            raise ValueError('KeyPool needs at least one ak.')
+        self.aks = list(aks)
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.max_ratio = max_ratio
+        self.stale = stale
+        self.clock = time.time
+        self.random = random.random
+        self.cooling = {}       # (ak, server_name) -> end of cooldown
+        self.latency = dict((ak, 0.1) for ak in self.aks)
+        self.reported = {}      # ak -> time of its last latency report
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.aks)
+
+    def latencies(self, aks, now):
+        """Latency each of "aks" is weighted by: its moving average, bounded
+            to "max_ratio" times the fastest fresh one, or the fastest for
+            keys without a fresh report.
+        """
+        with self.lock:
+            fresh = dict((ak, self.latency[ak]) for ak in aks
+                         if now - self.reported.get(ak, now - self.stale - 1)
+                         <= self.stale)
+        fastest = max(min(fresh.values()) if fresh else 0.1, 0.001)
+        return [min(fresh.get(ak, fastest), fastest * self.max_ratio)
+                for ak in aks]
+
+    def weight(self, ak, server_name, rate_limiter, latency=None):
+        share = 1.0
+        if rate_limiter is not None:
+            remaining = rate_limiter.remaining(ak, server_name)
+            quota = rate_limiter.daily_quota.get(server_name)
+            if remaining is not None:
+                share = float(remaining) / quota if quota else 0.0
+        if latency is None:
+            latency = self.latency[ak]
+        return share / max(latency, 0.001)
+
+    def choose(self, server_name, rate_limiter=None, exclude=()):
+        """Returns an ak for the next request, or None once every key is in
+            "exclude".
+        """
+        candidates = [ak for ak in self.aks if ak not in exclude]
+        if not candidates:
+            return None
+
+        now = self.clock()
+        with self.lock:
+            ready = [ak for ak in candidates
+                     if self.cooling.get((ak, server_name), 0) <= now]
+            if not ready:
+                return min(candidates,
+                           key=lambda ak: self.cooling[ak, server_name])
+
+        weights = [self.weight(ak, server_name, rate_limiter, latency)
+                   for ak, latency in zip(ready, self.latencies(ready, now))]
+        total = sum(weights)
+        if total <= 0:
+            return ready[0]
+        point = self.random() * total
+        for ak, w in zip(ready, weights):
+            point -= w
+            if point < 0:
+                return ak
+        return ready[-1]
+
+    def report(self, ak, seconds):
+        """Feeds the latency of a successful request into the key's moving
+            average.
+        """
+        with self.lock:
+            if ak not in self.reported:
+                self.latency[ak] = seconds      # no prior to smooth from
+            else:
+                self.latency[ak] += self.smoothing * (seconds -
+                                                      self.latency[ak])
+            self.reported[ak] = self.clock()
+
+    def cool_down(self, ak, server_name):
+        with self.lock:
+            self.cooling[ak, server_name] = self.clock() + self.cooldown
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Instrumentation of Client requests. Pass "metrics=Metrics()" to Client to
+collect, per service (keyed like exceptions.messages): latency histograms of
+each phase of a request, response sizes, status counts and cache hit rates.
+
+Any object with the four hook methods of Metrics (phase, response, status
+and cache) may be passed instead, e.g. to forward them to a tracing system.
+Without metrics, Client skips every hook.
+"""
+
+import bisect
+import logging
+import threading
+from collections import Counter
+
+# phases of one request, in order; "total" spans the whole Client.get().
+PHASES = ('url', 'network', 'decode', 'parse', 'total')
+
+# upper bounds, in seconds, of the latency histogram buckets.
+BUCKETS = (0.00001, 0.00002, 0.00005, 0.0001, 0.0002, 0.0005, 0.001, 0.002,
+           0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+
+class Histogram(object):
+    """Counts of values per bucket of "bounds", plus one bucket for larger
+        values, with their count, sum and maximum.
+    """
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the "p" percentile (0 to 1); the
+            maximum for the last bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics(object):
+    """Thread-safe collector of the Client hooks, with summary() and
+        export() to read them.
+    """
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.latency = {}           # (service, phase) -> Histogram
+        self.sizes = {}             # service -> Histogram of bytes
+        self.statuses = Counter()   # (service, status) -> responses
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+        self.lock = threading.Lock()
+
+    # hooks called by Client.
+
+    def phase(self, service, phase, seconds):
+        with self.lock:
+            histogram = self.latency.get((service, phase))
+            if histogram is None:
+                histogram = self.latency[service, phase] = \
+                    Histogram(self.bounds)
+            histogram.add(seconds)
+
+    def response(self, service, size):
+        with self.lock:
+            histogram = self.sizes.get(service)
+            if histogram is None:
+                # sizes in bytes, bucketed from 256 bytes to 4 MiB.
+                histogram = self.sizes[service] = \
+                    Histogram(tuple(256 << k for k in range(15)))
+            histogram.add(size)
+
+    def status(self, service, status):
+        with self.lock:
+            self.statuses[service, str(status)] += 1
+
+    def cache(self, service, hit):
+        with self.lock:
+            if hit:
+                self.cache_hits[service] += 1
+            else:
+                self.cache_misses[service] += 1
+
+    # reading.
+
+    def services(self):
+        names = set(service for service, _ in self.latency)
+        names.update(service for service, _ in self.statuses)
+        names.update(self.cache_hits, self.cache_misses, self.sizes)
+        return sorted(names)
+
+    def cache_hit_rate(self, service):
+        hits = self.cache_hits[service]
+        total = hits + self.cache_misses[service]
+        return float(hits) / total if total else 0.0
+
+    def summary(self):
+        """Lines of text, one block per service."""
+        lines = []
+        with self.lock:
+            for service in self.services():
+                lines.append('[%s]' % (service or '-'))
+                for phase in PHASES:
+                    histogram = self.latency.get((service, phase))
+                    if histogram is None:
+                        continue
+                    lines.append('  %-8s n=%d mean=%.2fms p50=%.2fms '
+                                 'p99=%.2fms max=%.2fms'
+                                 % (phase, histogram.count,
+                                    histogram.mean() * 1e3,
+                                    histogram.percentile(0.5) * 1e3,
+                                    histogram.percentile(0.99) * 1e3,
+                                    histogram.max * 1e3))
+                sizes = self.sizes.get(service)
+                if sizes is not None:
+                    lines.append('  bytes    n=%d mean=%d max=%d'
+                                 % (sizes.count, sizes.mean(), sizes.max))
+                statuses = sorted((status, count) for (name, status), count
+                                  in self.statuses.items() if name == service)
+                if statuses:
+                    lines.append('  status   ' + ' '.join(
+                        '%s:%d' % item for item in statuses))
+                if self.cache_hits[service] or self.cache_misses[service]:
+                    lines.append('  cache    hits=%d misses=%d hit_rate=%.3f'
+                                 % (self.cache_hits[service],
+                                    self.cache_misses[service],
+                                    self.cache_hit_rate(service)))
+        return lines
+
+
+def export(metrics, destination):
+    """Writes metrics.summary() to "destination": a logging.Logger (one INFO
+        record per line), or the path of a text file, appended to.
+    """
+    lines = metrics.summary()
+    if isinstance(destination, logging.Logger):
+        for line in lines:
+            destination.info(line)
+        return
+    with open(destination, 'a') as f:
+        f.write('\n'.join(lines) + '\n')
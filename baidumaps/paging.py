@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from multiprocessing.pool import ThreadPool
+from baidumaps import apis
+
+
+def iter_pages(client, api, args, kwargs, page_size):
+    """Yields the results of "api" page after page, fetching page n + 1 in
+        the background while page n is consumed, and stopping at "total".
+    """
+
+    if page_size > 20:
+        raise ValueError('"page_size" incorrect! upper limits is 20.')
+    raw = kwargs.pop('raw', False)
+
+    def fetch(page_num):
+        params = apis.prepare(api, *args, page_size=page_size,
+                              page_num=page_num, **kwargs)
+        return params, client.fetch(params)
+
+    pool = ThreadPool(1)
+    try:
+        page_num = 0
+        pending = pool.apply_async(fetch, (page_num,))
+        while pending is not None:
+            params, response = pending.get()
+            total = int(response.get('total', 0))
+            items = response['results'] if raw else \
+                client.build_result(params, response)
+
+            pending = None
+            if items and (page_num + 1) * page_size < total:
+                page_num += 1
+                pending = pool.apply_async(fetch, (page_num,))
+            for item in items:
+                yield item
+    finally:
+        pool.terminate()
+
+
+def place_search_iter(client, query, page_size=20, **kwargs):
+    """This module yields every POI place_search() finds, one at a time,
+        requesting pages lazily. Arguments are those of place_search().
+
+    Attention! Only one page is held in memory, plus the next one, which is
+        prefetched while the current one is consumed. Set 'raw=True' for the
+        raw entries of "results".
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/webservice-placeapi
+    """
+
+    kwargs['query'] = query
+    return iter_pages(client, apis.place_search, (), kwargs, page_size)
+
+
+def place_eventsearch_iter(client, query, event, region, page_size=20,
+                           **kwargs):
+    """This module yields every event place_eventsearch() finds, one at a
+        time, requesting pages lazily. Arguments are those of
+        place_eventsearch().
+
+    Attention! Only one page is held in memory, plus the next one, which is
+        prefetched while the current one is consumed. Set 'raw=True' for the
+        raw entries of "results".
+
+    Reference: http://developer.baidu.com/map/index.php?title=webapi/guide/webservice-placeapi
+    """
+
+    kwargs.update({'query': query, 'event': event, 'region': region})
+    return iter_pages(client, apis.place_eventsearch, (), kwargs, page_size)
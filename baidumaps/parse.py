@@ -8,6 +8,11 @@
 
 # THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:     # Python 2
+    from collections import Mapping, Sequence
+
 
 def parse(client, server_name, subserver_name, response):
     name = server_name + subserver_name
@@ -47,7 +52,7 @@ def parse_drx(response):
                 result_parse.append({'status': rr['status'],
                                     'message': rr['message']})
     else:
-        if 'distance' in rr:
+        if 'distance' in result_raw[0]:
             result_parse = {'distance': result_raw[0]['distance']['value'],
                             'duration': result_raw[0]['duration']['value']}
         else:
@@ -73,26 +78,22 @@ def parse_drn(response):
         # if mode==drving/walking
         if 'content' in result_raw['origin']:
             origin = result_raw['origin']['content']
-            for i, ori in enumerate(origin):
+            for ori in origin:
                 ori.pop('telephone')
-                origin[i] = ori
 
             destination = result_raw['destination']
-            for j, des in enumerate(destination):
+            for des in destination:
                 des.pop('telephone')
-                destination[j] = des
 
         # if mode=transit
         else:
             origin = result_raw['origin']
-            for i, ori in enumerate(origin):
+            for ori in origin:
                 ori.pop('uid')
-                origin[i] = ori
 
             destination = result_raw['destination']
-            for j, des in enumerate(destination):
+            for des in destination:
                 des.pop('uid')
-                destination[j] = des
 
         result_parse = {'origin_maybe': origin,
                         'destination_maybe': destination}
@@ -119,28 +120,28 @@ def parse_gcr(response):
 
 def parse_psn(response):
     result_parse = response['result']
-    for i, rr in enumerate(result_parse):
-        if 'cityid' in rr: rr.pop('cityid')
-        if 'uid' in rr: rr.pop('uid')
-        if 'business' in rr: rr.pop('business')
-        result_parse[i] = rr
+    for rr in result_parse:
+        rr.pop('cityid', None)
+        rr.pop('uid', None)
+        rr.pop('business', None)
     return result_parse
 
 
 def parse_psh(response):
     result_parse = response['results']
-    for i, rp in enumerate(result_parse):
-        if 'street_id' in rp: rp.pop('street_id')
-        if 'detail' in rp: rp.pop('detail')
-        result_parse[i] = rp
+    for rp in result_parse:
+        rp.pop('street_id', None)
+        rp.pop('detail', None)
     return result_parse
 
 
 def parse_pdl(response):
     result_parse = response['result']
-    for i, rp in enumerate(result_parse):
-        if 'detail' in rp: rp.pop('detail')
-        result_parse[i] = rp
+    if isinstance(result_parse, dict):  # one uid
+        result_parse.pop('detail', None)
+        return result_parse
+    for rp in result_parse:
+        rp.pop('detail', None)
     return result_parse
 
 
@@ -152,3 +153,108 @@ def parse_peh(response):
 def parse_pel(response):
     result_parse = response['result']
     return result_parse
+
+
+# Lazy mode ("lazy=True"): instead of popping fields from every element, the
+# parsers below return read-only views over the decoded response which hide
+# those fields, so nothing is copied or altered. The body itself is decoded
+# in full beforehand: views save the rewriting, not the decoding.
+
+
+class DictView(Mapping):
+    """Read-only view of dict "raw" without the keys in "hidden"."""
+    __slots__ = ('raw', 'hidden')
+
+    def __init__(self, raw, hidden):
+        self.raw = raw
+        self.hidden = hidden
+
+    def __getitem__(self, key):
+        if key in self.hidden:
+            raise KeyError(key)
+        return self.raw[key]
+
+    def __iter__(self):
+        return (key for key in self.raw if key not in self.hidden)
+
+    def __len__(self):
+        return sum(1 for key in self.raw if key not in self.hidden)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ListView(Sequence):
+    """Read-only view of list "raw" whose dicts are seen as DictView."""
+    __slots__ = ('raw', 'hidden')
+
+    def __init__(self, raw, hidden):
+        self.raw = raw
+        self.hidden = hidden
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ListView(self.raw[i], self.hidden)
+        return DictView(self.raw[i], self.hidden)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def hide(raw, *keys):
+    keys = frozenset(keys)
+    if isinstance(raw, dict):
+        return DictView(raw, keys)
+    return ListView(raw, keys)
+
+
+def lazy_lip(response):
+    result_raw = response['content']
+    return {'address': hide(result_raw['address_detail'], 'city_code'),
+            'location': {'lng': float(result_raw['point']['x']),
+                         'lat': float(result_raw['point']['y'])}}
+
+
+def lazy_drn(response):
+    if response['type'] != 1:
+        return parse_drn(response)      # nothing to drop for type 2
+    result_raw = response['result']
+    if 'content' in result_raw['origin']:
+        return {'origin_maybe': hide(result_raw['origin']['content'],
+                                     'telephone'),
+                'destination_maybe': hide(result_raw['destination'],
+                                          'telephone')}
+    return {'origin_maybe': hide(result_raw['origin'], 'uid'),
+            'destination_maybe': hide(result_raw['destination'], 'uid')}
+
+
+def lazy_psn(response):
+    return hide(response['result'], 'cityid', 'uid', 'business')
+
+
+def lazy_psh(response):
+    return hide(response['results'], 'street_id', 'detail')
+
+
+def lazy_pdl(response):
+    return hide(response['result'], 'detail')
+
+
+def parse_lazy(client, server_name, subserver_name, response):
+    """Like parse(), leaving the response untouched: the parsers which drop
+        fields return views instead; the others need no change.
+    """
+    name = server_name + subserver_name
+    options = {'locationip': lazy_lip,
+               'direction': lazy_drn,
+               'placesuggestion': lazy_psn,
+               'placesearch': lazy_psh,
+               'placedetail': lazy_pdl
+               }
+
+    if name not in options:
+        return parse(client, server_name, subserver_name, response)
+    return options[name](response)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+from collections import Counter
+from baidumaps import exceptions
+
+# Baidu resets daily quotas at midnight Beijing time (UTC+8).
+DAY_OFFSET = 8 * 3600
+
+
+class TokenBucket(object):
+    """Paces callers to "rate" calls per second. Each acquire() books the
+        next free slot and sleeps until it, so waiting callers are released
+        one by one at an even pace instead of in bursts; up to "burst" calls
+        may go at once after an idle period.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.interval = 1.0 / rate
+        self.burst = burst
+        self.clock = time.time
+        self.sleep = time.sleep
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = self.clock()
+            earliest = now - (self.burst - 1) * self.interval
+            slot = max(self.next_slot, earliest)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+        return max(slot - now, 0.0)
+
+
+class RateLimiter(object):
+    """Client-side scheduler keeping each ak under Baidu's limits: a token
+        bucket per ak and service, set by "qps", and a counter of requests
+        sent today, checked against "daily_quota". Both are dicts keyed by
+        server_name ('place', 'geocoder', 'direction', 'geoconv', 'location');
+        services missing from them are not limited.
+
+    Attention! Once a daily quota is used up, or Baidu answers with a quota
+        status, further requests for that ak and service raise QuotaError
+        without being sent, until midnight Beijing time.
+    """
+
+    def __init__(self, qps=None, daily_quota=None, burst=1):
+        self.qps = dict(qps or {})
+        self.daily_quota = dict(daily_quota or {})
+        self.burst = burst
+        self.clock = time.time
+        self.buckets = {}
+        self.used = Counter()
+        self.exhausted = set()
+        self.day = None
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def today(self):
+        return int((self.clock() + DAY_OFFSET) // 86400)
+
+    def roll_day(self):
+        # called with the lock held.
+        day = self.today()
+        if day != self.day:
+            self.day = day
+            self.used.clear()
+            self.exhausted.clear()
+
+    def remaining(self, ak, server_name):
+        """Requests left today for "ak" and the service; None if unlimited.
+        """
+        with self.lock:
+            self.roll_day()
+            if (ak, server_name) in self.exhausted:
+                return 0
+            quota = self.daily_quota.get(server_name)
+            if quota is None:
+                return None
+            return max(quota - self.used[(ak, server_name)], 0)
+
+    def acquire(self, ak, server_name, subserver_name=''):
+        """Blocks until a request may be sent, and counts it for today.
+        """
+        key = (ak, server_name)
+        with self.lock:
+            self.roll_day()
+            quota = self.daily_quota.get(server_name)
+            if key in self.exhausted or (quota is not None and
+                                         self.used[key] >= quota):
+                raise exceptions.QuotaError(server_name, subserver_name,
+                                            quota, key in self.exhausted)
+            self.used[key] += 1
+            bucket = self.buckets.get(key)
+            if bucket is None and server_name in self.qps:
+                bucket = TokenBucket(self.qps[server_name], self.burst)
+                bucket.clock = self.clock
+                self.buckets[key] = bucket
+
+        if bucket is not None:
+            waited = bucket.acquire()
+            with self.lock:
+                self.waited += waited
+
+    def exhaust(self, ak, server_name):
+        """Marks the quota of "ak" for the service as used up for today.
+        """
+        with self.lock:
+            self.roll_day()
+            self.exhausted.add((ak, server_name))
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Compact result types, returned instead of dicts when calling an API with
+"typed=True". Single results are __slots__ records, far lighter than nested
+dicts; bulk coordinates and matrices are columns of array.array.
+"""
+
+import array
+
+
+class Record(object):
+    """Base of the __slots__ records: fields missing from the response are
+        None.
+    """
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        fields = ', '.join('%s=%r' % (name, getattr(self, name))
+                           for name in self.__slots__
+                           if getattr(self, name) is not None)
+        return '%s(%s)' % (type(self).__name__, fields)
+
+
+class Point(Record):
+    __slots__ = ('lng', 'lat')
+
+
+class POI(Record):
+    __slots__ = ('uid', 'name', 'lng', 'lat', 'address', 'telephone',
+                 'city', 'district', 'business', 'detail_info')
+
+
+class Geocode(Record):
+    __slots__ = ('lng', 'lat', 'precise', 'confidence', 'level',
+                 'formatted_address', 'business', 'city_code',
+                 'address_component')
+
+
+class Points(object):
+    """<lng, lat> points held in two array.array('d') columns."""
+
+    def __init__(self, lng=(), lat=()):
+        self.lng = array.array('d', lng)
+        self.lat = array.array('d', lat)
+
+    def __len__(self):
+        return len(self.lng)
+
+    def __getitem__(self, i):
+        return Point(lng=self.lng[i], lat=self.lat[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_numpy(self):
+        import numpy as np
+        return np.column_stack([np.frombuffer(self.lng, dtype=np.float64),
+                                np.frombuffer(self.lat, dtype=np.float64)])
+
+
+class RouteMatrix(object):
+    """Row-major "rows" x "cols" matrix of routes in array.array columns:
+        "distance" and "duration" are NaN where "status" is not 0.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        size = rows * cols
+        self.distance = array.array('d', [float('nan')]) * size
+        self.duration = array.array('d', [float('nan')]) * size
+        self.status = array.array('i', [0]) * size
+
+    def __len__(self):
+        return self.rows * self.cols
+
+    def cell(self, i, j):
+        """(distance, duration, status) from origin i to destination j."""
+        k = i * self.cols + j
+        return self.distance[k], self.duration[k], self.status[k]
+
+    def to_numpy(self):
+        import numpy as np
+        shape = (self.rows, self.cols)
+        return {'distance': np.frombuffer(self.distance).reshape(shape),
+                'duration': np.frombuffer(self.duration).reshape(shape),
+                'status': np.frombuffer(self.status,
+                                        dtype=np.intc).reshape(shape)}
+
+
+def make_poi(raw):
+    location = raw.get('location') or {}
+    return POI(uid=raw.get('uid'), name=raw.get('name'),
+               lng=location.get('lng'), lat=location.get('lat'),
+               address=raw.get('address'), telephone=raw.get('telephone'),
+               city=raw.get('city'), district=raw.get('district'),
+               business=raw.get('business'),
+               detail_info=raw.get('detail_info'))
+
+
+def typed_gcv(response, params):
+    result_raw = response['result']
+    return Points([rr['x'] for rr in result_raw],
+                  [rr['y'] for rr in result_raw])
+
+
+def typed_drx(response, params):
+    rows = len(params['origins'].split('|'))
+    cols = len(params['destinations'].split('|'))
+    matrix = RouteMatrix(rows, cols)
+    for k, rr in enumerate(response['result']['elements']):
+        if 'distance' in rr:
+            matrix.distance[k] = rr['distance']['value']
+            matrix.duration[k] = rr['duration']['value']
+        else:
+            matrix.status[k] = int(rr['status'])
+    return matrix
+
+
+def typed_gcr(response, params):
+    rr = response['result']
+    location = rr.get('location') or {}
+    return Geocode(lng=location.get('lng'), lat=location.get('lat'),
+                   precise=rr.get('precise'), confidence=rr.get('confidence'),
+                   level=rr.get('level'),
+                   formatted_address=rr.get('formatted_address'),
+                   business=rr.get('business'), city_code=rr.get('cityCode'),
+                   address_component=rr.get('addressComponent'))
+
+
+def typed_pois(key):
+    def parse_pois(response, params):
+        result_raw = response[key]
+        if isinstance(result_raw, dict):    # place_detail() for one uid
+            return make_poi(result_raw)
+        return [make_poi(rr) for rr in result_raw]
+    return parse_pois
+
+
+def parse_typed(client, server_name, subserver_name, response, params):
+    """Like parse.parse(), but returns the compact types above. Services
+        without a typed form (location/ip, direction, place/eventdetail)
+        fall back to parse.parse().
+    """
+    name = server_name + subserver_name
+    options = {'geoconv': typed_gcv,
+               'directionroutematrix': typed_drx,
+               'geocoder': typed_gcr,
+               'placesuggestion': typed_pois('result'),
+               'placesearch': typed_pois('results'),
+               'placedetail': typed_pois('result'),
+               'placeeventsearch': typed_pois('results')
+               }
+
+    if name not in options:
+        return client.parse(server_name, subserver_name, response)
+    return options[name](response, params)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import random
+import threading
+import time
+from collections import deque
+import requests
+from baidumaps import exceptions
+
+try:
+    import Queue as queue
+except ImportError:     # Python 3
+    import queue
+
+
+def is_transient(error):
+    """True if "error" hints at Baidu or the network struggling rather than
+        at the request: timeouts, connection errors, HTTP 5xx and the
+        statuses exceptions.messages lists as internal errors.
+    """
+    if isinstance(error, exceptions.QuotaError):
+        return False
+    if isinstance(error, exceptions.StatusError):
+        return exceptions.is_retryable_status(error.name, error.status)
+    if isinstance(error, requests.HTTPError):
+        return (error.response is not None and
+                error.response.status_code >= 500)
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class RetryPolicy(object):
+    """Retries transient failures of Client requests, up to "max_attempts"
+        tries in all, sleeping a random time between 0 and
+        min(cap, base * 2 ** n) seconds before the n-th retry.
+
+    Transient failures are timeouts, connection errors, HTTP 5xx and the
+        statuses exceptions.messages lists as internal errors (status 1 for
+        most services), unless "retry_statuses" gives the statuses to retry
+        explicitly. Anything else is raised at once.
+
+    Attention! With "hedge_percentile" set (e.g. 0.95), a request still
+        running after that percentile of the service's recent latencies gets
+        a backup copy sent alongside, and the first good answer wins. It cuts
+        the tail latency at the price of some extra quota.
+    """
+
+    def __init__(self, max_attempts=3, base=0.2, cap=10.0,
+                 retry_statuses=None, hedge_percentile=None,
+                 hedge_min_samples=20, window=200):
+        self.max_attempts = max_attempts
+        self.base = base
+        self.cap = cap
+        self.retry_statuses = retry_statuses
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.window = window
+        self.sleep = time.sleep
+        self.random = random.random
+        self.latencies = {}
+        self.retries = 0
+        self.hedges = 0
+        self.lock = threading.Lock()
+
+    def is_retryable(self, error):
+        if (self.retry_statuses is not None and
+                isinstance(error, exceptions.StatusError) and
+                not isinstance(error, exceptions.QuotaError)):
+            return error.status in set(map(str, self.retry_statuses))
+        return is_transient(error)
+
+    def backoff(self, retry):
+        return self.random() * min(self.cap, self.base * 2 ** (retry - 1))
+
+    def call(self, func, service):
+        """Runs func(), retrying and hedging it as configured.
+        """
+        attempt = 1
+        while True:
+            try:
+                return self.hedged(func, service)
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e):
+                    raise
+                with self.lock:
+                    self.retries += 1
+                self.sleep(self.backoff(attempt))
+                attempt += 1
+
+    def record(self, service, seconds):
+        with self.lock:
+            samples = self.latencies.get(service)
+            if samples is None:
+                samples = self.latencies[service] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def hedge_delay(self, service):
+        """Seconds to wait before hedging, or None if not hedging (yet).
+        """
+        if self.hedge_percentile is None:
+            return None
+        with self.lock:
+            samples = sorted(self.latencies.get(service, ()))
+        if len(samples) < self.hedge_min_samples:
+            return None
+        index = int(self.hedge_percentile * (len(samples) - 1))
+        return samples[index]
+
+    def hedged(self, func, service):
+        delay = self.hedge_delay(service)
+        if delay is None:
+            start = time.time()
+            result = func()
+            self.record(service, time.time() - start)
+            return result
+
+        results = queue.Queue()
+
+        def run():
+            start = time.time()
+            try:
+                result = func()
+            except Exception as e:
+                results.put((False, e))
+            else:
+                self.record(service, time.time() - start)
+                results.put((True, result))
+
+        def launch():
+            thread = threading.Thread(target=run)
+            thread.daemon = True
+            thread.start()
+
+        launch()
+        try:
+            ok, value = results.get(timeout=delay)
+            running = 0
+        except queue.Empty:
+            with self.lock:
+                self.hedges += 1
+            launch()
+            ok, value = results.get()
+            running = 1
+
+        if not ok and running:
+            # the backup may still succeed.
+            second_ok, second_value = results.get()
+            if second_ok:
+                ok, value = second_ok, second_value
+        if ok:
+            return value
+        raise value
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import math
+import threading
+from collections import OrderedDict
+from baidumaps.metrics import Histogram
+
+EARTH_RADIUS = 6371008.8    # meters
+METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+
+
+def haversine(lng1, lat1, lng2, lat2):
+    """Great circle distance in meters between two <lng, lat> points."""
+    lng1, lat1, lng2, lat2 = map(math.radians, (lng1, lat1, lng2, lat2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+class ReverseGeocodeIndex(object):
+    """Grid index over the points already reverse geocoded, so that a new
+        geocode(location=...) landing within "radius" meters of one of them
+        is answered with that point's response, without any request.
+
+    Points live in square cells "radius" meters high; a lookup scans the
+        cells around the query point and returns the nearest stored point
+        within the radius. Points are grouped by "namespace" (the rest of the
+        request, such as "pois"), so only identical requests share answers.
+
+    Attention! stats() reports the hit rate and the distance between query
+        and answered points, i.e. the precision paid for the saved requests;
+        distances are kept in a histogram of "radius" / 50 wide buckets, so
+        memory stays flat however many lookups. Past "max_points" stored
+        points, the least recently used cells are dropped.
+    """
+
+    def __init__(self, radius=50.0, max_points=1000000):
+        self.radius = float(radius)
+        self.cell = self.radius / METERS_PER_DEGREE     # degrees of lat
+        self.max_points = max_points
+        self.cells = OrderedDict()      # least recently used first
+        self.size = 0
+        self.evicted = 0
+        self.hits = 0
+        self.misses = 0
+        self.hit_distances = Histogram(tuple(self.radius * (i + 1) / 50
+                                             for i in range(50)))
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def cell_of(self, lng, lat):
+        return int(math.floor(lng / self.cell)), \
+            int(math.floor(lat / self.cell))
+
+    def add(self, namespace, lng, lat, body):
+        key = (namespace,) + self.cell_of(lng, lat)
+        with self.lock:
+            points = self.cells.pop(key, None) or []
+            points.append((lng, lat, body))
+            self.cells[key] = points
+            self.size += 1
+            while self.size > self.max_points:
+                self.size -= len(self.cells.popitem(last=False)[1])
+                self.evicted += 1
+
+    def lookup(self, namespace, lng, lat):
+        """Body of the nearest stored point within the radius, or None."""
+        col, row = self.cell_of(lng, lat)
+        # a degree of lng shrinks with cos(lat): scan more columns.
+        cos_lat = max(math.cos(math.radians(lat)), 0.01)
+        span = int(math.ceil(1.0 / cos_lat))
+
+        best, best_key, best_distance = None, None, self.radius
+        with self.lock:
+            for c in range(col - span, col + span + 1):
+                for r in range(row - 1, row + 2):
+                    key = (namespace, c, r)
+                    for point in self.cells.get(key, ()):
+                        d = haversine(lng, lat, point[0], point[1])
+                        if d <= best_distance:
+                            best, best_key, best_distance = point, key, d
+            if best is None:
+                self.misses += 1
+                return None
+            self.cells[best_key] = self.cells.pop(best_key)    # recently used
+            self.hits += 1
+            self.hit_distances.add(best_distance)
+            return best[2]
+
+    def stats(self):
+        with self.lock:
+            distances = self.hit_distances
+            total = self.hits + self.misses
+            return {'size': self.size, 'evicted_cells': self.evicted,
+                    'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': float(self.hits) / total if total else 0.0,
+                    'mean_error': distances.mean(),
+                    'p95_error': distances.percentile(0.95),
+                    'max_error': distances.max}
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Transport(object):
+    """Pooled keep-alive HTTP transport used by Client.get().
+
+    Any object with a "get(url)" method returning the raw response body
+        (bytes) can be plugged into Client as its transport. This default one
+        keeps a requests.Session whose connection pool holds up to
+        "pool_size" persistent connections per host, so consecutive calls
+        reuse TCP connections to api.map.baidu.com instead of opening a new
+        one each time.
+
+    Attention! "timeout" is in seconds, either a number or a (connect, read)
+        tuple, as requests accepts. HTTP errors (4xx, 5xx) raise
+        requests.HTTPError.
+    """
+
+    def __init__(self, pool_size=10, timeout=10, gzip=True):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        headers = {'Connection': 'keep-alive'}
+        if gzip:
+            headers['Accept-Encoding'] = 'gzip, deflate'
+        else:
+            headers['Accept-Encoding'] = 'identity'
+        self.session.headers.update(headers)
+
+    def get(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def close(self):
+        self.session.close()
+
+
+class SimpleTransport(object):
+    """Unpooled transport: opens a fresh connection for every request, just
+        like calling requests.get() directly. Mostly kept for comparison.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+
+    def get(self, url):
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def close(self):
+        pass
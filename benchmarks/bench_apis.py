@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Per-call CPU overhead of argument normalization and URL building, i.e.
+everything Client.get() does before the network, for a few common calls.
+
+Usage: python benchmarks/bench_apis.py [number_of_calls]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import baidumaps
+from baidumaps import apis
+
+CALLS = [
+    ('place_search', apis.place_search,
+     ('银行',), {'location': '116.404,39.915', 'radius': 2000}),
+    ('geocode', apis.geocode, (), {'location': [116.404, 39.915]}),
+    ('route_matrix', apis.route_matrix,
+     ([[116.40, 39.91], [116.41, 39.92]], '116.42,39.93|116.43,39.94'), {}),
+    ('geoconv', apis.geoconv, ('114.21892734521,29.575429778924',), {}),
+]
+
+
+def main(number=50000):
+    client = baidumaps.Client(ak='abc')
+    for name, api, args, kwargs in CALLS:
+        start = time.time()
+        for _ in range(number):
+            client.generate_url(apis.prepare(api, *args, **kwargs))
+        elapsed = time.time() - start
+        print('%-14s %6.2f us/call' % (name, elapsed / number * 1e6))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Points/second of the offline coordconv engine on one core, for every
+"from"/"to" pair.
+
+Usage: python benchmarks/bench_coordconv.py [number_of_points]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from baidumaps import coordconv
+
+NAMES = {1: 'WGS84', 3: 'GCJ-02', 5: 'BD-09'}
+
+
+def main(size=5000000):
+    points = np.random.RandomState(0).uniform([73, 18], [135, 53], (size, 2))
+    for from_ in (1, 3, 5):
+        for to in (1, 3, 5):
+            if from_ == to:
+                continue
+            start = time.time()
+            coordconv.convert(points, from_, to)
+            rate = size / (time.time() - start) / 1e6
+            print('%-6s -> %-6s %6.1f M points/s'
+                  % (NAMES[from_], NAMES[to], rate))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
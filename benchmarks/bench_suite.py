@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Throughput, latency and memory of the client against the local stub
+server: single calls to each of the ten endpoints, bulk geoconv, tiled route
+matrices and the cache paths.
+
+For each scenario it prints operations/s, requests/s actually served by the
+stub, p50/p99 latency of one operation, peak memory allocated by Python
+during one operation, and the share of operations failing with StatusError.
+
+Usage: python benchmarks/bench_suite.py [--calls N] [--latency MS]
+                                        [--error-rate R] [--metrics FILE]
+                                        [--only NAME]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import tracemalloc
+except ImportError:     # Python 2
+    tracemalloc = None
+
+from baidumaps import Client
+from baidumaps import cache
+from baidumaps.metrics import Metrics, export
+from baidumaps.exceptions import StatusError
+from stubserver import StubServer
+
+
+def single_calls():
+    return [
+        ('geoconv', lambda c, i: c.geoconv([114.2 + i * 1e-6, 29.5])),
+        ('route_matrix', lambda c, i: c.route_matrix(
+            [[116.40, 39.91], [116.41, 39.92]],
+            [[116.42, 39.93 + i * 1e-6], [116.43, 39.94]])),
+        ('ip_locate', lambda c, i: c.ip_locate('202.198.16.%d' % (i % 250))),
+        ('direct', lambda c, i: c.direct('天安门', '故宫%d' % i,
+                                         origin_region='北京',
+                                         destination_region='北京')),
+        ('geocode', lambda c, i: c.geocode('百度大厦%d' % i)),
+        ('place_suggest', lambda c, i: c.place_suggest('天安%d' % i, '北京')),
+        ('place_search', lambda c, i: c.place_search('银行%d' % i,
+                                                     region='北京',
+                                                     page_size=20)),
+        ('place_detail', lambda c, i: c.place_detail(uid='u%d' % i)),
+        ('place_eventsearch', lambda c, i: c.place_eventsearch(
+            '美食%d' % i, 'groupon', '北京', location=[116.40, 39.91])),
+        ('place_eventdetail', lambda c, i: c.place_eventdetail('u%d' % i)),
+    ]
+
+
+def bulk_calls(calls):
+    coords = [[114.0 + k * 1e-5, 29.5] for k in range(10000)]
+    points = [[116.3 + k * 1e-3, 39.9] for k in range(20)]
+    return [
+        ('geoconv_bulk 10k', lambda c, i: c.geoconv_bulk(coords),
+         max(1, calls // 100)),
+        ('route_matrix 20x20', lambda c, i: c.route_matrix_tiled(points,
+                                                                 points),
+         max(1, calls // 20)),
+    ]
+
+
+def cache_calls(server, tmp):
+    memory = Client(ak='bench', domain=server.domain,
+                    cache=cache.MemoryCache(maxsize=100000))
+    sqlite = Client(ak='bench', domain=server.domain,
+                    cache=cache.SQLiteCache(os.path.join(tmp, 'bench.db')))
+    return [
+        ('memory cache hit', memory, lambda c, i: c.geocode('百度大厦%d' % i)),
+        ('sqlite cache hit', sqlite, lambda c, i: c.geocode('百度大厦%d' % i)),
+        ('memory cache miss', memory,
+         lambda c, i: c.geocode('未缓存%d' % i)),
+    ]
+
+
+def fill(clients, calls):
+    for client in clients:
+        for i in range(-1, calls + 1):
+            attempt(lambda c, i: c.geocode('百度大厦%d' % i), client, i)
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1,
+                             int(p * len(sorted_values)))]
+
+
+def attempt(op, client, i):
+    """True if op succeeds, False if it fails with StatusError."""
+    try:
+        op(client, i)
+        return True
+    except StatusError:
+        return False
+
+
+def peak_memory(op, client, i):
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    attempt(op, client, i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(name, server, client, op, number):
+    attempt(op, client, -1)     # warm up
+    served = server.total
+    latencies = []
+    errors = 0
+    start = time.time()
+    for i in range(number):
+        t = time.time()
+        if not attempt(op, client, i):
+            errors += 1
+        latencies.append(time.time() - t)
+    elapsed = time.time() - start
+    served = server.total - served
+
+    latencies.sort()
+    peak = peak_memory(op, client, number)
+    print('%-20s %7d %9.1f %9.1f %8.2f %8.2f %9s %6.1f%%'
+          % (name, number, number / elapsed, served / elapsed,
+             percentile(latencies, 0.5) * 1e3,
+             percentile(latencies, 0.99) * 1e3,
+             '-' if peak is None else '%.1f' % (peak / 1024.0),
+             100.0 * errors / number))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--calls', type=int, default=500,
+                        help='operations per single-call scenario')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='milliseconds added by the stub to each answer')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='share of answers with a non-zero status')
+    parser.add_argument('--metrics', default='',
+                        help='collect Client metrics and append their '
+                             'summary to this file')
+    parser.add_argument('--only', default='',
+                        help='run the scenarios whose name contains this')
+    args = parser.parse_args(argv)
+
+    server = StubServer(latency=args.latency / 1e3,
+                        error_rate=args.error_rate).start()
+    tmp = tempfile.mkdtemp()
+    print('%-20s %7s %9s %9s %8s %8s %9s %7s'
+          % ('scenario', 'ops', 'ops/s', 'req/s', 'p50 ms', 'p99 ms',
+             'peak KiB', 'errors'))
+    try:
+        metrics = Metrics() if args.metrics else None
+        client = Client(ak='bench', domain=server.domain, metrics=metrics)
+        for name, op in single_calls():
+            if args.only in name:
+                run(name, server, client, op, args.calls)
+        for name, op, number in bulk_calls(args.calls):
+            if args.only in name:
+                run(name, server, client, op, number)
+        chosen = [(name, cached, op)
+                  for name, cached, op in cache_calls(server, tmp)
+                  if args.only in name]
+        fill(set(cached for _, cached, _ in chosen), args.calls)
+        for name, cached, op in chosen:
+            run(name, server, cached, op, args.calls)
+        if metrics is not None:
+            export(metrics, args.metrics)
+    finally:
+        server.stop()
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Requests/second of Client.geoconv() against the local stub server, with
+and without the pooled keep-alive transport.
+
+Usage: python benchmarks/bench_transport.py [number_of_calls]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baidumaps import Client
+from baidumaps.transport import Transport, SimpleTransport
+from stubserver import StubServer
+
+
+def run(client, calls):
+    start = time.time()
+    for _ in range(calls):
+        client.geoconv('114.21892734521,29.575429778924')
+    return calls / (time.time() - start)
+
+
+def main(calls=2000):
+    server = StubServer().start()
+    try:
+        for name, transport in [('unpooled', SimpleTransport()),
+                                ('pooled', Transport(pool_size=10))]:
+            client = Client(ak='bench', domain=server.domain,
+                            transport=transport)
+            run(client, 50)     # warm up
+            print('%-10s %8.1f req/s' % (name, run(client, calls)))
+            transport.close()
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
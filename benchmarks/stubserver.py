@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""A tiny local stand-in for api.map.baidu.com, used by the benchmarks.
+
+It speaks HTTP/1.1 with keep-alive and answers the ten endpoints Client
+calls with payloads shaped like Baidu's, sized by the request (one point per
+geoconv coordinate, one element per route_matrix pair, "page_size" places).
+"latency" delays every answer, and a share "error_rate" of the answers carry
+a non-zero status picked from exceptions.messages for that service, so
+pooled and unpooled transports, caches and retries can be compared without
+spending any quota.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+except ImportError:     # Python 3
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baidumaps import exceptions
+
+
+def pairs(text):
+    """[(a, b), ...] of "a,b|a,b" or "a,b;a,b"."""
+    return [tuple(p.split(',')[:2]) for p in text.replace(';', '|').split('|')
+            if ',' in p]
+
+
+def place(i, lat, lng):
+    return {'uid': 'uid%08d' % i, 'name': '网点%d' % i,
+            'location': {'lat': lat + i * 1e-4, 'lng': lng + i * 1e-4},
+            'address': '北京市东城区东长安街%d号' % i,
+            'telephone': '(010)6518%04d' % i, 'street_id': 'sid%08d' % i,
+            'detail': 1,
+            'detail_info': {'tag': '金融;银行', 'type': 'life',
+                            'overall_rating': '4.5'}}
+
+
+def geoconv(query):
+    coords = pairs(query.get('coords', '114.2,29.5'))
+    return {'status': 0,
+            'result': [{'x': float(x) + 0.0065, 'y': float(y) + 0.006}
+                       for x, y in coords]}
+
+
+def routematrix(query):
+    origins = query.get('origins', '').split('|')
+    destinations = query.get('destinations', '').split('|')
+    elements = []
+    for i in range(len(origins)):
+        for j in range(len(destinations)):
+            meters = 1000 + 250 * (i + j)
+            elements.append({'distance': {'text': '%.1f公里' % (meters / 1e3),
+                                          'value': meters},
+                             'duration': {'text': '%d分钟' % (meters // 500),
+                                          'value': meters * 0.12}})
+    return {'status': 0, 'message': 'ok', 'info': {'copyright': {}},
+            'result': {'elements': elements}}
+
+
+def location_ip(query):
+    return {'status': 0, 'address': 'CN|北京|北京|None|CHINANET|0|0',
+            'content': {'address': '北京市',
+                        'address_detail': {'city': '北京市', 'city_code': 131,
+                                           'district': '', 'province': '北京市',
+                                           'street': '', 'street_number': ''},
+                        'point': {'x': '116.39564504', 'y': '39.92998578'}}}
+
+
+def direction(query):
+    point = {'lng': 116.404, 'lat': 39.915}
+    steps = [{'instructions': '向东行驶%d米' % (100 * k), 'distance': 100 * k,
+              'duration': 12 * k, 'path': '116.40,39.91;116.41,39.92'}
+             for k in range(1, 21)]
+    return {'status': 0, 'message': 'ok', 'type': 2,
+            'result': {'origin': {'originPt': point},
+                       'destination': {'destinationPt': point},
+                       'routes': [{'distance': 21000, 'duration': 2520,
+                                   'steps': steps}],
+                       'taxi': {'distance': 21000}}}
+
+
+def geocoder(query):
+    if 'location' in query:
+        lat, lng = map(float, query['location'].split(','))
+        return {'status': 0,
+                'result': {'location': {'lng': lng, 'lat': lat},
+                           'formatted_address': '北京市东城区东长安街',
+                           'business': '天安门,前门,王府井',
+                           'addressComponent': {'city': '北京市',
+                                                'district': '东城区',
+                                                'province': '北京市',
+                                                'street': '东长安街',
+                                                'street_number': ''},
+                           'cityCode': 131}}
+    return {'status': 0,
+            'result': {'location': {'lng': 116.3076, 'lat': 40.0568},
+                       'precise': 1, 'confidence': 80, 'level': '商务大厦'}}
+
+
+def place_list(query, key):
+    size = int(query.get('page_size', 10))
+    page = int(query.get('page_num', 0))
+    total = 200
+    start = page * size
+    results = [place(i, 39.915, 116.404)
+               for i in range(start, min(start + size, total))]
+    return {'status': 0, 'message': 'ok', 'total': total, key: results}
+
+
+def place_suggestion(query):
+    return {'status': 0, 'message': 'ok',
+            'result': [{'name': query.get('query', '') + str(i),
+                        'city': '北京市', 'district': '海淀区',
+                        'business': '', 'cityid': '131', 'uid': 'u%d' % i}
+                       for i in range(10)]}
+
+
+def place_detail(query):
+    return {'status': 0, 'message': 'ok',
+            'result': place(0, 39.915, 116.404)}
+
+
+def place_eventdetail(query):
+    return {'status': 0, 'message': 'ok',
+            'result': dict(place(0, 39.915, 116.404),
+                           events=[{'groupon_title': '团购%d' % k,
+                                    'groupon_price': 10.0 * k}
+                                   for k in range(5)])}
+
+
+VERSION = re.compile(r'^v\d+$')
+
+# payload builder of each service, named like exceptions.messages.
+PAYLOADS = {'geoconv': geoconv,
+            'directionroutematrix': routematrix,
+            'locationip': location_ip,
+            'direction': direction,
+            'geocoder': geocoder,
+            'placesuggestion': place_suggestion,
+            'placesearch': lambda query: place_list(query, 'results'),
+            'placedetail': place_detail,
+            'placeeventsearch': lambda query: place_list(query, 'results'),
+            'placeeventdetail': place_eventdetail}
+
+
+def service_name(path):
+    """"/geoconv/v1/" -> "geoconv", "/place/v2/search" -> "placesearch"."""
+    return ''.join(part for part in path.split('/')
+                   if part and not VERSION.match(part))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        name = service_name(url.path)
+        query = dict((k, v[0]) for k, v in parse_qs(url.query).items())
+        if server.latency:
+            time.sleep(server.latency)
+
+        if name not in PAYLOADS:
+            self.reply(404, b'not found')
+            return
+        status = server.pick_error(name)
+        if status:
+            payload = {'status': status, 'message': 'stub error'}
+        else:
+            payload = PAYLOADS[name](query)
+        server.count(name)
+        self.reply(200, json.dumps(payload).encode('utf-8'))
+
+    def reply(self, code, body):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0,
+                 seed=0):
+        HTTPServer.__init__(self, (host, port), StubHandler)
+        self.thread = None
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    @property
+    def domain(self):
+        return 'http://%s:%d' % self.server_address[:2]
+
+    @property
+    def total(self):
+        return sum(self.requests.values())
+
+    def count(self, name):
+        with self.lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+    def pick_error(self, name):
+        """A numeric status from exceptions.messages[name] for a share
+            "error_rate" of the calls, 0 for the others.
+        """
+        with self.lock:
+            if not self.error_rate or self.random.random() >= self.error_rate:
+                return 0
+            statuses = [int(s) for s in exceptions.messages.get(name, {})
+                        if s.isdigit()]
+            return self.random.choice(sorted(statuses)) if statuses else 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -19,5 +19,5 @@ setup(name='baidumaps',
       license='MIT',
       url='https://github.com/elisong/baidu-maps-services-python',
       packages=find_packages(),
-      install_requires=[],
+      install_requires=['requests'],
       )
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import threading
+import time
+import baidumaps
+
+
+class StaticTransport(object):
+    """Answer every request with the same body.
+
+    The body is JSON-encoded unless it is already bytes. The transport counts
+    calls, records urls and tracks the peak number of concurrent requests;
+    ``delay`` makes each request sleep that many seconds.
+    """
+
+    def __init__(self, body, delay=0):
+        self.reply(body)
+        self.delay = delay
+        self.calls = 0
+        self.urls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def reply(self, body):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.body = body
+
+    def get(self, url):
+        with self.lock:
+            self.calls += 1
+            self.urls.append(url)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return self.body
+
+    def close(self):
+        pass
+
+
+def client_for(body, **kwargs):
+    return baidumaps.Client(ak='abc', transport=StaticTransport(body),
+                            **kwargs)
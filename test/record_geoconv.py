@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Records real geoconv() answers for test_coordconv.py's accuracy test.
+
+Usage: python test/record_geoconv.py <ak> [points_per_pair]
+
+Converts random points across China with every "from"/"to" pair coordconv
+supports and the API accepts (to must be 5), and writes them to
+test/data/geoconv_recorded.jsonl.
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import baidumaps
+
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data',
+                      'geoconv_recorded.jsonl')
+
+
+def main(ak, size=100):
+    client = baidumaps.Client(ak=ak)
+    rng = random.Random(0)
+    if not os.path.isdir(os.path.dirname(OUTPUT)):
+        os.makedirs(os.path.dirname(OUTPUT))
+    with open(OUTPUT, 'w') as out:
+        for from_ in (1, 3):
+            coords = [[round(rng.uniform(73.5, 134.7), 6),
+                       round(rng.uniform(18.2, 53.5), 6)]
+                      for _ in range(int(size))]
+            response = client.geoconv(coords, raw=True,
+                                      **{'from': from_, 'to': 5})
+            result = [[r['x'], r['y']] for r in response['result']]
+            out.write(json.dumps({'from': from_, 'to': 5, 'coords': coords,
+                                  'result': result}) + '\n')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
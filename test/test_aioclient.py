@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import os
+import sys
+import unittest
+from baidumaps import exceptions
+from baidumaps.aioclient import AsyncClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'benchmarks'))
+
+from stubserver import StubServer
+from test.fakes import StaticTransport
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class AsyncClientTest(unittest.TestCase):
+    def test_same_result_as_client(self):
+        fake = StaticTransport({'status': 0, 'result': [{'x': 1.5, 'y': 2.5}]},
+                               delay=0.05)
+        client = AsyncClient(ak='abc', transport=fake)
+        result = asyncio.run(client.geoconv('1,2'))
+        self.assertEqual(result, {'lng': 1.5, 'lat': 2.5})
+
+    def test_concurrency_limit(self):
+        fake = StaticTransport({'status': 0, 'result': [{'x': 1, 'y': 2}]},
+                               delay=0.05)
+        client = AsyncClient(ak='abc', transport=fake, concurrency=4)
+
+        async def run():
+            return await asyncio.gather(*[client.geoconv('1,2')
+                                          for _ in range(12)])
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 12)
+        self.assertEqual(fake.peak, 4)
+
+    def test_status_error(self):
+        fake = StaticTransport({'status': 24})
+        client = AsyncClient(ak='abc', transport=fake)
+        with self.assertRaises(exceptions.StatusError):
+            asyncio.run(client.geoconv('1,2'))
+
+@unittest.skipIf(np is None, 'needs NumPy')
+class AsyncBulkTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+        self.client = AsyncClient(ak='abc', domain=self.server.domain)
+
+    def tearDown(self):
+        asyncio.run(self.client.close())
+        self.server.stop()
+
+    def test_columns_off_the_loop(self):
+        for name in ('geocode_columns', 'geoconv_columns',
+                     'route_matrix_columns'):
+            self.assertTrue(asyncio.iscoroutinefunction(
+                getattr(self.client, name)), name)
+
+        async def run():
+            converted = await self.client.geoconv_columns([114.0, 114.1],
+                                                          [29.5, 29.5])
+            matrix = await self.client.route_matrix_columns(
+                [116.4], [39.9], [116.6, 116.7], [39.8, 39.8])
+            return converted, matrix
+
+        converted, matrix = asyncio.run(run())
+        np.testing.assert_allclose(converted['lng'], [114.0065, 114.1065])
+        self.assertEqual(matrix['distance'].shape, (1, 2))
+
+    def test_async_iterators(self):
+        async def run():
+            pois = [poi async for poi in self.client.place_search_iter(
+                '餐馆', region='北京')]
+            crawler = self.client.place_crawl(
+                '餐馆', [[116.3, 39.8], [116.5, 40.0]])
+            crawled = [poi async for poi in crawler]
+            return pois, crawled, crawler
+
+        pois, crawled, crawler = asyncio.run(run())
+        self.assertEqual(len(pois), 200)
+        self.assertEqual(len(crawled), 200)
+        self.assertEqual(crawler.requests, 10)
+
+    def test_route_nearest(self):
+        self.assertTrue(asyncio.iscoroutinefunction(self.client.route_nearest))
+        depots = [[116.0 + 0.1 * i, 39.9] for i in range(10)]
+        result = asyncio.run(self.client.route_nearest(
+            [[116.05, 39.9], [116.82, 39.9]], depots, k=2))
+        self.assertEqual(result['report']['requests'], self.server.total)
+        self.assertEqual(result['nearest'][0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import unittest
+import baidumaps
+from baidumaps import apis
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_location_and_bounds(self):
+        params = apis.prepare(apis.place_search, '银行',
+                              location='116.404,39.915')
+        self.assertEqual(params['location'], '39.915,116.404')
+        params = apis.prepare(apis.place_search, '银行',
+                              bounds=[[116.404, 39.915], [116.414, 39.975]])
+        self.assertEqual(params['bounds'], '39.915,116.404,39.975,116.414')
+        self.assertRaises(ValueError, apis.prepare, apis.geocode,
+                          location='116.404')
+
+    def test_route_matrix_str(self):
+        params = apis.prepare(apis.route_matrix, '116.40,39.91|116.41,39.92',
+                              '天安门|故宫')
+        self.assertEqual(params['origins'], '39.91,116.40|39.92,116.41')
+        self.assertEqual(params['destinations'], '天安门|故宫')
+
+    def test_direct(self):
+        params = apis.prepare(apis.direct, '天安门', [116.41, 39.92],
+                              origin_region='北京', destination_region='北京')
+        self.assertEqual(params['origin'], '天安门')
+        self.assertEqual(params['destination'], '39.92,116.41')
+
+    def test_geoconv(self):
+        params = apis.prepare(apis.geoconv, [[114.2, 29.5], [114.3, 29.6]])
+        self.assertEqual(params['coords'], '114.2,29.5;114.3,29.6')
+
+
+class URLTest(unittest.TestCase):
+    def test_base_url_cached(self):
+        client = baidumaps.Client(ak='abc')
+        params = {'server_name': 'location', 'version': '',
+                  'subserver_name': 'ip', 'ip': '1.2.3.4', 'raw': True}
+        url = client.generate_url(params)
+        self.assertTrue(
+            url.startswith('http://api.map.baidu.com/location/ip?'))
+        self.assertNotIn('raw', url)
+        self.assertIn(('location', '', 'ip'), client.base_urls)
+        self.assertEqual(client.generate_url(params), url)
+        self.assertIn('raw', params)
+
+
+if __name__ == '__main__':
+    unittest.main()
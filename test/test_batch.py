@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import requests
+import baidumaps
+from baidumaps import apis
+from baidumaps.batch import run_batch
+from baidumaps.client import peek_status
+
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs
+
+
+class GeocodeTransport(object):
+    """Geocodes "addr<n>" to lng n; dies on any address in "broken"."""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.seen = []
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        address = parse_qs(urlparse(url).query)['address'][0]
+        if address in self.broken:
+            raise RuntimeError('worker killed')
+        if address == 'slow':
+            raise requests.Timeout('read timed out')
+        with self.lock:
+            self.seen.append(address)
+        if address == 'bad':
+            return b'{"status": 2}'
+        body = {'status': 0,
+                'result': {'location': {'lng': int(address[4:]), 'lat': 0}}}
+        return json.dumps(body).encode('utf-8')
+
+
+def lng_and_address(result, row):
+    # module level, so worker processes can unpickle it.
+    return [result['location']['lng'], row['address']]
+
+
+def tagging_decoder(body):
+    response = json.loads(body.decode('utf-8'))
+    response['decoder'] = 'tagging'
+    return response
+
+
+def unchanged(result, row):
+    return result
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmpdir, 'out.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_input(self, name, text):
+        path = os.path.join(self.tmpdir, name)
+        with io.open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text)
+        return path
+
+    def read_output(self):
+        with io.open(self.output, encoding='utf-8') as handle:
+            return [json.loads(line) for line in handle]
+
+    def test_csv_with_error_rows(self):
+        path = self.write_input('in.csv',
+                                u'address\naddr1\nbad\naddr3\n')
+        client = baidumaps.Client(ak='abc', transport=GeocodeTransport())
+        self.assertEqual(run_batch(client, 'geocode', path, self.output,
+                                   workers=2), 3)
+        records = self.read_output()
+        self.assertEqual([r['row'] for r in records], [0, 1, 2])
+        self.assertEqual(records[0]['result']['location']['lng'], 1)
+        self.assertTrue(records[1]['error'].startswith('[status 2]'))
+
+    def test_resume_after_crash(self):
+        lines = [json.dumps({'address': 'addr%d' % i}) for i in range(50)]
+        path = self.write_input('in.jsonl', u'\n'.join(lines) + u'\n')
+
+        crashing = GeocodeTransport(broken=['addr27'])
+        client = baidumaps.Client(ak='abc', transport=crashing)
+        with self.assertRaises(RuntimeError):
+            run_batch(client, 'geocode', path, self.output, workers=2,
+                      window=10)
+        self.assertEqual(len(self.read_output()), 20)
+
+        transport = GeocodeTransport()
+        client = baidumaps.Client(ak='abc', transport=transport)
+        self.assertEqual(run_batch(client, 'geocode', path, self.output,
+                                   workers=2, window=10), 30)
+        self.assertEqual(len(transport.seen), 30)
+        records = self.read_output()
+        self.assertEqual([r['row'] for r in records], list(range(50)))
+
+    def test_processes_keep_order(self):
+        lines = [json.dumps({'address': 'bad' if i == 5 else 'addr%d' % i})
+                 for i in range(50)]
+        path = self.write_input('in.jsonl', u'\n'.join(lines) + u'\n')
+        client = baidumaps.Client(ak='abc', transport=GeocodeTransport())
+        self.assertEqual(run_batch(client, 'geocode', path, self.output,
+                                   workers=4, window=7, processes=2,
+                                   queue_size=4), 50)
+        records = self.read_output()
+        self.assertEqual([r['row'] for r in records], list(range(50)))
+        self.assertEqual(records[49]['result']['location']['lng'], 49)
+        self.assertTrue(records[5]['error'].startswith('[status 2]'))
+        with open(self.output + '.ckpt') as handle:
+            self.assertEqual(json.load(handle)['rows'], 50)
+
+    def test_status_read_without_decoding(self):
+        self.assertEqual(peek_status(b'{"status":0,"result":[]}'), 0)
+        self.assertEqual(peek_status(b' { "status" : 302 }'), 302)
+        self.assertIsNone(peek_status(b'{"result": [], "status": 0}'))
+        client = baidumaps.Client(ak='abc', transport=GeocodeTransport())
+        params = apis.prepare(apis.geocode, address='addr7')
+        body, response = client.fetch_body(params)
+        self.assertIsNone(response)     # workers get bytes only
+        self.assertEqual(client.fetch(params)['result']['location']['lng'], 7)
+
+    def test_postprocess(self):
+        lines = [json.dumps({'address': 'addr%d' % i}) for i in range(20)]
+        path = self.write_input('in.jsonl', u'\n'.join(lines) + u'\n')
+        client = baidumaps.Client(ak='abc', transport=GeocodeTransport())
+        for processes in (0, 2):
+            if os.path.exists(self.output):
+                os.remove(self.output)
+                os.remove(self.output + '.ckpt')
+            run_batch(client, 'geocode', path, self.output, workers=2,
+                      processes=processes, postprocess=lng_and_address)
+            self.assertEqual([r['result'] for r in self.read_output()],
+                             [[i, 'addr%d' % i] for i in range(20)])
+
+    def test_malformed_rows_and_network_errors(self):
+        lines = [json.dumps({'address': 'addr0'}), json.dumps({'city': 'x'}),
+                 json.dumps({'address': 'slow'}),
+                 json.dumps({'address': 'addr3'})]
+        path = self.write_input('in.jsonl', u'\n'.join(lines) + u'\n')
+        client = baidumaps.Client(ak='abc', transport=GeocodeTransport())
+        for processes in (0, 2):
+            if os.path.exists(self.output):
+                os.remove(self.output)
+                os.remove(self.output + '.ckpt')
+            self.assertEqual(run_batch(client, 'geocode', path, self.output,
+                                       processes=processes), 4)
+            records = self.read_output()
+            self.assertTrue(records[1]['error'].startswith('ValueError'))
+            self.assertTrue(records[2]['error'].startswith('Timeout'))
+            self.assertEqual(records[3]['result']['location']['lng'], 3)
+
+        # a required column missing: geoconv() gets no "coords".
+        path = self.write_input('in.csv', u'from,to\n1,5\n')
+        os.remove(self.output)
+        os.remove(self.output + '.ckpt')
+        self.assertEqual(run_batch(client, 'geoconv', path, self.output), 1)
+        self.assertTrue(self.read_output()[0]['error'].startswith('TypeError'))
+
+    def test_caller_decoder_in_workers(self):
+        path = self.write_input('in.jsonl', u'{"address": "addr1"}\n')
+        client = baidumaps.Client(ak='abc', transport=GeocodeTransport(),
+                                  decoder=tagging_decoder)
+        run_batch(client, 'geocode', path, self.output, processes=2,
+                  raw=True)
+        self.assertEqual(self.read_output()[0]['result']['decoder'],
+                         'tagging')
+
+    def test_results_not_json(self):
+        path = self.write_input('in.jsonl', u'{"address": "addr1"}\n')
+        client = baidumaps.Client(ak='abc', transport=GeocodeTransport())
+        self.assertRaises(ValueError, run_batch, client, 'geocode', path,
+                          self.output, typed=True)
+        for processes in (0, 2):
+            if os.path.exists(self.output):
+                os.remove(self.output)
+                os.remove(self.output + '.ckpt')
+            self.assertEqual(run_batch(client, 'geocode', path, self.output,
+                                       processes=processes, typed=True,
+                                       postprocess=unchanged), 1)
+            self.assertTrue(self.read_output()[0]['error'].startswith(
+                'TypeError'))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import threading
+import time
+import unittest
+import baidumaps
+from baidumaps import exceptions
+from baidumaps.breaker import AdaptiveLimit, CircuitBreaker
+from baidumaps.ratelimit import RateLimiter
+
+
+class FlakyTransport(object):
+    """Answers geoconv with status 1 (internal error) while "failing"."""
+
+    def __init__(self):
+        self.failing = False
+        self.calls = 0
+
+    def get(self, url):
+        self.calls += 1
+        status = 1 if self.failing else 0
+        return json.dumps({'status': status, 'result': [{'x': 1, 'y': 2}]}
+                          ).encode('utf-8')
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.breaker = CircuitBreaker(error_rate=0.5, window=10, min_calls=4,
+                                      cooldown=30, probes=2)
+        self.breaker.clock = lambda: self.now[0]
+        self.transport = FlakyTransport()
+        self.client = baidumaps.Client(ak='abc', transport=self.transport,
+                                       breaker=self.breaker)
+
+    def call(self):
+        try:
+            self.client.geoconv('1,2')
+            return 'ok'
+        except exceptions.CircuitOpenError:
+            return 'open'
+        except exceptions.StatusError:
+            return 'error'
+
+    def test_opens_and_recovers(self):
+        self.transport.failing = True
+        self.assertEqual([self.call() for _ in range(5)],
+                         ['error'] * 4 + ['open'])
+        self.assertEqual(self.transport.calls, 4)
+        self.assertEqual(self.breaker.state('geoconv'), 'open')
+
+        self.now[0] = 31.0      # half-open: a failing probe reopens
+        self.assertEqual(self.call(), 'error')
+        self.assertEqual(self.breaker.state('geoconv'), 'open')
+
+        self.now[0] = 62.0
+        self.transport.failing = False
+        self.assertEqual([self.call(), self.call()], ['ok', 'ok'])
+        self.assertEqual(self.breaker.state('geoconv'), 'closed')
+        self.assertEqual(self.breaker.opened, 2)
+
+    def test_rejected_calls_use_no_quota(self):
+        limiter = RateLimiter(daily_quota={'geoconv': 30})
+        limit = AdaptiveLimit(initial=2)
+        client = baidumaps.Client(ak='abc', transport=self.transport,
+                                  breaker=self.breaker, rate_limiter=limiter,
+                                  adaptive_limit=limit)
+        self.transport.failing = True
+        for _ in range(40):
+            try:
+                client.geoconv('1,2')
+            except (exceptions.StatusError, exceptions.CircuitOpenError):
+                pass
+        self.assertEqual(self.transport.calls, 4)
+        self.assertEqual(limiter.remaining('abc', 'geoconv'), 26)
+        self.assertEqual(limit.inflight['geoconv'], 0)
+
+        # the quota running out is not a failure of the service.
+        self.now[0] = 31.0
+        self.transport.failing = False
+        limiter.exhaust('abc', 'geoconv')
+        with self.assertRaises(exceptions.QuotaError):
+            client.geoconv('1,2')
+        self.assertEqual(self.breaker.circuits['geoconv'].probing, 0)
+        self.assertEqual(limit.inflight['geoconv'], 0)
+
+    def test_request_errors_do_not_count(self):
+        for _ in range(10):
+            self.breaker.before('geoconv')
+            self.breaker.after('geoconv', 0.1,
+                               exceptions.StatusError('geoconv', '', 24))
+        self.assertEqual(self.breaker.state('geoconv'), 'closed')
+
+    def test_slow_calls(self):
+        breaker = CircuitBreaker(latency=1.0, min_calls=3)
+        for seconds in (2.0, 0.1, 3.0):
+            breaker.before('geocoder')
+            breaker.after('geocoder', seconds)
+        self.assertRaises(exceptions.CircuitOpenError, breaker.before,
+                          'geocoder')
+
+
+class AdaptiveLimitTest(unittest.TestCase):
+    def test_additive_increase_multiplicative_decrease(self):
+        limit = AdaptiveLimit(initial=4, maximum=6)
+        now = [0.0]
+        limit.clock = lambda: now[0]
+        for _ in range(6):      # about a round of successes: +1
+            limit.release('geoconv', limit.acquire('geoconv'), 0.1)
+        self.assertEqual(limit.limit('geoconv'), 5)
+
+        started = [limit.acquire('geoconv') for _ in range(5)]
+        now[0] = 1.0
+        error = exceptions.StatusError('geoconv', '', 1)
+        for t in started:       # one cut for the whole round
+            limit.release('geoconv', t, 0.1, error)
+        self.assertEqual(limit.limit('geoconv'), 2)
+
+    def test_caps_inflight(self):
+        limit = AdaptiveLimit(initial=2, latency=10)
+        peak = [0]
+        running = [0]
+        lock = threading.Lock()
+
+        def work():
+            started = limit.acquire('place')
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            limit.release('place', started, 0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(peak[0], 3)    # 2, growing by 1/2 per success
+        self.assertEqual(limit.inflight['place'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import threading
+import unittest
+import baidumaps
+from baidumaps import exceptions
+from baidumaps.bulk import run_ordered
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs
+
+
+class GeoconvTransport(object):
+    """Echoes coords back shifted by (+1, +2), as geoconv would convert them.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        with self.lock:
+            self.calls += 1
+        coords = parse_qs(urlparse(url).query)['coords'][0]
+        result = []
+        for pair in coords.split(';'):
+            x, y = map(float, pair.split(','))
+            result.append({'x': x + 1, 'y': y + 2})
+        return json.dumps({'status': 0, 'result': result}).encode('utf-8')
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class GeoconvBulkTest(unittest.TestCase):
+    def setUp(self):
+        self.transport = GeoconvTransport()
+        self.client = baidumaps.Client(ak='abc', transport=self.transport)
+
+    def test_numpy_input_keeps_order(self):
+        points = np.column_stack([np.arange(1050.0), np.arange(1050.0) / 2])
+        result = self.client.geoconv_bulk(points, workers=4)
+        self.assertEqual(result.shape, (1050, 2))
+        np.testing.assert_allclose(result, points + [1, 2])
+        self.assertEqual(self.transport.calls, 11)
+
+    def test_generator_and_single_point_shape(self):
+        result = self.client.geoconv_bulk(([i, i] for i in range(1)))
+        self.assertEqual(result.shape, (1, 2))
+        result = self.client.geoconv_bulk(([i, i] for i in range(250)))
+        self.assertEqual(result.shape, (250, 2))
+        self.assertEqual(self.transport.calls, 4)
+
+    def test_typed(self):
+        points = self.client.geoconv_bulk([[1, 2], [3, 4]], typed=True)
+        self.assertEqual(list(points.lng), [2, 4])
+        self.assertEqual(points[1].lat, 6)
+
+    def test_reads_jobs_as_it_goes(self):
+        drawn = [0]
+
+        def jobs():
+            for i in range(10000):
+                drawn[0] += 1
+                yield i
+
+        results = run_ordered(lambda i: i * 2, jobs(), workers=4)
+        self.assertEqual([next(results) for _ in range(3)], [0, 2, 4])
+        self.assertLessEqual(drawn[0], 8 + 3)
+        self.assertEqual(sum(results), sum(i * 2 for i in range(3, 10000)))
+
+    def test_status_error(self):
+        class Failing(object):
+            def get(self, url):
+                return b'{"status": 24}'
+
+        client = baidumaps.Client(ak='abc', transport=Failing())
+        with self.assertRaises(exceptions.StatusError):
+            client.geoconv_bulk([[1, 2]] * 300)
+
+class MatrixTransport(object):
+    """Answers every routematrix cell with distance = 1000 * i + j of the
+        global origin/destination indexes encoded in the lat of each point;
+        destination 7 always fails.
+    """
+
+    def get(self, url):
+        query = parse_qs(urlparse(url).query)
+        origins = [int(float(o.split(',')[0]))
+                   for o in query['origins'][0].split('|')]
+        destinations = [int(float(d.split(',')[0]))
+                        for d in query['destinations'][0].split('|')]
+        elements = []
+        for o in origins:
+            for d in destinations:
+                if d == 7:
+                    elements.append({'status': 11, 'message': 'x'})
+                else:
+                    elements.append({'distance': {'value': 1000 * o + d},
+                                     'duration': {'value': o + d}})
+        return json.dumps({'status': 0,
+                           'result': {'elements': elements}}).encode('utf-8')
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class RouteMatrixTiledTest(unittest.TestCase):
+    def test_stitching(self):
+        client = baidumaps.Client(ak='abc', transport=MatrixTransport())
+        origins = [[100 + i, i] for i in range(12)]
+        destinations = [[100 + j, j] for j in range(9)]
+        result = client.route_matrix_tiled(origins, destinations, workers=3)
+        distance = result['distance']
+        self.assertEqual(distance.shape, (12, 9))
+        self.assertEqual(distance[11, 8], 11 * 1000 + 8)
+        self.assertEqual(result['duration'][3, 4], 7)
+        self.assertTrue(np.isnan(distance[:, 7]).all())
+        self.assertTrue((result['status'][:, 7] == 11).all())
+        self.assertEqual(result['status'].sum(), 11 * 12)
+
+        matrix = client.route_matrix_tiled(origins, destinations, typed=True)
+        self.assertEqual(matrix.cell(11, 8), (11 * 1000 + 8, 19, 0))
+        self.assertEqual(matrix.cell(2, 7)[2], 11)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+import baidumaps
+from baidumaps.cache import MemoryCache, SQLiteCache
+from test.fakes import StaticTransport
+
+
+class MemoryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.transport = StaticTransport(
+            {'status': 0, 'result': {'location': {'lng': 1, 'lat': 2}}})
+        self.cache = MemoryCache(maxsize=2, ttls={'geocoder': 100})
+        self.now = 0
+        self.cache.clock = lambda: self.now
+        self.client = baidumaps.Client(ak='abc', transport=self.transport,
+                                       cache=self.cache)
+
+    def test_hit_ignores_ak_and_raw(self):
+        other = baidumaps.Client(ak='xyz', transport=self.transport,
+                                 cache=self.cache)
+        first = self.client.geocode(address='百度大厦')
+        raw = other.geocode(address='百度大厦', raw=True)
+        self.assertEqual(self.transport.calls, 1)
+        self.assertEqual(raw['result'], first)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_ttl_and_lru(self):
+        self.client.geocode(address='a')
+        self.now = 101
+        self.client.geocode(address='a')
+        self.assertEqual(self.transport.calls, 2)
+        self.client.geocode(address='b')
+        self.client.geocode(address='a')
+        self.client.geocode(address='c')    # evicts "b"
+        self.client.geocode(address='a')
+        self.client.geocode(address='b')
+        self.assertEqual(self.transport.calls, 5)
+        self.assertEqual(self.cache.evictions, 2)
+
+    def test_errors_not_cached(self):
+        self.transport.body = b'{"status": 2}'
+        for _ in range(2):
+            with self.assertRaises(baidumaps.exceptions.StatusError):
+                self.client.geocode(address='a')
+        self.assertEqual(self.transport.calls, 2)
+        self.assertEqual(len(self.cache), 0)
+
+class SQLiteCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.db')
+        self.transport = StaticTransport(
+            {'status': 0, 'result': {'location': {'lng': 1, 'lat': 2}}})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_shared_across_instances(self):
+        cache = SQLiteCache(self.path)
+        client = baidumaps.Client(ak='abc', transport=self.transport,
+                                  cache=cache)
+        first = client.geocode(address='百度大厦')
+        cache.close()
+
+        reopened = SQLiteCache(self.path)
+        client = baidumaps.Client(ak='abc', transport=self.transport,
+                                  cache=reopened)
+        self.assertEqual(client.geocode(address='百度大厦'), first)
+        self.assertTrue(client.geocode(address='百度大厦', raw=True))
+        self.assertEqual(self.transport.calls, 1)
+        self.assertEqual(reopened.stats()['hits'], 2)
+
+    def test_expiry_and_compact(self):
+        cache = SQLiteCache(self.path, ttls={'geocoder': 10})
+        now = [0]
+        cache.clock = lambda: now[0]
+        cache.set('geocoder', 'a', b'{}')
+        cache.set('geoconv', 'b', b'{}')
+        now[0] = 11
+        self.assertIsNone(cache.get('geocoder', 'a'))
+        self.assertEqual(cache.get('geoconv', 'b'), b'{}')
+        self.assertEqual(cache.compact(), 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_items(self):
+        for cache in (MemoryCache(), SQLiteCache(self.path)):
+            cache.set('geocoder', 'a', b'1')
+            cache.set('geoconv', 'b', b'2')
+            self.assertEqual(sorted(cache.items()), [('a', b'1'), ('b', b'2')])
+            self.assertEqual(list(cache.items('geoconv')), [('b', b'2')])
+
+if __name__ == '__main__':
+    unittest.main()
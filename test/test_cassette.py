@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import baidumaps
+from baidumaps import cassette
+from baidumaps import exceptions
+
+
+class CountingTransport(object):
+    """Answers geoconv with the request number, status 24 for "0,0"."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url):
+        self.calls += 1
+        status = 24 if 'coords=0%2C0' in url else 0
+        return json.dumps({'status': status,
+                           'result': [{'x': self.calls, 'y': 0}]}
+                          ).encode('utf-8')
+
+
+class CassetteTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'run.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def record(self, coords, ak='abc'):
+        client = baidumaps.Client(ak=ak, transport=CountingTransport(),
+                                  record=self.path)
+        results = []
+        for c in coords:
+            try:
+                results.append(client.geoconv(c))
+            except exceptions.StatusError as e:
+                results.append(e.status)
+        client.close()
+        return results
+
+    def test_record_and_replay(self):
+        recorded = self.record(['1,2', '3,4', '0,0'])
+        self.assertTrue(os.path.exists(self.path + '.idx'))
+
+        client = baidumaps.Client(ak='other', replay=self.path)
+        self.assertEqual(len(client.transport), 3)
+        self.assertEqual(client.geoconv('3,4'), recorded[1])
+        self.assertEqual(client.geoconv('1,2'), recorded[0])
+        with self.assertRaises(exceptions.StatusError):
+            client.geoconv('0,0')
+        self.assertRaises(cassette.MissingRecording, client.geoconv, '5,6')
+        client.close()
+
+    def test_append_and_unindexed_tail(self):
+        self.record(['1,2'])
+        self.record(['3,4'])
+        # a crash after writing a record and half of the next one.
+        with open(self.path, 'ab') as f:
+            f.write(cassette.RECORD.pack(6, 2) + b'/x?a=1{}')
+            f.write(cassette.RECORD.pack(5, 9) + b'/y?')
+        player = cassette.Player(self.path)
+        self.assertEqual(len(player), 3)
+        self.assertEqual(player.get('http://stub/x?a=1&ak=k'), b'{}')
+        self.assertIsNotNone(player.get('http://api.map.baidu.com'
+                                        '/geoconv/v1/?output=json&ak=z'
+                                        '&coords=1%2C2'))
+        player.close()
+
+    def test_latency(self):
+        self.record(['1,2'])
+        slept = []
+        player = cassette.Player(self.path, latency=lambda: 0.25)
+        player.sleep = slept.append
+        client = baidumaps.Client(ak='abc', replay=player)
+        client.geoconv('1,2')
+        self.assertEqual(slept, [0.25])
+        player.close()
+
+    def test_last_recording_wins(self):
+        self.record(['1,2'])
+        second = self.record(['1,2'])
+        client = baidumaps.Client(ak='abc', replay=self.path)
+        self.assertEqual(client.geoconv('1,2'), second[0])
+        client.close()
+
+    def append(self, records):
+        with open(self.path, 'ab') as f:
+            for key, body in records:
+                f.write(cassette.RECORD.pack(len(key), len(body)) +
+                        key + body)
+
+    def test_index_merge_without_numpy(self):
+        records = [(b'/k?i=%d' % (i % 7), b'%d' % i) for i in range(20)]
+        self.append(records[:12])
+        cassette.build_index(self.path)
+        self.append(records[12:])
+
+        numpy = cassette.np
+        try:
+            cassette.np = None
+            cassette.build_index(self.path)
+            with open(self.path + '.idx', 'rb') as f:
+                plain = f.read()
+            cassette.np = numpy
+            os.remove(self.path + '.idx')
+            cassette.build_index(self.path)
+            with open(self.path + '.idx', 'rb') as f:
+                self.assertEqual(f.read(), plain)
+        finally:
+            cassette.np = numpy
+
+        indexed, entries = cassette.read_index(self.path)
+        self.assertEqual(indexed, os.path.getsize(self.path))
+        pairs = list(zip(entries[::2], entries[1::2]))
+        self.assertEqual(len(pairs), 20)
+        self.assertEqual(pairs, sorted(pairs))
+        player = cassette.Player(self.path)
+        self.assertEqual(player.find(b'/k?i=3'), b'17')
+        player.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import sys
+import unittest
+import baidumaps
+from baidumaps import columns
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'benchmarks'))
+
+from stubserver import StubServer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+@unittest.skipIf(np is None, 'needs NumPy')
+class ColumnsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+        self.client = baidumaps.Client(ak='abc', domain=self.server.domain)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_format_and_check(self):
+        lng, lat = columns.check_points([116.4, 116.5], [39.9, 1e-7])
+        self.assertEqual(columns.format_pairs(lat, lng),
+                         ['39.90000000,116.40000000',
+                          '0.00000010,116.50000000'])
+        self.assertRaises(ValueError, columns.check_points, [116.4, 200],
+                          [39.9, 39.9])
+        self.assertRaises(ValueError, columns.check_points, [116.4],
+                          [39.9, np.nan])
+
+    def test_geoconv(self):
+        lng = np.linspace(114.0, 114.1, 250)
+        lat = np.full(250, 29.5)
+        result = self.client.geoconv_columns(lng, lat, chunk_size=100)
+        np.testing.assert_allclose(result['lng'], lng + 0.0065)
+        np.testing.assert_allclose(result['lat'], lat + 0.006)
+        self.assertEqual(self.server.requests['geoconv'], 3)
+
+    def test_geocode(self):
+        result = self.client.geocode_columns(['百度大厦', None, '天安门'])
+        self.assertEqual(list(result['status']), [0, columns.MISSING, 0])
+        self.assertEqual(result['lng'][0], 116.3076)
+        self.assertTrue(np.isnan(result['lng'][1]))
+        self.assertEqual(result['level'][2], '商务大厦')
+
+        self.server.error_rate = 1.0
+        result = self.client.geocode_columns(lng=[116.4], lat=[39.9])
+        self.assertNotEqual(result['status'][0], 0)
+        self.assertIsNone(result['formatted_address'][0])
+
+    def test_route_matrix(self):
+        result = self.client.route_matrix_columns([116.4, 116.5],
+                                                  [39.9, 39.9],
+                                                  [116.6] * 7, [39.8] * 7)
+        self.assertEqual(result['distance'].shape, (2, 7))
+        self.assertEqual(result['distance'][1, 6], 1000 + 250 * 2)
+
+    @unittest.skipIf(pd is None, 'needs pandas')
+    def test_pandas_alignment(self):
+        points = pd.DataFrame({'lng': [116.4, 116.5], 'lat': [39.9, 39.8]},
+                              index=['a', 'b'])
+        located = self.client.geocode_columns(lng=points['lng'],
+                                              lat=points['lat'])
+        self.assertEqual(list(located.index), ['a', 'b'])
+        self.assertEqual(located.loc['b', 'city'], '北京市')
+
+        depots = pd.Series([116.6, 116.7], index=['x', 'y'])
+        matrix = self.client.route_matrix_columns(points['lng'],
+                                                  points['lat'], depots,
+                                                  [39.8, 39.8])
+        self.assertEqual(matrix.loc[('b', 'y'), 'distance'], 1500)
+        self.assertEqual(list(matrix.index.names), ['origin', 'destination'])
+        typed = self.client.route_matrix_columns(points['lng'],
+                                                 points['lat'], depots,
+                                                 [39.8, 39.8], typed=True)
+        self.assertEqual(typed.loc[('b', 'y'), 'distance'], 1500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import math
+import os
+import unittest
+import baidumaps
+
+try:
+    import numpy as np
+    from baidumaps import coordconv
+except ImportError:
+    np = None
+
+# recorded geoconv() responses, one JSON object per line:
+# {"from": 1, "to": 5, "coords": [[lng, lat], ...], "result": [[x, y], ...]}
+# the file shipped holds the response of the example in Baidu's Geoconv
+# documentation; test/record_geoconv.py replaces it with a larger recording.
+RECORDED = os.path.join(os.path.dirname(__file__), 'data',
+                        'geoconv_recorded.jsonl')
+
+# Meters; the public formulas only approximate Baidu's own offsets.
+TOLERANCE = 5.0
+
+
+def distance(a, b):
+    # equirectangular approximation, fine for a few meters.
+    lat = math.radians((a[1] + b[1]) / 2)
+    dx = math.radians(a[0] - b[0]) * math.cos(lat)
+    dy = math.radians(a[1] - b[1])
+    return 6371000 * math.hypot(dx, dy)
+
+
+def reference_wgs_to_gcj(lng, lat):
+    """The usual scalar form of the formula, as a reference."""
+    def transform(x, y, lat_side):
+        if lat_side:
+            r = -100 + 2 * x + 3 * y + 0.2 * y * y + 0.1 * x * y + \
+                0.2 * math.sqrt(abs(x))
+            r += (20 * math.sin(y * math.pi) +
+                  40 * math.sin(y / 3 * math.pi)) * 2 / 3
+            r += (160 * math.sin(y / 12 * math.pi) +
+                  320 * math.sin(y * math.pi / 30)) * 2 / 3
+        else:
+            r = 300 + x + 2 * y + 0.1 * x * x + 0.1 * x * y + \
+                0.1 * math.sqrt(abs(x))
+            r += (20 * math.sin(x * math.pi) +
+                  40 * math.sin(x / 3 * math.pi)) * 2 / 3
+            r += (150 * math.sin(x / 12 * math.pi) +
+                  300 * math.sin(x / 30 * math.pi)) * 2 / 3
+        r += (20 * math.sin(6 * x * math.pi) +
+              20 * math.sin(2 * x * math.pi)) * 2 / 3
+        return r
+
+    a, ee = 6378245.0, 0.00669342162296594323
+    dlat = transform(lng - 105, lat - 35, True)
+    dlng = transform(lng - 105, lat - 35, False)
+    magic = 1 - ee * math.sin(math.radians(lat)) ** 2
+    dlat = dlat * 180 / ((a * (1 - ee)) / (magic * math.sqrt(magic)) *
+                         math.pi)
+    dlng = dlng * 180 / (a / math.sqrt(magic) *
+                         math.cos(math.radians(lat)) * math.pi)
+    return lng + dlng, lat + dlat
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class CoordconvTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.points = rng.uniform([73, 18], [135, 53], (1000, 2))
+
+    def test_matches_scalar_formula(self):
+        result = coordconv.convert(self.points, 1, 3)
+        for point, converted in zip(self.points.tolist(), result.tolist()):
+            expected = reference_wgs_to_gcj(*point)
+            self.assertAlmostEqual(expected[0], converted[0], places=9)
+            self.assertAlmostEqual(expected[1], converted[1], places=9)
+
+    def test_round_trips(self):
+        for from_, to in [(1, 5), (1, 3), (3, 5)]:
+            there = coordconv.convert(self.points, from_, to)
+            back = coordconv.convert(there, to, from_)
+            self.assertLess(np.abs(back - self.points).max(), 1e-5)
+
+    def test_outside_china_untouched_by_gcj(self):
+        paris = [[2.3522, 48.8566]]
+        self.assertEqual(coordconv.convert(paris, 1, 3).tolist(), paris)
+
+    def test_origin(self):
+        with np.errstate(all='raise'):
+            for from_, to in [(1, 5), (3, 5), (5, 3)]:
+                result = coordconv.convert([[0.0, 0.0]], from_, to)
+                self.assertTrue(np.isfinite(result).all())
+        self.assertEqual(coordconv.convert([[0.0, 0.0]], 3, 5).tolist(),
+                         [[0.0065, 0.006]])
+
+    def test_unsupported_types(self):
+        with self.assertRaises(ValueError):
+            coordconv.convert(self.points, 2, 5)
+
+    def test_local_geoconv_client(self):
+        class NoNetwork(object):
+            def get(self, url):
+                raise AssertionError('should not be called')
+
+        client = baidumaps.Client(ak='abc', transport=NoNetwork(),
+                                  local_geoconv=True)
+        result = client.geoconv('114.21892734521,29.575429778924')
+        expected = coordconv.convert([[114.21892734521, 29.575429778924]])
+        self.assertEqual([result['lng'], result['lat']], expected[0].tolist())
+        bulk = client.geoconv_bulk(self.points, **{'from': 3, 'to': 5})
+        self.assertEqual(bulk.shape, (1000, 2))
+
+    @unittest.skipIf(not os.path.exists(RECORDED),
+                     'no recorded geoconv responses')
+    def test_recorded_responses(self):
+        with open(RECORDED) as handle:
+            for line in handle:
+                record = json.loads(line)
+                result = coordconv.convert(record['coords'], record['from'],
+                                           record['to'])
+                for got, expected in zip(result.tolist(), record['result']):
+                    self.assertLess(distance(got, expected), TOLERANCE)
+
+if __name__ == '__main__':
+    unittest.main()
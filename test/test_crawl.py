@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import random
+import unittest
+import warnings
+import baidumaps
+from test.fakes import StaticTransport
+
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs
+
+
+class PlaceTransport(object):
+    """Place search over a fixed set of POIs, reporting at most "cap"."""
+
+    def __init__(self, pois, cap=400):
+        self.pois = pois
+        self.cap = cap
+
+    def get(self, url):
+        query = parse_qs(urlparse(url).query)
+        lat1, lng1, lat2, lng2 = map(float, query['bounds'][0].split(','))
+        size = int(query['page_size'][0])
+        num = int(query['page_num'][0])
+        inside = [p for p in self.pois
+                  if lng1 <= p['location']['lng'] <= lng2 and
+                  lat1 <= p['location']['lat'] <= lat2][:self.cap]
+        body = {'status': 0, 'total': len(inside),
+                'results': inside[num * size:(num + 1) * size]}
+        return json.dumps(body).encode('utf-8')
+
+
+class PlaceCrawlerTest(unittest.TestCase):
+    def test_complete_dump_of_dense_area(self):
+        rng = random.Random(1)
+        pois = []
+        for i in range(3000):
+            # a dense downtown and a sparse suburb.
+            if i < 2500:
+                lng, lat = rng.uniform(116.39, 116.41), rng.uniform(39.9, 40)
+            else:
+                lng, lat = rng.uniform(116.0, 116.8), rng.uniform(39.5, 40.3)
+            pois.append({'uid': 'u%d' % i, 'name': str(i),
+                         'location': {'lng': lng, 'lat': lat}})
+
+        client = baidumaps.Client(ak='abc', transport=PlaceTransport(pois))
+        crawler = client.place_crawl('餐馆', [[116.0, 39.5], [116.8, 40.3]],
+                                     workers=4)
+        found = list(crawler)
+        self.assertEqual(sorted(p['uid'] for p in found),
+                         sorted(p['uid'] for p in pois))
+        self.assertGreater(crawler.splits, 0)
+        self.assertEqual(crawler.truncated, 0)
+        self.assertLess(crawler.requests, 400)
+
+    def test_string_bounds(self):
+        pois = [{'uid': 'a', 'location': {'lng': 116.405, 'lat': 39.95}}]
+        client = baidumaps.Client(ak='abc', transport=PlaceTransport(pois))
+        found = list(client.place_crawl('x', '116.404,39.915;116.414,39.975'))
+        self.assertEqual([p['uid'] for p in found], ['a'])
+
+    def test_lazy(self):
+        pois = [{'uid': 'a', 'detail': 1,
+                 'location': {'lng': 116.405, 'lat': 39.95}}]
+        client = baidumaps.Client(ak='abc', transport=PlaceTransport(pois))
+        found = list(client.place_crawl('x', [[116.4, 39.9], [116.5, 40.0]],
+                                        lazy=True))
+        self.assertEqual([p['uid'] for p in found], ['a'])
+        self.assertNotIn('detail', found[0])
+
+    def crawl_capped(self, **kwargs):
+        # an area that always reports the cap never stops splitting.
+        transport = StaticTransport({'status': 0, 'total': 400,
+                                     'results': []})
+        client = baidumaps.Client(ak='abc', transport=transport)
+        crawler = client.place_crawl('x', [[116.0, 39.5], [116.8, 40.3]],
+                                     workers=1, **kwargs)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(list(crawler), [])
+        self.assertEqual(len(caught), crawler.truncated)
+        self.assertTrue(all(issubclass(w.category, RuntimeWarning)
+                            for w in caught))
+        self.assertEqual(transport.calls, crawler.requests)
+        return crawler, caught
+
+    def test_max_depth(self):
+        crawler, caught = self.crawl_capped(max_depth=2)
+        self.assertEqual(crawler.requests, 1 + 4 + 16)
+        self.assertEqual(crawler.truncated, 16)
+        self.assertIn('max_depth', str(caught[0].message))
+
+    def test_max_requests(self):
+        crawler, caught = self.crawl_capped(max_requests=5)
+        self.assertEqual(crawler.requests, 5)
+        self.assertEqual(crawler.splits, 4)
+        self.assertEqual(crawler.truncated, 1 + 12)
+        self.assertIn('budget', str(caught[0].message))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import sys
+import unittest
+import baidumaps
+from baidumaps import geometry
+from baidumaps.cache import MemoryCache
+from baidumaps.spatial import haversine
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'benchmarks'))
+
+from stubserver import StubServer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'needs NumPy')
+class GeometryTest(unittest.TestCase):
+    def test_haversine_array(self):
+        origins = [[116.40, 39.90], [121.47, 31.23]]
+        destinations = [[116.41, 39.91], [113.26, 23.13], [116.40, 39.90]]
+        matrix = geometry.distance_matrix(origins, destinations)
+        self.assertEqual(matrix.shape, (2, 3))
+        for i, o in enumerate(origins):
+            for j, d in enumerate(destinations):
+                self.assertAlmostEqual(matrix[i, j], haversine(*(o + d)),
+                                       places=6)
+
+    def test_nearest(self):
+        rng = np.random.RandomState(0)
+        origins = rng.uniform([116.0, 39.5], [117.0, 40.5], (50, 2))
+        destinations = rng.uniform([116.0, 39.5], [117.0, 40.5], (30, 2))
+        geometry.BLOCK, block = 16, geometry.BLOCK     # several blocks
+        try:
+            index, straight = geometry.nearest(origins, destinations, 4)
+        finally:
+            geometry.BLOCK = block
+        full = geometry.distance_matrix(origins, destinations)
+        np.testing.assert_array_equal(index, np.argsort(full, axis=1)[:, :4])
+        np.testing.assert_allclose(straight, np.sort(full, axis=1)[:, :4])
+
+    def test_fit(self):
+        straight = np.linspace(500, 20000, 40)
+        distance = 1.3 * straight + 200
+        duration = 0.1 * distance + 60
+        model = geometry.EtaModel().fit(straight, distance, duration)
+        self.assertAlmostEqual(model.detour, 1.3)
+        self.assertAlmostEqual(model.pace_offset, 60)
+        self.assertEqual(model.samples, 40)
+        self.assertLess(model.error, 1e-9)
+        np.testing.assert_allclose(model.predict([1000.0])[1], [210.0])
+        self.assertRaises(ValueError, model.fit, [1.0], [2.0], [3.0])
+
+    def test_pack(self):
+        # origins sharing their candidates share requests.
+        groups = geometry.pack([[0, 1], [1, 0], [2, 3], [0, 1]], 5)
+        self.assertEqual(groups, [([0, 1, 3, 2], [0, 1, 2, 3])])
+        groups = geometry.pack([list(range(7))], 5)
+        self.assertEqual(groups, [([0], [0, 1, 2, 3, 4]), ([0], [5, 6])])
+
+
+@unittest.skipIf(np is None, 'needs NumPy')
+class RouteNearestTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+        self.cache = MemoryCache()
+        self.client = baidumaps.Client(ak='abc', domain=self.server.domain,
+                                       cache=self.cache)
+        rng = np.random.RandomState(1)
+        self.origins = rng.uniform([116.0, 39.5], [117.0, 40.5], (20, 2))
+        self.depots = rng.uniform([116.0, 39.5], [117.0, 40.5], (40, 2))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_route_nearest(self):
+        result = self.client.route_nearest(self.origins, self.depots, k=2)
+        report = result['report']
+        self.assertEqual(report['full_requests'], 32)
+        self.assertEqual(report['requests'], self.server.total)
+        self.assertLess(report['requests'], 20)
+        self.assertEqual(report['saved_pairs'], 800 - report['pairs'])
+
+        index = geometry.nearest(self.origins, self.depots, 2)[0]
+        for i in range(20):
+            requested = result['status'][i] == 0
+            best = result['nearest'][i]
+            self.assertTrue(requested[best])
+            self.assertEqual(result['duration'][i][best],
+                             result['duration'][i][requested].min())
+            self.assertTrue(requested[index[i]].all())
+            self.assertTrue(np.isnan(result['distance'][i][~requested]).all())
+        self.assertFalse(result['estimated'].any())
+
+    def test_calibrate_and_estimate(self):
+        self.client.route_nearest(self.origins, self.depots, k=3)
+        model = geometry.EtaModel().calibrate(self.cache)
+        self.assertGreater(model.samples, 60)
+        result = self.client.route_nearest(self.origins, self.depots, k=3,
+                                           model=model)
+        self.assertTrue(result['estimated'].any())
+        self.assertTrue(np.isfinite(result['duration']).all())
+        self.assertFalse((result['estimated'] &
+                          (result['status'] == 0)).any())
+
+        # refitting on that result ignores the estimated cells.
+        refit = geometry.EtaModel().fit_matrix(self.origins, self.depots,
+                                               result)
+        self.assertEqual(refit.samples, (result['status'] == 0).sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import random
+import unittest
+import baidumaps
+from baidumaps import exceptions
+from baidumaps.keypool import KeyPool
+from baidumaps.ratelimit import RateLimiter
+
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs
+
+
+class KeyedTransport(object):
+    """Answers status 302 for keys in "refused", status 0 otherwise."""
+
+    def __init__(self, refused=()):
+        self.refused = set(refused)
+        self.used = []
+
+    def get(self, url):
+        ak = parse_qs(urlparse(url).query)['ak'][0]
+        self.used.append(ak)
+        if ak in self.refused:
+            return b'{"status": 302}'
+        return json.dumps({'status': 0, 'result': [{'x': 1, 'y': 2}]}
+                          ).encode('utf-8')
+
+
+class KeyPoolTest(unittest.TestCase):
+    def test_spreads_over_keys(self):
+        transport = KeyedTransport()
+        pool = KeyPool(['k1', 'k2', 'k3'])
+        pool.random = random.Random(0).random
+        latency = {'k1': 0.01, 'k2': 0.02, 'k3': 0.03}
+        # injected latencies, whatever the wall clock measured.
+        pool.report = lambda ak, seconds: KeyPool.report(pool, ak,
+                                                         latency[ak])
+        client = baidumaps.Client(ak=pool, transport=transport)
+        for _ in range(60):
+            client.geoconv('1,2')
+        self.assertEqual(set(transport.used), set(['k1', 'k2', 'k3']))
+
+    def test_latency_tilts_but_does_not_starve(self):
+        pool = KeyPool(['k1', 'k2', 'k3'], max_ratio=4)
+        pool.random = random.Random(0).random
+        pool.clock = lambda: 0
+        latency = {'k1': 0.01, 'k2': 0.05, 'k3': 1.0}
+        used = dict((ak, 0) for ak in latency)
+        for _ in range(3000):
+            ak = pool.choose('geoconv')
+            pool.report(ak, latency[ak])
+            used[ak] += 1
+        self.assertGreater(used['k1'], used['k2'])
+        self.assertGreater(used['k2'], used['k3'])
+        # k2 and k3 weigh 1/4 of k1 at worst: 1/6 of the calls each.
+        self.assertGreater(used['k3'], 3000 / 6 * 0.8)
+
+    def test_unreported_and_stale_keys_count_as_fast(self):
+        pool = KeyPool(['k1', 'k2'], stale=60)
+        now = [0]
+        pool.clock = lambda: now[0]
+        pool.report('k1', 0.01)
+        self.assertEqual(pool.latencies(['k1', 'k2'], 0), [0.01, 0.01])
+        pool.report('k2', 0.5)
+        self.assertEqual(pool.latencies(['k1', 'k2'], 0), [0.01, 0.04])
+        now[0] = 100
+        pool.report('k2', 0.5)      # k1 went stale, k2 is all that is known
+        self.assertEqual(pool.latencies(['k1', 'k2'], 100), [0.5, 0.5])
+
+    def test_failover_and_cooldown(self):
+        transport = KeyedTransport(refused=['k1'])
+        pool = KeyPool(['k1', 'k2'], cooldown=60)
+        pool.random = lambda: 0.0       # always k1 first while it is ready
+        client = baidumaps.Client(ak=pool, transport=transport)
+        self.assertEqual(client.geoconv('1,2'), {'lng': 1, 'lat': 2})
+        client.geoconv('1,2')
+        self.assertEqual(transport.used, ['k1', 'k2', 'k2'])
+
+    def test_cooldown_per_service(self):
+        transport = KeyedTransport(refused=['k1'])
+        pool = KeyPool(['k1', 'k2'], cooldown=60)
+        pool.random = lambda: 0.0       # always k1 first while it is ready
+        client = baidumaps.Client(ak=pool, transport=transport)
+        client.geoconv('1,2')
+        self.assertEqual(pool.choose('geoconv'), 'k2')
+        self.assertEqual(pool.choose('geocoder'), 'k1')
+
+    def test_all_keys_refused(self):
+        transport = KeyedTransport(refused=['k1', 'k2'])
+        client = baidumaps.Client(ak=['k1', 'k2'], transport=transport)
+        with self.assertRaises(exceptions.StatusError):
+            client.geoconv('1,2')
+        self.assertEqual(sorted(transport.used), ['k1', 'k2'])
+
+    def test_weights_follow_remaining_quota(self):
+        limiter = RateLimiter(daily_quota={'geoconv': 10})
+        pool = KeyPool(['k1', 'k2'])
+        for _ in range(10):
+            limiter.acquire('k1', 'geoconv')
+        self.assertEqual(pool.weight('k1', 'geoconv', limiter), 0)
+        self.assertEqual(pool.choose('geoconv', limiter), 'k2')
+
+    def test_invalid_key_in_pool(self):
+        with self.assertRaises(ValueError):
+            baidumaps.Client(ak=['k1', 'bad key'])
+
+if __name__ == '__main__':
+    unittest.main()
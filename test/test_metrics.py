@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import logging
+import os
+import tempfile
+import unittest
+import baidumaps
+from baidumaps import cache
+from baidumaps import exceptions
+from baidumaps.metrics import Histogram, Metrics, export
+from test.fakes import StaticTransport, client_for
+
+
+class HistogramTest(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = Histogram(bounds=(1, 2, 5))
+        for value in (0.5, 1.5, 1.5, 4, 7):
+            histogram.add(value)
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertEqual(histogram.percentile(0.5), 2)
+        self.assertEqual(histogram.percentile(1.0), 7)
+        self.assertAlmostEqual(histogram.mean(), 2.9)
+
+
+class MetricsTest(unittest.TestCase):
+    def test_phases_statuses_and_cache(self):
+        metrics = Metrics()
+        transport = StaticTransport({'status': 0,
+                                     'result': [{'x': 1, 'y': 2}]})
+        client = baidumaps.Client(ak='abc', transport=transport,
+                                  metrics=metrics,
+                                  cache=cache.MemoryCache())
+        client.geoconv('1,2')
+        client.geoconv('1,2')
+        transport.reply({'status': 25})
+        self.assertRaises(exceptions.StatusError, client.geoconv, '3,4')
+
+        for phase in ('url', 'network', 'decode'):
+            self.assertEqual(metrics.latency['geoconv', phase].count, 2)
+        self.assertEqual(metrics.latency['geoconv', 'parse'].count, 2)
+        self.assertEqual(metrics.latency['geoconv', 'total'].count, 2)
+        self.assertEqual(metrics.statuses['geoconv', '0'], 1)
+        self.assertEqual(metrics.statuses['geoconv', '25'], 1)
+        self.assertEqual(metrics.sizes['geoconv'].count, 2)
+        self.assertAlmostEqual(metrics.cache_hit_rate('geoconv'), 1 / 3.0)
+
+    def test_export(self):
+        metrics = Metrics()
+        client = client_for({'status': 0, 'result': [{'x': 1, 'y': 2}]},
+                            metrics=metrics)
+        client.geoconv('1,2')
+        path = os.path.join(tempfile.mkdtemp(), 'metrics.txt')
+        export(metrics, path)
+        with open(path) as f:
+            text = f.read()
+        self.assertIn('[geoconv]', text)
+        self.assertIn('status   0:1', text)
+
+        records = []
+        logger = logging.getLogger('baidumaps.test_metrics')
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        export(metrics, logger)
+        self.assertEqual(len(records), len(metrics.summary()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import threading
+import unittest
+import baidumaps
+
+try:
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from urlparse import urlparse, parse_qs
+
+
+class PagedTransport(object):
+    """Serves "total" POIs named by their index, page by page."""
+
+    def __init__(self, total):
+        self.total = total
+        self.pages = []
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        query = parse_qs(urlparse(url).query)
+        size = int(query['page_size'][0])
+        num = int(query['page_num'][0])
+        with self.lock:
+            self.pages.append(num)
+        results = [{'name': str(i), 'uid': str(i), 'detail': 1}
+                   for i in range(num * size,
+                                  min((num + 1) * size, self.total))]
+        return json.dumps({'status': 0, 'total': self.total,
+                           'results': results}).encode('utf-8')
+
+
+class PagingTest(unittest.TestCase):
+    def test_yields_every_poi_once(self):
+        transport = PagedTransport(total=45)
+        client = baidumaps.Client(ak='abc', transport=transport)
+        pois = list(client.place_search_iter('银行', region='北京',
+                                             page_size=20))
+        self.assertEqual([p['name'] for p in pois],
+                         [str(i) for i in range(45)])
+        self.assertNotIn('detail', pois[0])     # parsed by parse_psh
+        self.assertEqual(sorted(transport.pages), [0, 1, 2])
+
+    def test_lazy(self):
+        transport = PagedTransport(total=100)
+        client = baidumaps.Client(ak='abc', transport=transport)
+        pois = client.place_eventsearch_iter('美食', 'groupon', '北京',
+                                             location='116.4,39.9',
+                                             page_size=10, raw=True)
+        first = next(pois)
+        self.assertEqual(first['detail'], 1)
+        pois.close()
+        self.assertLessEqual(len(transport.pages), 2)
+
+    def test_empty(self):
+        client = baidumaps.Client(ak='abc', transport=PagedTransport(0))
+        self.assertEqual(list(client.place_search_iter('x', region='y')), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import unittest
+from baidumaps import parse
+from test.fakes import client_for
+
+
+PLACES = {'status': 0, 'total': 2, 'results': [
+    {'uid': 'u1', 'name': 'a', 'street_id': 's1', 'detail': 1},
+    {'uid': 'u2', 'name': 'b'}]}
+
+
+class DecoderTest(unittest.TestCase):
+    def test_custom_decoder(self):
+        calls = []
+
+        def decoder(body):
+            calls.append(body)
+            return json.loads(body)
+
+        client = client_for({'status': 0, 'result': [{'x': 1, 'y': 2}]},
+                            decoder=decoder)
+        self.assertEqual(client.geoconv('1,2'), {'lng': 1, 'lat': 2})
+        self.assertEqual(len(calls), 1)
+
+    def test_default_and_orjson(self):
+        self.assertIs(client_for({}).decode, json.loads)
+        self.assertRaises(ValueError, client_for, {}, decoder='ujson')
+        try:
+            import orjson
+        except ImportError:
+            self.assertRaises(ImportError, client_for, {}, decoder='orjson')
+        else:
+            self.assertIs(client_for({}, decoder='orjson').decode,
+                          orjson.loads)
+
+
+class LazyParseTest(unittest.TestCase):
+    def test_matches_eager_parse(self):
+        client = client_for(PLACES)
+        eager = client.place_search('银行', region='北京')
+        lazy = client.place_search('银行', region='北京', lazy=True)
+        self.assertEqual(list(lazy), eager)
+        self.assertEqual(lazy[0], {'uid': 'u1', 'name': 'a'})
+        self.assertNotIn('street_id', lazy[0])
+        self.assertRaises(KeyError, lambda: lazy[0]['detail'])
+
+    def test_response_untouched(self):
+        response = json.loads(json.dumps(PLACES))
+        result = parse.parse_lazy(None, 'place', 'search', response)
+        self.assertEqual(len(result), 2)
+        self.assertIn('street_id', response['results'][0])
+
+    def test_location_ip(self):
+        response = {'content': {'address_detail': {'city': 'c',
+                                                   'city_code': 1},
+                                'point': {'x': '116.1', 'y': '39.1'}}}
+        result = parse.parse_lazy(None, 'location', 'ip', response)
+        self.assertEqual(dict(result['address']), {'city': 'c'})
+        self.assertEqual(result['location'], {'lng': 116.1, 'lat': 39.1})
+
+    def test_falls_back_to_parse(self):
+        response = {'result': {'location': {'lng': 1, 'lat': 2}}}
+        self.assertEqual(parse.parse_lazy(None, 'geocoder', '', response),
+                         response['result'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import unittest
+import baidumaps
+from baidumaps import exceptions
+from baidumaps.ratelimit import RateLimiter, TokenBucket
+from test.fakes import StaticTransport
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_smooth_pacing(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10)
+        bucket.clock, bucket.sleep = clock, clock.sleep
+        waits = [bucket.acquire() for _ in range(5)]
+        self.assertEqual(waits[0], 0)
+        self.assertAlmostEqual(clock.now, 1000.4)
+
+    def test_burst_after_idle(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=3)
+        bucket.clock, bucket.sleep = clock, clock.sleep
+        clock.now += 10
+        [bucket.acquire() for _ in range(3)]
+        self.assertAlmostEqual(clock.now, 1010.0)
+        bucket.acquire()
+        self.assertAlmostEqual(clock.now, 1010.1)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_daily_quota(self):
+        limiter = RateLimiter(daily_quota={'geoconv': 2})
+        transport = StaticTransport(
+            b'{"status": 0, "result": [{"x": 1, "y": 2}]}')
+        client = baidumaps.Client(ak='abc', transport=transport,
+                                  rate_limiter=limiter)
+        client.geoconv('1,2')
+        client.geoconv('1,2')
+        self.assertEqual(limiter.remaining('abc', 'geoconv'), 0)
+        with self.assertRaises(exceptions.QuotaError) as raised:
+            client.geoconv('1,2')
+        self.assertIn('2', str(raised.exception))
+        self.assertEqual(transport.calls, 2)
+        self.assertIsNone(limiter.remaining('abc', 'geocoder'))
+
+        limiter.clock = lambda: 10 ** 10     # another day
+        client.geoconv('1,2')
+        self.assertEqual(transport.calls, 3)
+
+    def test_quota_status_exhausts_key(self):
+        limiter = RateLimiter()
+        transport = StaticTransport(b'{"status": 302}')
+        client = baidumaps.Client(ak='abc', transport=transport,
+                                  rate_limiter=limiter)
+        with self.assertRaises(exceptions.StatusError):
+            client.geocode(address='a')
+        with self.assertRaises(exceptions.QuotaError) as raised:
+            client.geocode(address='a')
+        self.assertTrue(raised.exception.reported)
+        self.assertNotIn('0', str(raised.exception).split(':', 1)[1])
+        self.assertEqual(transport.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
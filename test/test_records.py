@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import unittest
+from baidumaps import records
+from test.fakes import client_for
+
+
+class TypedResultTest(unittest.TestCase):
+    def test_geoconv_points(self):
+        client = client_for({'status': 0, 'result': [{'x': 1.5, 'y': 2.5}]})
+        points = client.geoconv('1,2', typed=True)
+        self.assertIsInstance(points, records.Points)
+        self.assertEqual(len(points), 1)
+        self.assertEqual(points[0], records.Point(lng=1.5, lat=2.5))
+
+    def test_route_matrix(self):
+        elements = [{'distance': {'value': 10}, 'duration': {'value': 1}},
+                    {'status': 11, 'message': 'x'}]
+        client = client_for({'status': 0, 'result': {'elements': elements}})
+        matrix = client.route_matrix([[116.1, 39.1]],
+                                     [[116.2, 39.2], [116.3, 39.3]],
+                                     typed=True)
+        self.assertEqual((matrix.rows, matrix.cols), (1, 2))
+        self.assertEqual(matrix.cell(0, 0), (10, 1, 0))
+        self.assertEqual(matrix.cell(0, 1)[2], 11)
+
+    def test_place_search_pois(self):
+        results = [{'uid': 'u1', 'name': 'n', 'street_id': 's',
+                    'location': {'lng': 116.3, 'lat': 40.0}}]
+        client = client_for({'status': 0, 'total': 1, 'results': results})
+        pois = client.place_search('银行', region='北京', typed=True)
+        self.assertEqual(pois[0].uid, 'u1')
+        self.assertEqual(pois[0].lng, 116.3)
+        self.assertFalse(hasattr(pois[0], '__dict__'))
+
+    def test_geocode(self):
+        client = client_for({'status': 0, 'result': {
+            'location': {'lng': 116.3, 'lat': 40.0}, 'precise': 1,
+            'confidence': 80, 'level': '商务大厦'}})
+        result = client.geocode(address='百度大厦', typed=True)
+        self.assertEqual((result.lng, result.confidence), (116.3, 80))
+        self.assertIsNone(result.formatted_address)
+
+    def test_untyped_service_falls_back(self):
+        client = client_for({'status': 0, 'result': {'name': 'x'}})
+        self.assertEqual(client.place_eventdetail('u1', typed=True),
+                         {'name': 'x'})
+
+if __name__ == '__main__':
+    unittest.main()
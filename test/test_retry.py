@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+import unittest
+import requests
+import baidumaps
+from baidumaps import exceptions
+from baidumaps.retry import RetryPolicy
+
+
+class ScriptedTransport(object):
+    """Plays "script" in order: bodies are returned, exceptions raised."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        with self.lock:
+            step = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+        if isinstance(step, Exception):
+            raise step
+        if isinstance(step, tuple):
+            delay, step = step
+            time.sleep(delay)
+        return step
+
+
+OK = b'{"status": 0, "result": [{"x": 1, "y": 2}]}'
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def make_client(self, script, **kwargs):
+        self.transport = ScriptedTransport(script)
+        self.policy = RetryPolicy(**kwargs)
+        self.sleeps = []
+        self.policy.sleep = self.sleeps.append
+        return baidumaps.Client(ak='abc', transport=self.transport,
+                                retry=self.policy)
+
+    def test_retries_transient_failures(self):
+        client = self.make_client([b'{"status": 1}',
+                                   requests.ConnectionError('reset'), OK],
+                                  base=1, cap=1.5)
+        self.assertEqual(client.geoconv('1,2'), {'lng': 1, 'lat': 2})
+        self.assertEqual(self.transport.calls, 3)
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertTrue(all(0 <= s <= 1.5 for s in self.sleeps))
+
+    def test_fatal_status_not_retried(self):
+        client = self.make_client([b'{"status": 24}', OK])
+        with self.assertRaises(exceptions.StatusError):
+            client.geoconv('1,2')
+        self.assertEqual(self.transport.calls, 1)
+
+    def test_gives_up_after_max_attempts(self):
+        client = self.make_client([requests.Timeout('slow')], max_attempts=4)
+        with self.assertRaises(requests.Timeout):
+            client.geoconv('1,2')
+        self.assertEqual(self.transport.calls, 4)
+
+    def test_hedged_request(self):
+        client = self.make_client([(0.5, OK), OK], hedge_percentile=0.9,
+                                  hedge_min_samples=5)
+        for _ in range(5):
+            self.policy.record('geoconv', 0.01)
+        start = time.time()
+        self.assertEqual(client.geoconv('1,2'), {'lng': 1, 'lat': 2})
+        self.assertLess(time.time() - start, 0.4)
+        self.assertEqual(self.policy.hedges, 1)
+        self.assertEqual(self.transport.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import threading
+import unittest
+import baidumaps
+from baidumaps import exceptions
+from test.fakes import StaticTransport
+
+
+class SingleFlightTest(unittest.TestCase):
+    def run_threads(self, client, n=8):
+        results = []
+
+        def call():
+            try:
+                results.append(client.geocode(address='百度大厦'))
+            except exceptions.StatusError as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(n)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        return results
+
+    def test_identical_calls_share_one_request(self):
+        transport = StaticTransport(
+            {'status': 0, 'result': {'location': {'lng': 1, 'lat': 2}}},
+            delay=0.1)
+        client = baidumaps.Client(ak='abc', transport=transport,
+                                  coalesce=True)
+        results = self.run_threads(client)
+        self.assertEqual(transport.calls, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(client.single_flight.shared, 7)
+
+    def test_status_error_shared(self):
+        transport = StaticTransport({'status': 2}, delay=0.1)
+        client = baidumaps.Client(ak='abc', transport=transport,
+                                  coalesce=True)
+        results = self.run_threads(client, n=4)
+        self.assertEqual(transport.calls, 1)
+        self.assertTrue(all(isinstance(r, exceptions.StatusError)
+                            for r in results))
+
+if __name__ == '__main__':
+    unittest.main()
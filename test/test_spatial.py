@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import unittest
+import baidumaps
+from baidumaps.spatial import ReverseGeocodeIndex, haversine
+
+
+class ReverseTransport(object):
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url):
+        self.calls += 1
+        body = {'status': 0, 'result': {'formatted_address': 'street %d'
+                                        % self.calls}}
+        return json.dumps(body).encode('utf-8')
+
+
+class ReverseGeocodeIndexTest(unittest.TestCase):
+    def test_haversine(self):
+        # one degree of latitude is about 111.2 km.
+        self.assertAlmostEqual(haversine(116, 39, 116, 40) / 1000, 111.2,
+                               places=1)
+
+    def test_nearest_within_radius(self):
+        index = ReverseGeocodeIndex(radius=100)
+        index.add('ns', 116.40000, 39.9, b'a')
+        index.add('ns', 116.40100, 39.9, b'b')     # about 85 m east
+        self.assertEqual(index.lookup('ns', 116.40090, 39.9), b'b')
+        self.assertEqual(index.lookup('ns', 116.39950, 39.9), b'a')
+        self.assertIsNone(index.lookup('ns', 116.39800, 39.9))
+        self.assertIsNone(index.lookup('other', 116.40000, 39.9))
+        stats = index.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+        self.assertLess(stats['max_error'], 100)
+
+    def test_bounded_memory(self):
+        index = ReverseGeocodeIndex(radius=10, max_points=100)
+        for i in range(1000):
+            index.add('ns', 116.0 + i * 0.001, 39.9, b'%d' % i)
+        self.assertLessEqual(len(index), 100)
+        self.assertEqual(len(index), sum(len(points) for points in
+                                         index.cells.values()))
+        self.assertEqual(index.lookup('ns', 116.999, 39.9), b'999')
+        self.assertIsNone(index.lookup('ns', 116.1, 39.9))
+        for _ in range(1000):
+            index.lookup('ns', 116.99901, 39.9)
+        stats = index.stats()
+        self.assertEqual(stats['hits'], 1001)
+        self.assertLessEqual(stats['p95_error'], 1.0)
+        self.assertEqual(sum(index.hit_distances.counts), 1001)
+
+    def test_client_skips_nearby_requests(self):
+        transport = ReverseTransport()
+        index = ReverseGeocodeIndex(radius=50)
+        client = baidumaps.Client(ak='abc', transport=transport,
+                                  reverse_index=index)
+        first = client.geocode(location='116.40000,39.90000')
+        near = client.geocode(location=[116.40020, 39.90010])
+        far = client.geocode(location='116.41000,39.90000')
+        pois = client.geocode(location='116.40000,39.90000', pois=1)
+        self.assertEqual(first, near)
+        self.assertNotEqual(first, far)
+        self.assertNotEqual(first, pois)
+        self.assertEqual(transport.calls, 3)
+        client.geocode(address='百度大厦')
+        self.assertEqual(len(index), 3)
+
+if __name__ == '__main__':
+    unittest.main()
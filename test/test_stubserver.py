@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+import sys
+import unittest
+import baidumaps
+from baidumaps import exceptions
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'benchmarks'))
+
+from stubserver import StubServer
+
+
+class StubServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer().start()
+        self.client = baidumaps.Client(ak='abc', domain=self.server.domain)
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.server.stop()
+
+    def test_every_endpoint(self):
+        client = self.client
+        self.assertEqual(len(client.geoconv('114.2,29.5;114.3,29.6')), 2)
+        self.assertEqual(len(client.route_matrix([[116.4, 39.9]] * 2,
+                                                 [[116.5, 39.8]] * 3)), 6)
+        self.assertIn('location', client.ip_locate())
+        self.assertIn('routes', client.direct('天安门', '故宫',
+                                              origin_region='北京',
+                                              destination_region='北京'))
+        self.assertIn('location', client.geocode('百度大厦'))
+        self.assertIn('formatted_address',
+                      client.geocode(location=[116.4, 39.9]))
+        self.assertEqual(len(client.place_suggest('天安', '北京')), 10)
+        pois = client.place_search('银行', region='北京', page_size=20)
+        self.assertEqual(len(pois), 20)
+        self.assertNotIn('street_id', pois[0])
+        self.assertEqual(client.place_detail(uid='x')['uid'], 'uid00000000')
+        self.assertTrue(client.place_eventsearch('美食', 'groupon', '北京',
+                                                 location=[116.4, 39.9]))
+        self.assertIn('events', client.place_eventdetail('x'))
+        self.assertEqual(len(self.server.requests), 10)
+
+    def test_injected_errors(self):
+        self.server.error_rate = 1.0
+        with self.assertRaises(exceptions.StatusError) as caught:
+            self.client.geoconv('114.2,29.5')
+        self.assertIn(caught.exception.status,
+                      exceptions.messages['geoconv'])
+
+
+if __name__ == '__main__':
+    unittest.main()
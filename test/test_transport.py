@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# The MIT License (MIT)
+# Copyright © 2015 Eli Song
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated documentation files (the “Software”), to deal in the Software without restriction, including without limitation the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import unittest
+import baidumaps
+from baidumaps.transport import Transport
+from test.fakes import StaticTransport
+
+
+class TransportTest(unittest.TestCase):
+    def test_default_transport_is_pooled(self):
+        client = baidumaps.Client(ak='abc', pool_size=3, timeout=2)
+        self.assertIsInstance(client.transport, Transport)
+        self.assertEqual(client.transport.timeout, 2)
+        adapter = client.transport.session.get_adapter('http://')
+        self.assertEqual(adapter._pool_maxsize, 3)
+
+    def test_pluggable_transport(self):
+        fake = StaticTransport({'status': 0, 'result': [{'x': 1.5, 'y': 2.5}]})
+        client = baidumaps.Client(ak='abc', transport=fake)
+        result = client.geoconv('1,2')
+        self.assertEqual(result, {'lng': 1.5, 'lat': 2.5})
+        self.assertEqual(len(fake.urls), 1)
+        self.assertTrue(fake.urls[0].startswith('http://api.map.baidu.com/'))
+
+if __name__ == '__main__':
+    unittest.main()